@@ -22,7 +22,7 @@ sys.path.append(project_root)
 # 导入项目模块
 from src.config_manager import get_config_manager
 from src.database_manager import get_database_manager
-from src.logger import get_logger
+from src.logger import get_logger, configure_fast_records
 from src.time_manager.time_manager import get_time_manager
 from src.generation_executor import GenerationExecutor
 from src.checkpoint_manager import get_checkpoint_manager
@@ -161,4 +161,6 @@ def main():
             db_manager.disconnect()
 
 if __name__ == "__main__":
+    # 入口脚本的日志格式不含线程、进程信息，创建日志记录时跳过获取
+    configure_fast_records()
     sys.exit(main())
@@ -24,7 +24,7 @@ sys.path.append(os.path.join(project_root, 'src'))
 # 导入项目模块
 from src.config_manager import get_config_manager
 from src.database_manager import get_database_manager
-from src.logger import get_logger
+from src.logger import get_logger, configure_fast_records
 from src.time_manager.time_manager import get_time_manager
 
 
@@ -130,4 +130,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 入口脚本的日志格式不含线程、进程信息，创建日志记录时跳过获取
+    configure_fast_records()
     sys.exit(main())
\ No newline at end of file
@@ -24,7 +24,7 @@ sys.path.append(project_root)
 # 导入项目模块
 from src.config_manager import get_config_manager
 from src.database_manager import get_database_manager
-from src.logger import get_logger
+from src.logger import get_logger, configure_fast_records
 from src.time_manager.time_manager import get_time_manager
 
 
@@ -78,7 +78,7 @@ def main():
         if last_time is not None:
             # 将时区调整为相同
             if last_time.tzinfo is None:
-                last_time = time_manager.timezone.localize(last_time)
+                last_time = time_manager.localize(last_time)
             
             # 确保新的开始时间不早于上次的结束时间
             if start_time < last_time:
@@ -171,4 +171,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 入口脚本的日志格式不含线程、进程信息，创建日志记录时跳过获取
+    configure_fast_records()
     sys.exit(main())
\ No newline at end of file
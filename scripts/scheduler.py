@@ -24,7 +24,7 @@ project_root = os.path.dirname(current_dir)
 sys.path.append(project_root)
 
 # 导入项目模块
-from src.logger import get_logger
+from src.logger import get_logger, configure_fast_records
 
 
 # 全局变量
@@ -137,4 +137,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 入口脚本的日志格式不含线程、进程信息，创建日志记录时跳过获取
+    configure_fast_records()
     sys.exit(main())
\ No newline at end of file
@@ -86,8 +86,8 @@ class IntegrationTest(unittest.TestCase):
         end_datetime = datetime.datetime.combine(last_day, datetime.time(23, 0, 0))
         
         # 添加时区信息
-        start_datetime = self.time_manager.timezone.localize(start_datetime)
-        end_datetime = self.time_manager.timezone.localize(end_datetime)
+        start_datetime = self.time_manager.localize(start_datetime)
+        end_datetime = self.time_manager.localize(end_datetime)
         
         self.logger.info(f"测试实时数据时间范围: {start_datetime} 至 {end_datetime}")
         
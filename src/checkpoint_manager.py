@@ -15,7 +15,11 @@ import datetime
 from typing import List, Dict, Any, Optional
 
 class CheckpointManager:
-    """断点续传状态管理器"""
+    """
+    断点续传状态管理器
+    
+    非线程安全：所有方法都应在同一线程中调用（GenerationExecutor 流水线的 on_batch 回调也在调用线程执行）。
+    """
     
     def __init__(self, db_manager, logger=None):
         """
@@ -246,6 +250,24 @@ class CheckpointManager:
         if self.logger:
             self.logger.info(f"阶段 {stage} 已完成")
     
+    def fail_stage(self, stage: str, error: str = None) -> None:
+        """
+        标记一个阶段失败，阶段不计入已完成，续传时会重新执行
+        
+        Args:
+            stage: 阶段名称
+            error: 错误信息
+        """
+        self.status = "failed"
+        self.details = f"阶段 {stage} 失败: {error}" if error else f"阶段 {stage} 失败"
+        self.last_update_time = datetime.datetime.now()
+        
+        # 保存状态
+        self._save_status()
+        
+        if self.logger:
+            self.logger.error(self.details)
+    
     def pause_run(self, reason: str = None) -> None:
         """
         暂停当前运行
@@ -320,7 +342,7 @@ class CheckpointManager:
         """保存当前状态到数据库"""
         try:
             # 准备数据
-            completed_stages_json = json.dumps(self.completed_stages)
+            completed_stages_json = self.db_manager.serialize_json(self.completed_stages)
             
             # 使用 INSERT ... ON DUPLICATE KEY UPDATE 语法，避免分开检查和更新
             upsert_sql = """
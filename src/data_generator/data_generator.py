@@ -14,7 +14,7 @@ import pandas as pd
 import numpy as np
 import datetime
 import faker
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterable, Callable
 
 # 导入项目模块
 from src.config_manager import get_config_manager
@@ -38,6 +38,10 @@ from src.data_generator.entity_generators import (
 )
 
 
+# 数据量最大的表，数据库配置允许时通过 LOAD DATA LOCAL INFILE 导入
+BULK_LOAD_TABLES = ('account_transaction', 'customer_event')
+
+
 class DataGenerator:
     """数据生成器总控类，协调各实体生成器的工作"""
     
@@ -69,6 +73,10 @@ class DataGenerator:
         # 生成的数据缓存
         self.data_cache = {}
         
+        # 按列存储的数据缓存：阶段名 -> (原记录列表, 列数组字典)
+        self.soa_cache = {}
+        self.ids_cache = {}
+        
     def _init_entity_generators(self):
         """初始化各实体生成器"""
         self.customer_generator = CustomerGenerator(self.faker, self.config_manager)
@@ -103,7 +111,9 @@ class DataGenerator:
         
         try:
             if mode == 'historical':
-                stats = self.generate_historical_data(start_date, end_date)
+                # 历史数据量大且由本系统生成，导入期间关闭外键和唯一性检查
+                with self.db_manager.bulk_load_mode():
+                    stats = self.generate_historical_data(start_date, end_date)
             elif mode == 'realtime':
                 stats = self.generate_realtime_data(start_date, end_date)
             else:
@@ -164,7 +174,8 @@ class DataGenerator:
         self.data_cache['app_user'] = app_users
         
         self.logger.info("生成公众号粉丝数据...")
-        wechat_followers = self.wechat_follower_generator.generate(customers, app_users)
+        wechat_followers = self.wechat_follower_generator.generate(
+            customers, self.ids('app_user', app_users, 'customer_id'))
         stats['wechat_follower'] = self.import_data('wechat_follower', wechat_followers)
         self.data_cache['wechat_follower'] = wechat_followers
         
@@ -254,13 +265,15 @@ class DataGenerator:
         self.logger.info(f"实时数据生成完成，总记录数: {sum(stats.values())}")
         return stats
     
-    def import_data(self, table_name: str, data: List[Dict]) -> int:
+    def import_data(self, table_name: str, data: List[Dict],
+                    prepared: Optional[Dict[str, Any]] = None) -> int:
         """
         将生成的数据导入数据库
         
         Args:
             table_name: 表名
             data: 数据列表
+            prepared: db_manager.prepare 返回的导入句柄，提供时跳过DataFrame转换直接按句柄导入
             
         Returns:
             导入的记录数
@@ -270,6 +283,17 @@ class DataGenerator:
             return 0
         
         try:
+            if prepared is not None:
+                records_count = self.db_manager.import_prepared(prepared, data)
+                self.logger.info(f"已导入 {records_count} 条记录到表 {table_name}")
+                return records_count
+            
+            # 大表在允许时走 LOAD DATA LOCAL INFILE
+            if table_name in BULK_LOAD_TABLES and self.db_manager.local_infile_enabled:
+                records_count = self.db_manager.import_data(table_name, data, method='bulk')
+                self.logger.info(f"已通过LOAD DATA导入 {records_count} 条记录到表 {table_name}")
+                return records_count
+            
             # 将数据转换为DataFrame
             df = pd.DataFrame(data)
             
@@ -284,6 +308,87 @@ class DataGenerator:
             self.logger.error(f"导入数据到表 {table_name} 时出错: {str(e)}")
             raise
     
+    def to_soa(self, stage: str, rows: List[Dict]) -> Dict[str, Any]:
+        """
+        将记录列表转换为按列存储的数组，便于向量化筛选；对同一记录列表重复调用时复用缓存
+        
+        取值种类较少的字符串列（如 status）转换为 pandas.Categorical，按 int8 编码存储，
+        与字符串比较时直接得到布尔数组。
+        
+        Args:
+            stage: 阶段名（表名）
+            rows: 记录列表
+            
+        Returns:
+            列名到数组的映射
+        """
+        cached = self.soa_cache.get(stage)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+        
+        df = pd.DataFrame.from_records(rows)
+        soa = {}
+        for column in df.columns:
+            values = df[column]
+            if values.dtype == object and values.nunique() <= min(127, len(values) // 2):
+                soa[column] = pd.Categorical(values)
+            else:
+                soa[column] = values.to_numpy()
+        
+        self.soa_cache[stage] = (rows, soa)
+        return soa
+    
+    def ids(self, stage: str, rows: List[Dict], column: str) -> np.ndarray:
+        """
+        取记录列表中的一列ID，构造为数组供只需要ID的下游生成器使用；对同一记录列表重复调用时复用缓存
+        
+        ID为字符串（如客户ID），数组类型为object，只保存对原字符串的引用，不复制记录字典。
+        
+        Args:
+            stage: 阶段名（表名）
+            rows: 记录列表
+            column: ID列名
+            
+        Returns:
+            ID数组
+        """
+        key = (stage, column)
+        cached = self.ids_cache.get(key)
+        if cached is not None and cached[0] is rows:
+            return cached[1]
+        
+        ids = np.fromiter((row[column] for row in rows), dtype=object, count=len(rows))
+        self.ids_cache[key] = (rows, ids)
+        return ids
+    
+    def bulk_import(self, table_name: str, batches: Iterable[List[Dict]],
+                    on_batch: Optional[Callable[[int, int, int], None]] = None) -> int:
+        """
+        在一个事务中逐批导入数据，整个阶段只在结束时提交一次
+        
+        Args:
+            table_name: 表名
+            batches: 逐批产出记录列表的可迭代对象
+            on_batch: 每批导入后的回调，参数为 (批次序号, 本批导入条数, 累计导入条数)
+            
+        Returns:
+            导入的记录总数
+        """
+        # 走多行INSERT的表在第一批时确定写入列、模板和批大小，之后各批复用
+        use_prepared = not (table_name in BULK_LOAD_TABLES and self.db_manager.local_infile_enabled)
+        prepared = None
+        
+        total_count = 0
+        with self.db_manager.transaction():
+            for batch_num, batch in enumerate(batches, 1):
+                if batch and use_prepared and prepared is None:
+                    prepared = self.db_manager.prepare(table_name, batch[0])
+                count = self.import_data(table_name, batch, prepared) if batch else 0
+                total_count += count
+                if on_batch:
+                    on_batch(batch_num, count, total_count)
+        return total_count
+    
     def _split_date_range(self, start_date: datetime.date, end_date: datetime.date, 
                          days_per_batch: int = 30) -> List[Tuple[datetime.date, datetime.date]]:
         """
@@ -297,15 +402,9 @@ class DataGenerator:
         Returns:
             日期范围列表，每个元素为(开始日期, 结束日期)
         """
-        date_ranges = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            batch_end = min(current_date + datetime.timedelta(days=days_per_batch-1), end_date)
-            date_ranges.append((current_date, batch_end))
-            current_date = batch_end + datetime.timedelta(days=1)
-        
-        return date_ranges
+        if start_date > end_date:
+            return []
+        return self.time_manager.split_date_range(start_date, end_date, days_per_batch)
     
     def _load_fund_accounts(self) -> List[Dict]:
         """
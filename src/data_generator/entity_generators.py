@@ -13,8 +13,7 @@ import datetime
 import faker
 import numpy as np
 import pandas as pd
-import copy
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterable, Iterator
 
 
 class BaseEntityGenerator:
@@ -30,6 +29,28 @@ class BaseEntityGenerator:
         """
         self.faker = fake_generator
         self.config_manager = config_manager
+        
+        # (账户列表, 按客户分组的账户)，按批生成时同一账户列表只分组一次
+        self._accounts_index = None
+    
+    def accounts_by_customer(self, fund_accounts: List[Dict]) -> Dict[str, List[Dict]]:
+        """
+        按客户ID分组资金账户，对同一个账户列表重复调用时复用上次的分组结果
+        
+        Args:
+            fund_accounts: 资金账户数据列表
+            
+        Returns:
+            客户ID到其账户列表的映射
+        """
+        if self._accounts_index is None or self._accounts_index[0] is not fund_accounts:
+            account_map = {}
+            for account in fund_accounts:
+                customer_id = account.get('customer_id')
+                if customer_id:
+                    account_map.setdefault(customer_id, []).append(account)
+            self._accounts_index = (fund_accounts, account_map)
+        return self._accounts_index[1]
     
     def generate_id(self, prefix: str = '') -> str:
         """
@@ -181,6 +202,25 @@ class CustomerGenerator(BaseEntityGenerator):
         
         return customers
     
+    def generate_iter(self, bank_managers: List[Dict], count: Optional[int] = None,
+                      chunk_size: int = 1000) -> Iterator[Dict]:
+        """
+        逐条产出客户数据，内部每次只生成 chunk_size 个客户，不物化全部客户列表
+        
+        Args:
+            bank_managers: 银行经理数据列表
+            count: 生成的客户数量，默认从配置中获取
+            chunk_size: 每次生成的客户数量
+            
+        Yields:
+            客户数据
+        """
+        if count is None:
+            count = self.config_manager.get_entity_config('customer').get('total_count', 1000)
+        
+        for i in range(0, count, chunk_size):
+            yield from self.generate(bank_managers, count=min(chunk_size, count - i))
+    
     def _generate_personal_customers(self, config: Dict, count: int, bank_managers: List[Dict]) -> List[Dict]:
         """
         生成个人客户数据
@@ -996,16 +1036,8 @@ class LoanRecordGenerator(BaseEntityGenerator):
         # 当前日期
         today = datetime.date.today()
         
-        # 优化点1: 预先构建账户映射，避免重复查询
-        account_map = {}
-        for account in fund_accounts:
-            customer_id = account.get('customer_id')
-            if not customer_id:
-                continue
-                
-            if customer_id not in account_map:
-                account_map[customer_id] = []
-            account_map[customer_id].append(account)
+        # 优化点1: 预先构建账户映射，避免重复查询；执行器按批调用时只构建一次
+        account_map = self.accounts_by_customer(fund_accounts)
         
         # 优化点2: 批量处理，分批筛选客户
         batch_size = 1000  # 每批处理的客户数量
@@ -1070,6 +1102,19 @@ class LoanRecordGenerator(BaseEntityGenerator):
             corporate_loan_types = ['small_business']
             corporate_loan_weights = [1.0]
             
+            # 按贷款类型预计算期限分布权重，避免为每条记录复制期限配置
+            term_overrides = {
+                # 住房贷款以长期为主
+                'mortgage': {'short_term': 0.05, 'medium_term': 0.15, 'long_term': 0.80},
+                # 小微企业贷以中短期为主
+                'small_business': {'short_term': 0.30, 'medium_term': 0.60, 'long_term': 0.10},
+            }
+            term_weights_by_type = {
+                loan_type: [term_overrides.get(loan_type, {}).get(cat, term_config[cat].get('ratio', 0.33))
+                            for cat in term_categories]
+                for loan_type in personal_loan_types + corporate_loan_types
+            }
+            
             # 优化点7: 预计算利率调整范围
             interest_adjustments = {}
             for loan_type in type_keys:
@@ -1105,24 +1150,8 @@ class LoanRecordGenerator(BaseEntityGenerator):
                 loan_type = self.random_choice(suitable_types, suitable_weights)
                 
                 # 确定贷款期限
-                # 优化点8: 使用深拷贝避免修改原始配置
-                term_dist_copy = copy.deepcopy(term_config)
-                if loan_type == 'mortgage':
-                    # 住房贷款以长期为主
-                    term_dist_copy['short_term']['ratio'] = 0.05
-                    term_dist_copy['medium_term']['ratio'] = 0.15
-                    term_dist_copy['long_term']['ratio'] = 0.80
-                elif loan_type == 'small_business':
-                    # 小微企业贷以中短期为主
-                    term_dist_copy['short_term']['ratio'] = 0.30
-                    term_dist_copy['medium_term']['ratio'] = 0.60
-                    term_dist_copy['long_term']['ratio'] = 0.10
-                
-                term_categories = list(term_dist_copy.keys())
-                term_weights = [term_dist_copy[cat].get('ratio', 0.33) for cat in term_categories]
-                
-                term_category = self.random_choice(term_categories, term_weights)
-                term_months = self.random_choice(term_dist_copy[term_category]['months'])
+                term_category = self.random_choice(term_categories, term_weights_by_type[loan_type])
+                term_months = self.random_choice(term_config[term_category]['months'])
                 
                 # 贷款金额范围 - 优化点9: 简化金额范围计算
                 if loan_type == 'personal_consumption':
@@ -1254,12 +1283,12 @@ class InvestmentRecordGenerator(BaseEntityGenerator):
         
         # 筛选有投资能力的客户
         investment_eligible_customers = []
+        account_map = self.accounts_by_customer(fund_accounts)
         
         for customer in customers:
             # 获取客户的账户，筛选出非贷款且状态为active的账户
-            customer_accounts = [acc for acc in fund_accounts 
-                               if acc['customer_id'] == customer['customer_id'] 
-                               and acc['account_type'] != 'loan'
+            customer_accounts = [acc for acc in account_map.get(customer['customer_id'], [])
+                               if acc['account_type'] != 'loan'
                                and acc['status'] == 'active']
             
             if not customer_accounts:
@@ -1617,13 +1646,13 @@ class AppUserGenerator(BaseEntityGenerator):
 class WechatFollowerGenerator(BaseEntityGenerator):
     """微信公众号粉丝数据生成器"""
     
-    def generate(self, customers: List[Dict], app_users: List[Dict]) -> List[Dict]:
+    def generate(self, customers: List[Dict], app_user_customer_ids: Iterable[str]) -> List[Dict]:
         """
         生成微信公众号粉丝数据
         
         Args:
             customers: 客户数据列表
-            app_users: APP用户数据列表
+            app_user_customer_ids: 已有APP用户的客户ID（如 DataGenerator.ids 构造的数组）
             
         Returns:
             微信公众号粉丝数据列表
@@ -1646,7 +1675,7 @@ class WechatFollowerGenerator(BaseEntityGenerator):
         today = datetime.date.today()
         
         # 已有APP用户的客户ID集合
-        app_user_customer_ids = set(app_user['customer_id'] for app_user in app_users)
+        app_user_customer_ids = set(app_user_customer_ids)
         
         # 生成公众号粉丝数据
         wechat_followers = []
@@ -11,7 +11,40 @@ import os
 import json
 import datetime
 import logging
-from typing import Dict, List, Tuple, Set, Any, Optional, Union
+import functools
+from typing import Dict, List, Tuple, Set, Any, Optional, Union, Iterable
+
+# JSON序列化：优先使用orjson（C实现，直接输出bytes），未安装时回退到标准库json
+try:
+    import orjson as _json
+    
+    def _dumps(obj: Any) -> bytes:
+        return _json.dumps(
+            obj, default=str,
+            option=_json.OPT_INDENT_2 | _json.OPT_NON_STR_KEYS | _json.OPT_SERIALIZE_NUMPY)
+except ImportError:
+    _json = json
+    
+    def _dumps(obj: Any) -> bytes:
+        return _json.dumps(obj, ensure_ascii=False, indent=2, default=str).encode('utf-8')
+
+# 字段缺失时的占位值，用于区分"字段不存在"和"字段值为None"
+_MISSING = object()
+
+
+def _transpose(rows: List[Dict], fields: Iterable[str]) -> Dict[str, List[Any]]:
+    """
+    将记录列表（行式）转置为按字段组织的列式结构
+    
+    Args:
+        rows: 记录列表
+        fields: 需要提取的字段
+        
+    Returns:
+        字段名到列值列表的映射，缺失字段以 _MISSING 占位
+    """
+    return {field: [row.get(field, _MISSING) for row in rows] for field in fields}
+
 
 class DataValidator:
     """数据验证类，专注于验证数据完整性、唯一性和类型一致性"""
@@ -119,8 +152,8 @@ class DataValidator:
             file_path: 输出文件路径
         """
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(results, f, ensure_ascii=False, indent=2)
+            with open(file_path, 'wb') as f:
+                f.write(_dumps(results))
             self.logger.info(f"验证结果已保存到: {file_path}")
         except Exception as e:
             self.logger.error(f"保存验证结果到文件时出错: {str(e)}")
@@ -175,14 +208,14 @@ class DataValidator:
                 continue
                 
             data_list = data_cache[entity]
+            columns = _transpose(data_list, fields)
             missing_fields = {}
             
-            for i, data in enumerate(data_list):
-                for field in fields:
-                    if field not in data or data[field] is None or data[field] == "":
-                        if i not in missing_fields:
-                            missing_fields[i] = []
-                        missing_fields[i].append(field)
+            # 按列扫描，每次只访问一个字段的值
+            for field in fields:
+                for i, value in enumerate(columns[field]):
+                    if value is _MISSING or value is None or value == "":
+                        missing_fields.setdefault(i, []).append(field)
             
             if missing_fields:
                 error_count += len(missing_fields)
@@ -190,7 +223,7 @@ class DataValidator:
                 result["errors"].append(error_msg)
                 
                 # 显示前5个异常记录
-                for i, fields in list(missing_fields.items())[:5]:
+                for i, fields in sorted(missing_fields.items())[:5]:
                     id_field = next((f for f in data_list[i].keys() if 'id' in f.lower()), None)
                     data_id = data_list[i].get(id_field, "unknown") if id_field else f"记录索引{i}"
                     result["errors"].append(f"  - 记录ID={data_id}, 缺少字段: {', '.join(fields)}")
@@ -230,19 +263,18 @@ class DataValidator:
             if entity not in data_cache:
                 continue
                 
-            data_list = data_cache[entity]
+            id_column = _transpose(data_cache[entity], (id_field,))[id_field]
             id_set = set()
             duplicate_ids = set()
             
-            for data in data_list:
-                if id_field not in data:
+            for entity_id in id_column:
+                if entity_id is _MISSING:
                     error_count += 1
                     error_msg = f"实体类型 {entity} 中存在没有ID字段 {id_field} 的记录"
                     result["errors"].append(error_msg)
                     self.logger.error(error_msg)
                     continue
                     
-                entity_id = data[id_field]
                 if entity_id in id_set:
                     duplicate_ids.add(entity_id)
                 else:
@@ -305,6 +337,16 @@ class DataValidator:
             ("customer_event", "event_datetime", str, "事件时间")
         ]
         
+        # 每个实体只转置一次，按列验证各字段
+        entity_columns = {}
+        for entity, field, _, _ in field_types:
+            if entity in data_cache:
+                entity_columns.setdefault(entity, []).append(field)
+        entity_columns = {
+            entity: _transpose(data_cache[entity], fields)
+            for entity, fields in entity_columns.items()
+        }
+        
         # 验证每个字段的数据类型
         for entity, field, expected_type, description in field_types:
             if entity not in data_cache:
@@ -313,14 +355,10 @@ class DataValidator:
             data_list = data_cache[entity]
             type_errors = []
             
-            for data in data_list:
-                if field not in data or data[field] is None:
+            for i, value in enumerate(entity_columns[entity][field]):
+                if value is _MISSING or value is None:
                     continue  # 字段不存在或为空
                 
-                value = data[field]
-                id_field = next((f for f in data.keys() if 'id' in f.lower()), None)
-                data_id = data.get(id_field, "unknown") if id_field else "未知"
-                
                 # 如果期望类型是元组，表示多个可接受的类型
                 if isinstance(expected_type, tuple):
                     if not any(isinstance(value, t) for t in expected_type):
@@ -332,7 +370,7 @@ class DataValidator:
                             except (ValueError, TypeError):
                                 pass  # 转换失败，记录错误
                                 
-                        type_errors.append((data_id, value, type(value).__name__))
+                        type_errors.append((i, value, type(value).__name__))
                 else:
                     if not isinstance(value, expected_type):
                         # 尝试转换字符串
@@ -353,7 +391,7 @@ class DataValidator:
                             if isinstance(value, str) and value.lower() in ('true', 'false', '0', '1'):
                                 continue
                                 
-                        type_errors.append((data_id, value, type(value).__name__))
+                        type_errors.append((i, value, type(value).__name__))
             
             if type_errors:
                 error_count += len(type_errors)
@@ -366,7 +404,10 @@ class DataValidator:
                 )
                 result["errors"].append(f"  - 期望类型: {expected_type_name} ({description})")
                 
-                for rec_id, value, actual_type in type_errors[:5]:  # 只显示前5个错误
+                for i, value, actual_type in type_errors[:5]:  # 只显示前5个错误
+                    data = data_list[i]
+                    id_field = next((f for f in data.keys() if 'id' in f.lower()), None)
+                    rec_id = data.get(id_field, "unknown") if id_field else "未知"
                     result["errors"].append(f"  - 类型错误: ID={rec_id}, 值={value}, 实际类型={actual_type}")
                 
                 self.logger.error(error_msg)
@@ -409,16 +450,17 @@ class DataValidator:
             target_data = data_cache[target_entity]
             
             # 构建目标字段值集合，用于快速查找
-            target_values = set(item.get(target_field) for item in target_data if target_field in item)
+            target_values = set(_transpose(target_data, (target_field,))[target_field])
+            target_values.discard(_MISSING)
             
             # 验证外键
             invalid_fks = []
-            for i, data in enumerate(source_data):
-                if fk_field not in data or data[fk_field] is None or data[fk_field] == "":
+            for i, fk_value in enumerate(_transpose(source_data, (fk_field,))[fk_field]):
+                if fk_value is _MISSING or fk_value is None or fk_value == "":
                     continue  # 跳过空值
                 
-                fk_value = data[fk_field]
                 if fk_value not in target_values:
+                    data = source_data[i]
                     id_field = next((f for f in data.keys() if 'id' in f.lower()), None)
                     record_id = data.get(id_field, f"index_{i}") if id_field else f"index_{i}"
                     invalid_fks.append((record_id, fk_value))
@@ -666,15 +708,16 @@ class DataValidator:
             self.error_counts["data_volume"] = error_count
         
         return result
-# 单例模式
-_validator_instance = None
-
+# 单例模式（按参数缓存）
+@functools.lru_cache(maxsize=None)
 def get_validator(logger=None, log_dir="logs"):
-    """获取数据验证器的单例实例"""
-    global _validator_instance
-    if _validator_instance is None:
-        _validator_instance = DataValidator(logger, log_dir)
-    return _validator_instance
+    """
+    获取数据验证器的单例实例
+    
+    实例按 (logger, log_dir) 缓存：相同参数返回同一实例，
+    传入不同的logger或log_dir会得到新的实例（logger按对象身份哈希）。
+    """
+    return DataValidator(logger, log_dir)
 
 
 if __name__ == "__main__":
@@ -8,20 +8,422 @@
 """
 
 import os
+import re
 import time
+import atexit
+import datetime
+import tempfile
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import mysql.connector
-from typing import Dict, List, Any, Optional, Union, Tuple
-from mysql.connector import MySQLConnection, Error
+from typing import Dict, List, Any, Optional, Union, Tuple, Iterator, Iterable, Sequence
+from mysql.connector import MySQLConnection, Error, pooling
+
+# JSON序列化：优先使用orjson（C实现），未安装时回退到标准库json
+try:
+    import orjson
+    
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+except ImportError:
+    import json
+    
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False, default=str)
 
 # 导入项目模块
 from src.config_manager import get_config_manager
 from src.logger import get_logger
 
 
+# 匹配单行 INSERT ... VALUES (...) [ON DUPLICATE KEY UPDATE ...] 语句，用于改写为多行VALUES
+_INSERT_VALUES_RE = re.compile(
+    r"^\s*(INSERT\s+(?:IGNORE\s+)?INTO\s+[`\w.]+\s*\([^)]*\)\s*VALUES\s*)(\([^)]*\))"
+    r"(\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+.*?)?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+# 会改变表结构的DDL语句，执行后需要清空表结构相关缓存
+_DDL_RE = re.compile(r"(?:^|;)\s*(?:CREATE|DROP|ALTER|RENAME)\s", re.IGNORECASE)
+
+# 解析主键/唯一键冲突（errno 1062）错误信息中的冲突值和索引名
+_DUPLICATE_ENTRY_RE = re.compile(r"Duplicate entry '(.*)' for key '([^']+)'")
+
+# mysql-connector 的C扩展是否可用；不可用时只能使用纯Python实现
+_HAVE_CEXT = getattr(mysql.connector, 'HAVE_CEXT', False)
+
+# 未能读取服务端配置时使用的 max_allowed_packet 默认值（MySQL 8.0 默认64MB，这里保守取4MB）
+_DEFAULT_MAX_ALLOWED_PACKET = 4 * 1024 * 1024
+
+# generate_statistics 中各类列的聚合统计项，同类列合并为一条SELECT
+_COLUMN_STAT_EXPRESSIONS = {
+    'numeric': (
+        ('min_value', "MIN({col})"),
+        ('max_value', "MAX({col})"),
+        ('avg_value', "AVG({col})"),
+        ('distinct_count', "COUNT(DISTINCT {col})"),
+    ),
+    'char': (
+        ('distinct_count', "COUNT(DISTINCT {col})"),
+        ('avg_length', "AVG(LENGTH({col}))"),
+        ('max_length', "MAX(LENGTH({col}))"),
+    ),
+    'bool': (
+        ('true_count', "SUM(CASE WHEN {col} = TRUE THEN 1 ELSE 0 END)"),
+        ('false_count', "SUM(CASE WHEN {col} = FALSE THEN 1 ELSE 0 END)"),
+        ('null_count', "SUM(CASE WHEN {col} IS NULL THEN 1 ELSE 0 END)"),
+    ),
+}
+
+
+def _column_type_class(column_type: str) -> Optional[str]:
+    """
+    按列类型归类统计方式
+    
+    Args:
+        column_type: DESCRIBE 返回的列类型
+        
+    Returns:
+        'numeric'、'char'、'bool'，大文本或其他类型返回None
+    """
+    column_type = column_type.lower()
+    if 'text' in column_type:
+        return None
+    if any(t in column_type for t in ('int', 'decimal', 'float', 'double', 'date', 'time')):
+        return 'numeric'
+    if 'char' in column_type:
+        return 'char'
+    if 'bool' in column_type:
+        return 'bool'
+    return None
+
+# 自动计算批大小时的上限，单条语句过大时服务端解析和锁持有时间反而变长
+_MAX_BATCH_SIZE = 5000
+
+
+def _csv_field(value: Any) -> str:
+    """
+    将单个值格式化为 LOAD DATA 可识别的CSV字段
+    
+    Args:
+        value: 字段值
+        
+    Returns:
+        CSV字段文本，空值（None/NaN）返回未包裹的 NULL
+    """
+    if value is None or (isinstance(value, float) and value != value):
+        return 'NULL'
+    if isinstance(value, bool):
+        value = int(value)
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+# 内置建表语句，SQL目录中缺少对应脚本时使用
+_TABLE_SQL = {
+    'customer': """
+        CREATE TABLE IF NOT EXISTS customer (
+            customer_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            id_type VARCHAR(20) NOT NULL,
+            id_number VARCHAR(50) NOT NULL,
+            phone VARCHAR(20),
+            address VARCHAR(255),
+            email VARCHAR(100),
+            gender VARCHAR(10),
+            birth_date DATE,
+            registration_date DATE NOT NULL,
+            customer_type VARCHAR(20) NOT NULL COMMENT '个人/企业',
+            credit_score INT,
+            is_vip BOOLEAN,
+            branch_id VARCHAR(20),
+            occupation VARCHAR(100),
+            annual_income DECIMAL(18, 2),
+            business_type VARCHAR(50),
+            annual_revenue DECIMAL(18, 2),
+            establishment_date DATE,
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_type (customer_type),
+            INDEX idx_registration_date (registration_date)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='客户表';
+    """,
+    'fund_account': """
+        CREATE TABLE IF NOT EXISTS fund_account (
+            account_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            account_type VARCHAR(20) NOT NULL COMMENT '活期账户/定期账户/贷款账户',
+            opening_date DATE NOT NULL,
+            balance DECIMAL(18, 2) NOT NULL,
+            currency VARCHAR(10) NOT NULL,
+            status VARCHAR(20) NOT NULL COMMENT '活跃/冻结/休眠/关闭',
+            branch_id VARCHAR(20),
+            deposit_type_id VARCHAR(20),
+            interest_rate DECIMAL(10, 6),
+            term INT COMMENT '月数',
+            maturity_date DATE,
+            loan_amount DECIMAL(18, 2),
+            issue_date DATE,
+            due_date DATE,
+            remaining_payments INT,
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            INDEX idx_account_type (account_type),
+            INDEX idx_status (status),
+            CONSTRAINT fk_fund_account_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='资金账户表';
+    """,
+    'account_transaction': """
+        CREATE TABLE IF NOT EXISTS account_transaction (
+            transaction_id VARCHAR(20) PRIMARY KEY,
+            account_id VARCHAR(20) NOT NULL,
+            transaction_type VARCHAR(20) NOT NULL COMMENT '存款/取款/转账/消费/其他',
+            amount DECIMAL(18, 2) NOT NULL,
+            transaction_datetime DATETIME NOT NULL,
+            status VARCHAR(20) NOT NULL COMMENT '成功/失败/处理中/取消',
+            description VARCHAR(255),
+            channel VARCHAR(20) COMMENT '网银/APP/ATM/柜台/微信/支付宝',
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_account_id (account_id),
+            INDEX idx_transaction_type (transaction_type),
+            INDEX idx_transaction_datetime (transaction_datetime),
+            INDEX idx_status (status),
+            CONSTRAINT fk_account_transaction_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='资金账户流水表';
+    """,
+    'loan_record': """
+        CREATE TABLE IF NOT EXISTS loan_record (
+            loan_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            account_id VARCHAR(20) NOT NULL,
+            loan_type VARCHAR(50) NOT NULL COMMENT '个人消费贷/住房贷款/汽车贷款/教育贷款/小微企业贷',
+            loan_amount DECIMAL(18, 2) NOT NULL,
+            interest_rate DECIMAL(10, 6) NOT NULL,
+            term INT NOT NULL COMMENT '月数',
+            application_date DATE NOT NULL,
+            approval_date DATE,
+            status VARCHAR(20) NOT NULL COMMENT '申请中/已批准/已放款/还款中/已结清/逾期/拒绝',
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            INDEX idx_account_id (account_id),
+            INDEX idx_loan_type (loan_type),
+            INDEX idx_status (status),
+            CONSTRAINT fk_loan_record_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id),
+            CONSTRAINT fk_loan_record_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='借款记录表';
+    """,
+    'investment_record': """
+        CREATE TABLE IF NOT EXISTS investment_record (
+            investment_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            account_id VARCHAR(20) NOT NULL,
+            product_id VARCHAR(20) NOT NULL,
+            amount DECIMAL(18, 2) NOT NULL,
+            purchase_date DATE NOT NULL,
+            term INT NOT NULL COMMENT '天数',
+            maturity_date DATE NOT NULL,
+            status VARCHAR(20) NOT NULL COMMENT '持有中/已到期/已赎回/已违约',
+            channel VARCHAR(20),
+            expected_return DECIMAL(10, 6),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            INDEX idx_account_id (account_id),
+            INDEX idx_product_id (product_id),
+            INDEX idx_status (status),
+            CONSTRAINT fk_investment_record_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id),
+            CONSTRAINT fk_investment_record_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='理财记录表';
+    """,
+    'product': """
+        CREATE TABLE IF NOT EXISTS product (
+            product_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            type VARCHAR(50) NOT NULL COMMENT '存款产品/贷款产品/理财产品',
+            interest_rate DECIMAL(10, 6),
+            term INT,
+            expected_return DECIMAL(10, 6),
+            risk_level VARCHAR(10),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_type (type)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='产品表';
+    """,
+    'customer_event': """
+        CREATE TABLE IF NOT EXISTS customer_event (
+            event_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            event_type VARCHAR(50) NOT NULL COMMENT '登录/查询/交易/咨询/购买/投诉/反馈',
+            event_channel VARCHAR(20) NOT NULL COMMENT 'app/online_banking/branch/call_center/atm/wechat/work_wechat',
+            event_datetime DATETIME NOT NULL,
+            event_result VARCHAR(20) NOT NULL COMMENT '成功/处理中/失败/取消',
+            product_id VARCHAR(20),
+            details VARCHAR(255),
+            is_vip_event BOOLEAN,
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            INDEX idx_event_type (event_type),
+            INDEX idx_event_datetime (event_datetime),
+            CONSTRAINT fk_customer_event_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='客户事件表';
+    """,
+    'app_user': """
+        CREATE TABLE IF NOT EXISTS app_user (
+            app_user_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            registration_date DATE NOT NULL,
+            last_login_date DATE,
+            device_os VARCHAR(20),
+            device_type VARCHAR(20),
+            device_model VARCHAR(50),
+            activity_level VARCHAR(20),
+            used_features TEXT,
+            login_frequency INT,
+            push_notification BOOLEAN,
+            app_version VARCHAR(20),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            CONSTRAINT fk_app_user_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='APP用户表';
+    """,
+    'wechat_follower': """
+        CREATE TABLE IF NOT EXISTS wechat_follower (
+            follower_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            follow_date DATE NOT NULL,
+            last_read_date DATE,
+            interaction_level VARCHAR(20),
+            reading_frequency INT,
+            reading_unit VARCHAR(20),
+            has_participated_campaign BOOLEAN,
+            has_converted BOOLEAN,
+            is_subscribed BOOLEAN NOT NULL,
+            source VARCHAR(20),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            CONSTRAINT fk_wechat_follower_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='公众号粉丝表';
+    """,
+    'work_wechat_contact': """
+        CREATE TABLE IF NOT EXISTS work_wechat_contact (
+            contact_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            manager_id VARCHAR(20) NOT NULL,
+            add_date DATE NOT NULL,
+            last_contact_date DATE,
+            contact_frequency VARCHAR(20),
+            days_between_contacts INT,
+            tags TEXT,
+            remark VARCHAR(100),
+            is_group_chat_member BOOLEAN,
+            priority_level VARCHAR(20),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            INDEX idx_manager_id (manager_id),
+            CONSTRAINT fk_work_wechat_contact_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='企业微信联系人表';
+    """,
+    'bank_manager': """
+        CREATE TABLE IF NOT EXISTS bank_manager (
+            manager_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            branch_id VARCHAR(20) NOT NULL,
+            phone VARCHAR(20),
+            email VARCHAR(100),
+            customer_count INT,
+            position VARCHAR(50),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_branch_id (branch_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='银行经理表';
+    """,
+    'channel_profile': """
+        CREATE TABLE IF NOT EXISTS channel_profile (
+            profile_id VARCHAR(20) PRIMARY KEY,
+            customer_id VARCHAR(20) NOT NULL,
+            channels_count INT NOT NULL,
+            channels_used TEXT NOT NULL,
+            primary_channel VARCHAR(20) NOT NULL,
+            secondary_channel VARCHAR(20),
+            channel_frequency TEXT,
+            channel_scores TEXT,
+            last_active_days TEXT,
+            conversion_rate DECIMAL(5,4),
+            last_updated DATE,
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_customer_id (customer_id),
+            CONSTRAINT fk_channel_profile_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='全渠道档案表';
+    """,
+    'deposit_type': """
+        CREATE TABLE IF NOT EXISTS deposit_type (
+            deposit_type_id VARCHAR(20) PRIMARY KEY,
+            name VARCHAR(50) NOT NULL,
+            description VARCHAR(255),
+            base_interest_rate DECIMAL(10, 6) NOT NULL,
+            min_term INT,
+            max_term INT,
+            min_amount DECIMAL(18, 2),
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_name (name)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='存款类型表';
+    """,
+    'data_generation_log': """
+        CREATE TABLE IF NOT EXISTS data_generation_log (
+            log_id VARCHAR(20) PRIMARY KEY,
+            generation_mode VARCHAR(20) NOT NULL COMMENT '历史/实时',
+            start_time DATETIME NOT NULL,
+            end_time DATETIME,
+            start_date DATE,
+            end_date DATE,
+            status VARCHAR(20) NOT NULL COMMENT '运行中/成功/失败/中断',
+            records_generated INT,
+            details TEXT,
+            create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
+            update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+            INDEX idx_generation_mode (generation_mode),
+            INDEX idx_status (status),
+            INDEX idx_start_date (start_date),
+            INDEX idx_end_date (end_date),
+            INDEX idx_mode_status_end_time (generation_mode, status, end_time)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='数据生成日志表';
+    """
+}
+
+
 class DatabaseManager:
     """数据库管理类，负责数据库连接和操作"""
     
+    # 日志写缓冲的刷新条件：缓冲的运行中状态最长延迟秒数、缓冲的日志条数
+    _LOG_FLUSH_INTERVAL = 2.0
+    _LOG_FLUSH_SIZE = 50
+    
+    # 数据生成日志的固定upsert语句，可选字段未提供时绑定NULL，已有记录保留原值
+    _LOG_UPSERT_SQL = """
+    INSERT INTO data_generation_log
+    (log_id, generation_mode, start_time, status, records_generated, start_date, end_date, end_time, details)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        generation_mode = VALUES(generation_mode),
+        start_time = VALUES(start_time),
+        status = VALUES(status),
+        records_generated = VALUES(records_generated),
+        start_date = COALESCE(VALUES(start_date), start_date),
+        end_date = COALESCE(VALUES(end_date), end_date),
+        end_time = COALESCE(VALUES(end_time), end_time),
+        details = COALESCE(VALUES(details), details)
+    """
+    
     def __init__(self, db_type: str = 'mysql'):
         """
         初始化数据库管理器
@@ -33,9 +435,51 @@ class DatabaseManager:
         self.config_manager = get_config_manager()
         self.logger = get_logger('database_manager')
         
-        # 数据库连接
+        # 数据库连接（主会话连接，会话级设置和事务都在该连接上进行）
         self.connection = None
         
+        # 连接池，供并发/流式等独立于主会话的操作使用，首次使用时创建
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        
+        # SQLAlchemy 引擎，仅在 write_dataframe 首次调用时创建
+        self._engine = None
+        
+        # 服务端允许的最大数据包大小，连接时读取，用于控制多行INSERT的语句长度
+        self._max_allowed_packet = _DEFAULT_MAX_ALLOWED_PACKET
+        
+        # 表列名缓存和预生成的 INSERT ... ON DUPLICATE KEY UPDATE 模板
+        self._table_columns: Dict[str, List[str]] = {}
+        self._upsert_templates: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+        
+        # 导入用的INSERT模板，以及按行数展开后的多行INSERT语句
+        self._insert_sql_cache: Dict[Tuple[str, Tuple[str, ...], bool], str] = {}
+        self._multirow_sql_cache: Dict[Tuple[str, int], str] = {}
+        
+        # 主连接上按SQL文本缓存的服务端预处理游标，重新连接时清空
+        self._prepared_cursors: Dict[str, Any] = {}
+        
+        # 每张表的索引定义（索引名 -> 按顺序排列的列名），执行DDL后失效
+        self._indexes: Dict[str, Dict[str, List[str]]] = {}
+        
+        # DESCRIBE 表结构缓存，执行DDL后失效
+        self._structure_cache: Dict[str, List[Dict]] = {}
+        
+        # 当前库中全部表名的快照，首次检查时读取，执行DDL后失效
+        self._table_set: Optional[set] = None
+        
+        # 数据生成日志写缓冲（log_id -> upsert参数），遇到结束状态时或由定时器在
+        # _LOG_FLUSH_INTERVAL 秒内合并写入；锁同时串行化缓冲修改和写入，保证同一日志按顺序落库
+        self._log_buffer: Dict[str, Tuple] = {}
+        self._log_lock = threading.RLock()
+        self._log_timer: Optional[threading.Timer] = None
+        # 已经写入过数据库的日志ID，新日志的第一条记录立即写入
+        self._written_log_ids: set = set()
+        atexit.register(self.flush_logs)
+        
+        # 显式事务嵌套深度，大于0时 execute_* 不再逐条提交
+        self._transaction_depth = 0
+        
         # SQL脚本目录
         current_file = os.path.abspath(__file__)
         project_root = os.path.dirname(os.path.dirname(current_file))
@@ -73,21 +517,13 @@ class DatabaseManager:
             db_config = self.config_manager.get_db_config(self.db_type)
             self.logger.info(f"正在连接到 {self.db_type} 数据库: {db_config.get('host')}:{db_config.get('port', '3306')}...")
             
-            self.connection = mysql.connector.connect(
-                host=db_config.get('host'),
-                user=db_config.get('user'),
-                password=db_config.get('password'),
-                database=db_config.get('database'),
-                port=int(db_config.get('port', 3306)),
-                charset=db_config.get('charset', 'utf8mb4'),
-                use_pure=True,
-                connection_timeout=int(db_config.get('timeout', 10)),
-                autocommit=True
-            )
+            self.connection = mysql.connector.connect(**self._connection_kwargs())
+            self._prepared_cursors = {}
             
             if self.connection.is_connected():
                 db_info = self.connection.get_server_info()
                 self.logger.info(f"成功连接到MySQL数据库，版本: {db_info}")
+                self._max_allowed_packet = self._read_max_allowed_packet()
                 return True
             else:
                 self.logger.error("数据库连接失败")
@@ -97,11 +533,293 @@ class DatabaseManager:
             self.logger.error(f"数据库连接错误: {str(e)}")
             return False
     
+    def _connection_kwargs(self) -> Dict[str, Any]:
+        """
+        根据配置构建连接参数，主连接和连接池共用
+        
+        Returns:
+            mysql.connector 连接参数字典
+        """
+        db_config = self.config_manager.get_db_config(self.db_type)
+        return {
+            'host': db_config.get('host'),
+            'user': db_config.get('user'),
+            'password': db_config.get('password'),
+            'database': db_config.get('database'),
+            'port': int(db_config.get('port', 3306)),
+            'charset': db_config.get('charset', 'utf8mb4'),
+            # C扩展可用时默认用它解析协议，可通过配置 use_pure = true 强制使用纯Python实现；
+            # 未安装C扩展时总是使用纯Python实现，否则连接时会抛出 ImportError
+            'use_pure': self._db_flag('use_pure') or not _HAVE_CEXT,
+            'connection_timeout': int(db_config.get('timeout', 10)),
+            'autocommit': True,
+            # LOAD DATA LOCAL INFILE 需要客户端显式允许，服务端也需开启 local_infile
+            'allow_local_infile': self._db_flag('allow_local_infile'),
+            # 跨广域网访问时可开启协议压缩，减少行数据传输量
+            'compress': self._db_flag('compress'),
+            'consume_results': self._db_flag('consume_results', True),
+            'raise_on_warnings': self._db_flag('raise_on_warnings'),
+            'get_warnings': self._db_flag('get_warnings'),
+            # 短查询默认缓冲结果；大结果集使用 execute_query_stream 的非缓冲游标
+            'buffered': self._db_flag('buffered', True)
+        }
+    
+    def _db_flag(self, key: str, default: bool = False) -> bool:
+        """
+        读取数据库配置中的布尔开关
+        
+        Args:
+            key: 配置项名称
+            default: 未配置时的默认值
+            
+        Returns:
+            开关值
+        """
+        value = self.config_manager.get_db_config(self.db_type).get(key)
+        if value is None:
+            return default
+        return str(value).lower() in ('1', 'true', 'yes', 'on')
+    
+    @property
+    def local_infile_enabled(self) -> bool:
+        """是否允许使用 LOAD DATA LOCAL INFILE 批量导入"""
+        return self._db_flag('allow_local_infile')
+    
+    def _get_pool(self) -> pooling.MySQLConnectionPool:
+        """
+        获取连接池，首次调用时创建
+        
+        Returns:
+            连接池对象
+        """
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    db_config = self.config_manager.get_db_config(self.db_type)
+                    pool_size = int(db_config.get('pool_size', 8))
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_name=f"bank_sim_{self.db_type}",
+                        pool_size=pool_size,
+                        **self._connection_kwargs()
+                    )
+                    self.logger.info(f"数据库连接池已创建，大小: {pool_size}")
+        return self._pool
+    
+    @contextmanager
+    def pooled_connection(self) -> Iterator[MySQLConnection]:
+        """
+        从连接池借出一个独立连接，退出时归还
+        
+        主连接承载会话级设置（如 FOREIGN_KEY_CHECKS）和事务，因此常规的
+        execute_* 方法仍使用主连接；需要并行执行或长时间占用连接的操作
+        应通过该方法获取独立连接。
+        
+        Yields:
+            数据库连接
+        """
+        conn = self._get_pool().get_connection()
+        try:
+            yield conn
+        finally:
+            # 对池化连接调用close()会将其归还连接池
+            conn.close()
+    
+    @contextmanager
+    def transaction(self) -> Iterator[MySQLConnection]:
+        """
+        在主连接上开启显式事务，退出时统一提交，异常时回滚
+        
+        事务内的 execute_update / execute_many / execute_many_multirow 不再逐条
+        提交，批量导入应写成::
+        
+            with db_manager.transaction():
+                db_manager.execute_many(sql, batch_data)
+        
+        支持嵌套，只有最外层负责提交或回滚。
+        
+        Yields:
+            数据库连接
+        """
+        if not self.connect():
+            raise Exception("无法连接到数据库")
+        
+        outermost = self._transaction_depth == 0
+        if outermost:
+            self.connection.autocommit = False
+        self._transaction_depth += 1
+        
+        try:
+            yield self.connection
+            if outermost:
+                self.connection.commit()
+        except Exception:
+            if outermost:
+                self.logger.error("事务执行出错，正在回滚")
+                self.connection.rollback()
+            raise
+        finally:
+            self._transaction_depth -= 1
+            if outermost and self.connection.is_connected():
+                self.connection.autocommit = True
+    
+    @contextmanager
+    def bulk_load_mode(self, disable_binlog: bool = False) -> Iterator[MySQLConnection]:
+        """
+        在主连接会话中关闭唯一性检查和外键检查，用于导入可信的生成数据
+        
+        退出时恢复进入前的会话设置。所有表均为InnoDB，ALTER TABLE ... DISABLE KEYS
+        仅对MyISAM生效，因此这里不做处理。
+        
+        Args:
+            disable_binlog: 是否同时关闭本会话的二进制日志（需要SUPER或SYSTEM_VARIABLES_ADMIN权限）
+            
+        Yields:
+            数据库连接
+        """
+        if not self.connect():
+            raise Exception("无法连接到数据库")
+        
+        previous = self.execute_query(
+            "SELECT @@SESSION.unique_checks AS unique_checks, "
+            "@@SESSION.foreign_key_checks AS foreign_key_checks, "
+            "@@SESSION.sql_log_bin AS sql_log_bin"
+        )[0]
+        
+        self.execute_update("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+        if disable_binlog:
+            self.execute_update("SET SESSION sql_log_bin = 0")
+        self.logger.info("已进入批量导入模式（关闭唯一性检查和外键检查）")
+        
+        try:
+            yield self.connection
+        finally:
+            if self.connection is not None and self.connection.is_connected():
+                self.execute_update(
+                    "SET SESSION unique_checks = %s, foreign_key_checks = %s",
+                    (int(previous['unique_checks']), int(previous['foreign_key_checks']))
+                )
+                if disable_binlog:
+                    self.execute_update("SET SESSION sql_log_bin = %s", (int(previous['sql_log_bin']),))
+            self.logger.info("已退出批量导入模式")
+    
+    def _commit(self) -> None:
+        """提交当前语句；处于显式事务中时由 transaction() 统一提交"""
+        if self._transaction_depth == 0:
+            self.connection.commit()
+    
+    def _rollback(self) -> None:
+        """回滚当前语句；处于显式事务中时由 transaction() 统一回滚"""
+        if self.connection and self._transaction_depth == 0:
+            self.connection.rollback()
+    
+    def _read_max_allowed_packet(self) -> int:
+        """
+        读取服务端的 max_allowed_packet 配置
+        
+        Returns:
+            最大数据包字节数，读取失败时返回默认值
+        """
+        cursor = None
+        try:
+            cursor = self.connection.cursor()
+            cursor.execute("SHOW VARIABLES LIKE 'max_allowed_packet'")
+            row = cursor.fetchone()
+            return int(row[1]) if row else _DEFAULT_MAX_ALLOWED_PACKET
+        except Error as e:
+            self.logger.warning(f"读取max_allowed_packet失败，使用默认值: {str(e)}")
+            return _DEFAULT_MAX_ALLOWED_PACKET
+        finally:
+            if cursor:
+                cursor.close()
+    
     def disconnect(self) -> None:
         """关闭数据库连接"""
         if self.connection is not None and self.connection.is_connected():
+            self.flush_logs()
             self.connection.close()
             self.logger.info("数据库连接已关闭")
+        
+        if self._pool is not None:
+            with self._pool_lock:
+                self._pool._remove_connections()
+                self._pool = None
+            self.logger.info("数据库连接池已关闭")
+        
+        if self._engine is not None:
+            self._engine.dispose()
+            self._engine = None
+    
+    def _get_engine(self):
+        """
+        获取SQLAlchemy引擎，首次调用时按数据库配置创建
+        
+        Returns:
+            sqlalchemy.engine.Engine 对象
+        """
+        if self._engine is None:
+            # 可选依赖，只在需要时导入
+            from sqlalchemy import create_engine
+            from sqlalchemy.engine import URL
+            
+            kwargs = self._connection_kwargs()
+            url = URL.create(
+                'mysql+mysqlconnector',
+                username=kwargs['user'],
+                password=kwargs['password'],
+                host=kwargs['host'],
+                port=kwargs['port'],
+                database=kwargs['database'],
+                query={'charset': kwargs['charset']}
+            )
+            self._engine = create_engine(url, connect_args={'use_pure': kwargs['use_pure']})
+        return self._engine
+    
+    def write_dataframe(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append',
+                        chunksize: int = 1000) -> int:
+        """
+        通过 DataFrame.to_sql(method='multi') 写入数据，按chunksize生成多行INSERT
+        
+        使用独立的SQLAlchemy连接，不参与 transaction() 事务，也不继承
+        bulk_load_mode() 的会话设置。未安装sqlalchemy时回退到 import_dataframe。
+        
+        Args:
+            df: DataFrame对象
+            table_name: 表名
+            if_exists: 表已存在时的处理方式，同 DataFrame.to_sql
+            chunksize: 每条INSERT语句包含的行数
+            
+        Returns:
+            写入的记录数
+        """
+        if df.empty:
+            self.logger.warning(f"DataFrame为空，没有数据需要写入表 {table_name}")
+            return 0
+        
+        try:
+            engine = self._get_engine()
+        except ImportError:
+            self.logger.warning("未安装sqlalchemy，改用 import_dataframe 写入")
+            return self.import_dataframe(table_name, df, batch_size=chunksize)
+        
+        start_time = time.time()
+        df.to_sql(table_name, engine, if_exists=if_exists, index=False,
+                  method='multi', chunksize=chunksize)
+        
+        elapsed_time = time.time() - start_time
+        self.logger.debug(f"DataFrame写入表 {table_name} 完成，耗时: {elapsed_time:.3f}秒，共 {len(df)} 行")
+        return len(df)
+    
+    def serialize_json(self, obj: Any) -> str:
+        """
+        将对象序列化为写入TEXT列的JSON字符串
+        
+        Args:
+            obj: 待序列化对象，无法直接序列化的值转为字符串
+            
+        Returns:
+            JSON字符串
+        """
+        return _dumps(obj)
     
     def execute_query(self, query: str, params: Optional[Union[Dict, List, Tuple]] = None) -> List[Dict]:
         """
@@ -141,10 +859,110 @@ class DatabaseManager:
             if cursor:
                 cursor.close()
     
+    def execute_query_rows(self, query: str,
+                           params: Optional[Union[Dict, List, Tuple]] = None) -> Tuple[Tuple[str, ...], List[Tuple]]:
+        """
+        执行查询SQL，以元组形式返回结果，不为每行构造字典
+        
+        适用于大结果集或只需按位置取值的查询；需要按列名访问时使用 execute_query。
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            (列名元组, 行元组列表)
+        """
+        cursor = None
+        try:
+            if not self.connect():
+                raise Exception("无法连接到数据库")
+            
+            cursor = self.connection.cursor()
+            start_time = time.time()
+            
+            if params:
+                cursor.execute(query, params)
+            else:
+                cursor.execute(query)
+            
+            rows = cursor.fetchall()
+            columns = tuple(cursor.column_names)
+            elapsed_time = time.time() - start_time
+            
+            self.logger.debug(f"查询执行完成，耗时: {elapsed_time:.3f}秒，返回 {len(rows)} 条记录")
+            return columns, rows
+        
+        except Error as e:
+            self.logger.error(f"查询执行错误: {str(e)}")
+            raise
+        
+        finally:
+            if cursor:
+                cursor.close()
+    
+    def execute_query_stream(self, query: str, params: Optional[Union[Dict, List, Tuple]] = None,
+                             arraysize: int = 10000, dictionary: bool = False) -> Iterator[List]:
+        """
+        流式执行查询，分块返回结果，内存占用与结果集大小无关
+        
+        使用非缓冲游标并从连接池借用独立连接，迭代期间不占用主连接。
+        迭代未结束前不会归还连接，调用方应完整迭代或关闭生成器。
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            arraysize: 每次 fetchmany 读取的行数
+            dictionary: 是否以字典形式返回每行
+            
+        Yields:
+            每块最多 arraysize 行的结果列表
+        """
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor(buffered=False, dictionary=dictionary)
+            try:
+                cursor.arraysize = arraysize
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                
+                while True:
+                    rows = cursor.fetchmany(arraysize)
+                    if not rows:
+                        break
+                    yield rows
+            
+            except Error as e:
+                self.logger.error(f"流式查询执行错误: {str(e)}")
+                raise
+            
+            finally:
+                # 提前结束迭代时需读完剩余结果，否则连接无法复用
+                if conn.unread_result:
+                    conn.consume_results()
+                cursor.close()
+    
+    def fetch_columns(self, query: str, params: Optional[Union[Dict, List, Tuple]] = None) -> pd.DataFrame:
+        """
+        执行查询并以列式 DataFrame 返回结果，适合按列统计分析
+        
+        Args:
+            query: SQL查询语句
+            params: 查询参数
+            
+        Returns:
+            查询结果DataFrame
+        """
+        columns, rows = self.execute_query_rows(query, params)
+        return pd.DataFrame.from_records(rows, columns=columns)
+    
     def execute_update(self, query: str, params: Optional[Union[Dict, List, Tuple]] = None) -> int:
         """
         执行更新SQL（INSERT, UPDATE, DELETE等）
         
+        支持以分号分隔的多条语句（如按业务域拼接的建表脚本），一次往返发送。
+        
         Args:
             query: SQL更新语句
             params: 更新参数
@@ -160,18 +978,31 @@ class DatabaseManager:
             cursor = self.connection.cursor()
             start_time = time.time()
             
-            # 记录SQL语句（用于调试）
-            truncated_query = query[:500] + "..." if len(query) > 500 else query
-            self.logger.debug(f"执行更新SQL: {truncated_query}")
+            # 记录SQL语句（用于调试），未开启debug时跳过截断和拼接
+            if self.logger.is_debug_enabled():
+                truncated_query = query[:500] + "..." if len(query) > 500 else query
+                self.logger.debug(f"执行更新SQL: {truncated_query}")
             
             try:
-                if params:
+                if ';' in query.strip().rstrip(';'):
+                    # 多条语句（如拼接的DDL脚本）一次发送，逐个读取结果
+                    affected_rows = 0
+                    for result in cursor.execute(query, params or (), multi=True):
+                        if result.with_rows:
+                            result.fetchall()
+                        elif result.rowcount > 0:
+                            affected_rows += result.rowcount
+                elif params:
                     cursor.execute(query, params)
+                    affected_rows = cursor.rowcount
                 else:
                     cursor.execute(query)
+                    affected_rows = cursor.rowcount
                 
-                affected_rows = cursor.rowcount
-                self.connection.commit()
+                if _DDL_RE.search(query):
+                    self._invalidate_schema()
+                
+                self._commit()
                 
                 elapsed_time = time.time() - start_time
                 self.logger.debug(f"更新执行完成，耗时: {elapsed_time:.3f}秒，影响 {affected_rows} 行")
@@ -179,73 +1010,52 @@ class DatabaseManager:
                 return affected_rows
                 
             except mysql.connector.IntegrityError as ie:
-                # 处理数据完整性错误（如主键冲突）
-                if 'Duplicate entry' in str(ie):
-                    # 检查是否包含 ON DUPLICATE KEY UPDATE
-                    if 'ON DUPLICATE KEY UPDATE' in query:
-                        # 如果是 INSERT ... ON DUPLICATE KEY UPDATE，这个错误不应该发生
-                        self.logger.error(f"带ON DUPLICATE KEY UPDATE的插入出错: {str(ie)}")
-                        self.logger.error(f"SQL: {truncated_query}")
-                        self.logger.error(f"Params: {params}")
-                        raise
-                    else:
-                        # 尝试执行更新而不是插入
-                        self.logger.warning(f"主键冲突，尝试执行更新操作: {str(ie)}")
-                        
-                        # 从错误信息中提取主键值
-                        # 预期格式: Duplicate entry 'STATUS_xxx' for key 'primary'
-                        error_parts = str(ie).split("'")
-                        if len(error_parts) > 1:
-                            primary_key_value = error_parts[1]
-                            self.logger.info(f"主键值: {primary_key_value}")
-                            
-                            # 构造更新语句（这里假设是INSERT INTO generation_status）
-                            if 'generation_status' in query:
-                                # 为了安全，只在特定表上执行这个操作
-                                try:
-                                    # 假设params是一个元组，格式为 (id, run_id, start_time, ...)
-                                    # 我们需要将其转换为更新语句。如果params结构不符合预期，这里会抛出异常
-                                    if isinstance(params, tuple) and len(params) >= 8:
-                                        update_query = """
-                                        UPDATE generation_status 
-                                        SET run_id = %s, last_update_time = %s, current_stage = %s, 
-                                            completed_stages = %s, stage_progress = %s, status = %s, details = %s 
-                                        WHERE id = %s
-                                        """
-                                        # 重新排列参数以匹配更新语句
-                                        update_params = (params[1], params[3], params[4], 
-                                                         params[5], params[6], params[7], 
-                                                         params[8] if len(params) > 8 else '', primary_key_value)
-                                        
-                                        # 执行更新
-                                        cursor = self.connection.cursor()
-                                        cursor.execute(update_query, update_params)
-                                        affected_rows = cursor.rowcount
-                                        self.connection.commit()
-                                        
-                                        self.logger.info(f"成功将插入转换为更新，影响 {affected_rows} 行")
-                                        return affected_rows
-                                except Exception as convert_error:
-                                    self.logger.error(f"尝试将插入转换为更新时出错: {str(convert_error)}")
-                
-                # 如果无法转换或其他完整性错误，回滚并抛出异常
-                self.connection.rollback()
+                # 数据完整性错误（如主键冲突）直接回滚并抛出；需要覆盖写入的场景请使用 upsert_many
+                match = _DUPLICATE_ENTRY_RE.search(str(ie)) if ie.errno == 1062 else None
+                if match:
+                    self.logger.error(f"主键/唯一键冲突: 值 {match.group(1)}，索引 {match.group(2)}")
+                else:
+                    self.logger.error(f"数据完整性错误: {str(ie)}")
+                self.logger.error(f"SQL: {query[:500] + '...' if len(query) > 500 else query}")
+                self._rollback()
                 raise
         
         except Error as e:
             self.logger.error(f"更新执行错误: {str(e)}")
-            if self.connection:
-                self.connection.rollback()
+            self._rollback()
             raise
         
         finally:
             if cursor:
                 cursor.close()
     
+    def prepared_cursor(self, query: str):
+        """
+        获取主连接上该SQL的服务端预处理游标，同一连接内按SQL文本复用
+        
+        服务端只在首次执行时解析语句，之后每次只传输绑定参数。
+        
+        Args:
+            query: SQL语句
+            
+        Returns:
+            预处理游标
+        """
+        cursor = self._prepared_cursors.get(query)
+        if cursor is None:
+            # 预处理游标不支持缓冲模式，需显式关闭以免继承连接的 buffered 设置
+            cursor = self.connection.cursor(prepared=True, buffered=False)
+            self._prepared_cursors[query] = cursor
+        return cursor
+    
     def execute_many(self, query: str, params_list: List[Union[Dict, List, Tuple]]) -> int:
         """
         批量执行SQL（适用于大量数据插入）
         
+        INSERT ... VALUES 语句使用普通游标，由驱动改写为一条多行INSERT，一次往返；
+        预处理游标的 executemany 会逐行执行，因此只用于位置参数的其他DML（如UPDATE、DELETE），
+        按SQL缓存复用。字典参数不支持预处理，同样使用普通游标。
+        
         Args:
             query: SQL语句
             params_list: 参数列表
@@ -254,16 +1064,18 @@ class DatabaseManager:
             受影响的行数
         """
         cursor = None
+        prepared = (bool(params_list) and not isinstance(params_list[0], dict)
+                    and not _INSERT_VALUES_RE.match(query))
         try:
             if not self.connect():
                 raise Exception("无法连接到数据库")
             
-            cursor = self.connection.cursor()
+            cursor = self.prepared_cursor(query) if prepared else self.connection.cursor()
             start_time = time.time()
             
             cursor.executemany(query, params_list)
             affected_rows = cursor.rowcount
-            self.connection.commit()
+            self._commit()
             
             elapsed_time = time.time() - start_time
             self.logger.debug(f"批量执行完成，耗时: {elapsed_time:.3f}秒，影响 {affected_rows} 行")
@@ -272,42 +1084,363 @@ class DatabaseManager:
         
         except Error as e:
             self.logger.error(f"批量执行错误: {str(e)}")
-            if self.connection:
-                self.connection.rollback()
+            self._rollback()
+            if prepared and cursor is not None:
+                # 出错的预处理游标状态不可控，丢弃后下次重新预处理
+                self._prepared_cursors.pop(query, None)
+                cursor.close()
+            raise
+        
+        finally:
+            if cursor and not prepared:
+                cursor.close()
+    
+    def execute_many_multirow(self, query: str, params_list: List[Union[List, Tuple]],
+                              chunk_size: int = 1000) -> int:
+        """
+        将单行INSERT改写为多行 INSERT ... VALUES (...),(...) 批量执行
+        
+        每个分块只需一次网络往返和一次语句解析。分块大小同时受 chunk_size
+        和服务端 max_allowed_packet 限制。非INSERT语句回退到 execute_many。
+        
+        Args:
+            query: 单行INSERT语句，如 INSERT INTO t (a, b) VALUES (%s, %s)
+            params_list: 参数列表，每个元素为一行的参数序列
+            chunk_size: 每条语句最多包含的行数
+            
+        Returns:
+            受影响的行数
+        """
+        if not _INSERT_VALUES_RE.match(query):
+            return self.execute_many(query, params_list)
+        
+        if not params_list:
+            return 0
+        
+        rows_per_chunk = self._rows_per_packet(params_list, chunk_size)
+        
+        cursor = None
+        try:
+            if not self.connect():
+                raise Exception("无法连接到数据库")
+            
+            cursor = self.connection.cursor()
+            start_time = time.time()
+            affected_rows = 0
+            
+            for i in range(0, len(params_list), rows_per_chunk):
+                chunk = params_list[i:i + rows_per_chunk]
+                sql = self._multirow_sql(query, len(chunk))
+                flat_params = [value for row in chunk for value in row]
+                cursor.execute(sql, flat_params)
+                affected_rows += cursor.rowcount
+            
+            self._commit()
+            
+            elapsed_time = time.time() - start_time
+            self.logger.debug(f"多行插入执行完成，耗时: {elapsed_time:.3f}秒，影响 {affected_rows} 行")
+            
+            return affected_rows
+        
+        except Error as e:
+            self.logger.error(f"多行插入执行错误: {str(e)}")
+            self._rollback()
             raise
         
         finally:
             if cursor:
                 cursor.close()
     
-    def table_exists(self, table_name: str) -> bool:
+    def _multirow_sql(self, query: str, row_count: int) -> str:
         """
-        检查表是否存在
+        将单行INSERT展开为包含 row_count 行的多行INSERT，按 (语句, 行数) 缓存
+        
+        同一模板的整批语句文本完全相同，服务端可复用解析结果。
+        
+        Args:
+            query: 单行INSERT语句
+            row_count: 行数
+            
+        Returns:
+            多行INSERT语句
+        """
+        key = (query, row_count)
+        sql = self._multirow_sql_cache.get(key)
+        if sql is None:
+            match = _INSERT_VALUES_RE.match(query)
+            prefix, row_placeholder = match.group(1), match.group(2)
+            suffix = match.group(3) or ''  # ON DUPLICATE KEY UPDATE 子句放在全部VALUES之后
+            sql = prefix + ", ".join([row_placeholder] * row_count) + suffix
+            self._multirow_sql_cache[key] = sql
+        return sql
+    
+    def _rows_per_packet(self, params_list: List[Union[List, Tuple]], chunk_size: int) -> int:
+        """
+        根据 max_allowed_packet 估算单条多行INSERT可容纳的行数
+        
+        Args:
+            params_list: 参数列表
+            chunk_size: 行数上限
+            
+        Returns:
+            每条语句的行数
+        """
+        # 取前几行估算单行字节数，每个值额外计入引号、逗号等开销
+        sample = params_list[:10]
+        row_bytes = max(sum(len(str(v)) + 4 for v in row) for row in sample) + 4
+        # 预留一半空间给SQL前缀和转义膨胀
+        budget = self._max_allowed_packet // 2
+        return max(1, min(chunk_size, budget // row_bytes))
+    
+    def lookup_by_keys(self, table_name: str, key_column: str, values: Iterable[Any],
+                       select_columns: Optional[List[str]] = None,
+                       chunk_size: int = 1000) -> Dict[Any, Dict]:
+        """
+        按键值批量查询记录，N个键只需 ceil(N / chunk_size) 次往返
+        
+        按主键或唯一键取多条记录时应使用该方法，而不是逐条调用 execute_query。
         
         Args:
             table_name: 表名
+            key_column: 键列名
+            values: 键值集合，重复值只查询一次
+            select_columns: 查询的列，默认全部列
+            chunk_size: 每条语句 IN 列表中的最大键数，同时受 max_allowed_packet 限制
             
         Returns:
-            表是否存在
+            键值到记录字典的映射，不存在的键不出现在结果中
+        """
+        keys = [(value,) for value in dict.fromkeys(values)]
+        if not keys:
+            return {}
+        
+        table = self._safe_ident(table_name)
+        key = self._safe_ident(key_column, table_name)
+        if select_columns:
+            columns = list(select_columns)
+            if key_column not in columns:
+                columns.append(key_column)
+            columns_str = ', '.join(self._safe_ident(column, table_name) for column in columns)
+        else:
+            columns_str = '*'
+        
+        keys_per_chunk = self._rows_per_packet(keys, chunk_size)
+        result = {}
+        for i in range(0, len(keys), keys_per_chunk):
+            chunk = [key[0] for key in keys[i:i + keys_per_chunk]]
+            placeholders = ', '.join(['%s'] * len(chunk))
+            query = f"SELECT {columns_str} FROM {table} WHERE {key} IN ({placeholders})"
+            for row in self.execute_query(query, chunk):
+                result[row[key_column]] = row
+        return result
+    
+    def bulk_load_csv(self, table_name: str, columns: List[str], rows_iter: Iterable[Sequence[Any]]) -> int:
+        """
+        通过 LOAD DATA LOCAL INFILE 批量导入数据，适用于交易流水等大表
+        
+        数据先写入临时CSV文件再由服务端一次性加载（mysql.connector 只接受文件路径，
+        不支持直接传入内存流）。需要在数据库配置中设置 allow_local_infile = true，
+        且服务端开启 local_infile。
+        
+        Args:
+            table_name: 表名
+            columns: 列名列表，与每行数据的顺序一致
+            rows_iter: 行数据迭代器，每行为与columns对应的值序列
+            
+        Returns:
+            导入的记录数
         """
+        if not self.connect():
+            raise Exception("无法连接到数据库")
+        
+        # 表名和列名在写临时文件之前按白名单校验
+        table_ident = self._safe_ident(table_name)
+        column_list = ', '.join(self._safe_ident(column, table_name) for column in columns)
+        
+        fd, csv_path = tempfile.mkstemp(prefix=f"{table_name}_", suffix='.csv')
+        cursor = None
         try:
-            db_config = self.config_manager.get_db_config(self.db_type)
-            database = db_config.get('database')
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                for row in rows_iter:
+                    f.write(','.join(map(_csv_field, row)))
+                    f.write('\n')
+            
+            # 字段统一用双引号包裹，字段内的双引号写成两个；未包裹的 NULL 读为空值
+            sql = (
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_ident} CHARACTER SET utf8mb4 "
+                "FIELDS TERMINATED BY ',' ENCLOSED BY '\"' ESCAPED BY '' "
+                f"LINES TERMINATED BY '\\n' ({column_list})"
+            )
+            
+            cursor = self.connection.cursor()
+            start_time = time.time()
+            cursor.execute(sql, (csv_path,))
+            affected_rows = cursor.rowcount
+            self._commit()
+            
+            elapsed_time = time.time() - start_time
+            self.logger.debug(f"LOAD DATA 导入完成，耗时: {elapsed_time:.3f}秒，影响 {affected_rows} 行")
+            
+            return affected_rows
+        
+        except Error as e:
+            self.logger.error(f"LOAD DATA 导入表 {table_name} 时出错: {str(e)}")
+            self._rollback()
+            raise
+        
+        finally:
+            if cursor:
+                cursor.close()
+            os.remove(csv_path)
+    
+    def get_table_columns(self, table_name: str) -> List[str]:
+        """
+        获取表的列名列表（按定义顺序），结果在进程内缓存
+        
+        Args:
+            table_name: 表名
             
+        Returns:
+            列名列表
+        """
+        if table_name not in self._table_columns:
+            database = self.config_manager.get_db_config(self.db_type).get('database')
             query = """
-            SELECT COUNT(*) as count 
-            FROM information_schema.tables 
+            SELECT column_name
+            FROM information_schema.columns
             WHERE table_schema = %s AND table_name = %s
+            ORDER BY ordinal_position
             """
-            params = (database, table_name)
+            _, rows = self.execute_query_rows(query, (database, table_name))
+            self._table_columns[table_name] = [row[0] for row in rows]
+        return self._table_columns[table_name]
+    
+    def _build_upsert_template(self, table_name: str, columns: Optional[Tuple[str, ...]] = None) -> str:
+        """
+        生成并缓存表的 INSERT ... ON DUPLICATE KEY UPDATE 单行模板
+        
+        Args:
+            table_name: 表名
+            columns: 写入的列，默认为表的全部列
+            
+        Returns:
+            SQL模板，可直接交给 execute_many_multirow 展开为多行
+        """
+        if columns is None:
+            columns = tuple(self.get_table_columns(table_name))
+        key = (table_name, columns)
+        
+        template = self._upsert_templates.get(key)
+        if template is None:
+            pk = self.tables_info.get(table_name, {}).get('pk')
+            placeholders = ', '.join(['%s'] * len(columns))
+            updates = ', '.join(f"{col} = VALUES({col})" for col in columns if col != pk)
+            template = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+            if updates:
+                template += f" ON DUPLICATE KEY UPDATE {updates}"
+            self._upsert_templates[key] = template
+        return template
+    
+    def upsert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> int:
+        """
+        批量插入或更新记录（主键冲突时更新其余列），一批一次往返
+        
+        Args:
+            table_name: 表名
+            rows: 记录列表，以第一条记录中属于该表的字段作为写入列
             
-            result = self.execute_query(query, params)
-            return result[0]['count'] > 0
+        Returns:
+            受影响的行数
+        """
+        if not rows:
+            return 0
+        
+        table_columns = set(self.get_table_columns(table_name))
+        columns = tuple(col for col in rows[0].keys() if col in table_columns)
+        sql = self._build_upsert_template(table_name, columns)
+        params = [tuple(map(row.get, columns)) for row in rows]
+        return self.execute_many_multirow(sql, params)
+    
+    def _refresh_schema(self) -> set:
+        """
+        读取当前库中的全部表名，作为表存在性检查的快照
+        
+        Returns:
+            表名集合
+        """
+        _, rows = self.execute_query_rows(
+            "SELECT table_name FROM information_schema.tables WHERE table_schema = DATABASE()")
+        self._table_set = {row[0] for row in rows}
+        return self._table_set
+    
+    def _invalidate_schema(self) -> None:
+        """执行DDL后清空表快照和依赖表结构的缓存"""
+        self._table_set = None
+        self._table_columns.clear()
+        self._upsert_templates.clear()
+        self._insert_sql_cache.clear()
+        self._structure_cache.clear()
+        self._indexes.clear()
+    
+    def table_exists(self, table_name: str) -> bool:
+        """
+        检查表是否存在
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            表是否存在
+        """
+        try:
+            table_set = self._table_set if self._table_set is not None else self._refresh_schema()
+            return table_name in table_set
         
         except Exception as e:
             self.logger.error(f"检查表是否存在时出错: {str(e)}")
             return False
     
+    def existing_tables(self, table_names: List[str]) -> set:
+        """
+        检查多张表是否存在，最多一次查询
+        
+        Args:
+            table_names: 表名列表
+            
+        Returns:
+            已存在的表名集合
+        """
+        if not table_names:
+            return set()
+        
+        table_set = self._table_set if self._table_set is not None else self._refresh_schema()
+        return table_set.intersection(table_names)
+    
+    def _safe_ident(self, name: str, table_name: Optional[str] = None) -> str:
+        """
+        按白名单校验标识符并返回反引号形式，用于需要拼接到SQL中的表名和列名
+        
+        Args:
+            name: 表名或列名
+            table_name: 为列名时所属的表名；为空时 name 按表名校验
+            
+        Returns:
+            加反引号的标识符
+            
+        Raises:
+            ValueError: 标识符不在当前库的表或列中
+        """
+        if table_name is None:
+            table_set = self._table_set if self._table_set is not None else self._refresh_schema()
+            valid = name in table_set
+        else:
+            valid = name in self.get_table_columns(table_name)
+        
+        if not valid:
+            kind = '表名' if table_name is None else f"表 {table_name} 的列名"
+            raise ValueError(f"非法的{kind}: {name}")
+        return f"`{name}`"
+    
     def create_tables(self) -> bool:
         """
         创建所有表
@@ -320,16 +1453,28 @@ class DatabaseManager:
             self.logger.warning(f"SQL目录不存在: {self.sql_dir}，将使用内置SQL创建表")
             return self._create_tables_with_builtin_sql()
         
+        try:
+            existing = self.existing_tables(list(self.tables_info.keys()))
+        except Exception as e:
+            self.logger.error(f"检查表是否存在时出错: {str(e)}")
+            return False
+        
+        # 并行预读待创建表的SQL文件；建表仍按 tables_info 顺序串行执行，保证外键引用的表先创建
+        pending = [table_name for table_name in self.tables_info.keys() if table_name not in existing]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            sql_texts = dict(zip(pending, executor.map(self._read_sql_file, pending)))
+        
         success = True
         for table_name in self.tables_info.keys():
-            sql_file = os.path.join(self.sql_dir, f"create_{table_name}.sql")
+            if table_name in existing:
+                self.logger.info(f"表 {table_name} 已存在，跳过创建")
+                continue
+            
+            sql = sql_texts[table_name]
             
             # 如果SQL文件存在，则使用文件中的SQL
-            if os.path.exists(sql_file):
+            if sql is not None:
                 try:
-                    with open(sql_file, 'r', encoding='utf-8') as f:
-                        sql = f.read()
-                    
                     self.logger.info(f"正在创建表 {table_name}...")
                     self.execute_update(sql)
                     self.logger.info(f"表 {table_name} 创建成功")
@@ -338,11 +1483,28 @@ class DatabaseManager:
                     self.logger.error(f"创建表 {table_name} 时出错: {str(e)}")
                     success = False
             else:
+                sql_file = os.path.join(self.sql_dir, f"create_{table_name}.sql")
                 self.logger.warning(f"表 {table_name} 的SQL文件不存在: {sql_file}")
-                success = self._create_table_with_builtin_sql(table_name) and success
+                success = self._create_table_with_builtin_sql(table_name, existing) and success
         
         return success
     
+    def _read_sql_file(self, table_name: str) -> Optional[str]:
+        """
+        读取表的建表SQL文件
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            SQL文本，文件不存在时返回None
+        """
+        sql_file = os.path.join(self.sql_dir, f"create_{table_name}.sql")
+        if not os.path.exists(sql_file):
+            return None
+        with open(sql_file, 'r', encoding='utf-8') as f:
+            return f.read()
+    
     def _create_tables_with_builtin_sql(self) -> bool:
         """
         使用内置的SQL创建所有表
@@ -350,311 +1512,40 @@ class DatabaseManager:
         Returns:
             是否全部创建成功
         """
+        try:
+            existing = self.existing_tables(list(self.tables_info.keys()))
+        except Exception as e:
+            self.logger.error(f"检查表是否存在时出错: {str(e)}")
+            return False
+        
         success = True
         for table_name in self.tables_info.keys():
-            success = self._create_table_with_builtin_sql(table_name) and success
+            success = self._create_table_with_builtin_sql(table_name, existing) and success
         return success
     
-    def _create_table_with_builtin_sql(self, table_name: str) -> bool:
+    def _create_table_with_builtin_sql(self, table_name: str, existing: Optional[set] = None) -> bool:
         """
         使用内置的SQL创建指定表
         
         Args:
             table_name: 表名
+            existing: 预先查询的已存在表集合，为None时单独查询
             
         Returns:
             是否创建成功
         """
-        # 表结构定义
-        table_sql = {
-            'customer': """
-                CREATE TABLE IF NOT EXISTS customer (
-                    customer_id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    id_type VARCHAR(20) NOT NULL,
-                    id_number VARCHAR(50) NOT NULL,
-                    phone VARCHAR(20),
-                    address VARCHAR(255),
-                    email VARCHAR(100),
-                    gender VARCHAR(10),
-                    birth_date DATE,
-                    registration_date DATE NOT NULL,
-                    customer_type VARCHAR(20) NOT NULL COMMENT '个人/企业',
-                    credit_score INT,
-                    is_vip BOOLEAN,
-                    branch_id VARCHAR(20),
-                    occupation VARCHAR(100),
-                    annual_income DECIMAL(18, 2),
-                    business_type VARCHAR(50),
-                    annual_revenue DECIMAL(18, 2),
-                    establishment_date DATE,
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_type (customer_type),
-                    INDEX idx_registration_date (registration_date)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='客户表';
-            """,
-            'fund_account': """
-                CREATE TABLE IF NOT EXISTS fund_account (
-                    account_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    account_type VARCHAR(20) NOT NULL COMMENT '活期账户/定期账户/贷款账户',
-                    opening_date DATE NOT NULL,
-                    balance DECIMAL(18, 2) NOT NULL,
-                    currency VARCHAR(10) NOT NULL,
-                    status VARCHAR(20) NOT NULL COMMENT '活跃/冻结/休眠/关闭',
-                    branch_id VARCHAR(20),
-                    deposit_type_id VARCHAR(20),
-                    interest_rate DECIMAL(10, 6),
-                    term INT COMMENT '月数',
-                    maturity_date DATE,
-                    loan_amount DECIMAL(18, 2),
-                    issue_date DATE,
-                    due_date DATE,
-                    remaining_payments INT,
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    INDEX idx_account_type (account_type),
-                    INDEX idx_status (status),
-                    CONSTRAINT fk_fund_account_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='资金账户表';
-            """,
-            'account_transaction': """
-                CREATE TABLE IF NOT EXISTS account_transaction (
-                    transaction_id VARCHAR(20) PRIMARY KEY,
-                    account_id VARCHAR(20) NOT NULL,
-                    transaction_type VARCHAR(20) NOT NULL COMMENT '存款/取款/转账/消费/其他',
-                    amount DECIMAL(18, 2) NOT NULL,
-                    transaction_datetime DATETIME NOT NULL,
-                    status VARCHAR(20) NOT NULL COMMENT '成功/失败/处理中/取消',
-                    description VARCHAR(255),
-                    channel VARCHAR(20) COMMENT '网银/APP/ATM/柜台/微信/支付宝',
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_account_id (account_id),
-                    INDEX idx_transaction_type (transaction_type),
-                    INDEX idx_transaction_datetime (transaction_datetime),
-                    INDEX idx_status (status),
-                    CONSTRAINT fk_account_transaction_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='资金账户流水表';
-            """,
-            'loan_record': """
-                CREATE TABLE IF NOT EXISTS loan_record (
-                    loan_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    account_id VARCHAR(20) NOT NULL,
-                    loan_type VARCHAR(50) NOT NULL COMMENT '个人消费贷/住房贷款/汽车贷款/教育贷款/小微企业贷',
-                    loan_amount DECIMAL(18, 2) NOT NULL,
-                    interest_rate DECIMAL(10, 6) NOT NULL,
-                    term INT NOT NULL COMMENT '月数',
-                    application_date DATE NOT NULL,
-                    approval_date DATE,
-                    status VARCHAR(20) NOT NULL COMMENT '申请中/已批准/已放款/还款中/已结清/逾期/拒绝',
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    INDEX idx_account_id (account_id),
-                    INDEX idx_loan_type (loan_type),
-                    INDEX idx_status (status),
-                    CONSTRAINT fk_loan_record_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id),
-                    CONSTRAINT fk_loan_record_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='借款记录表';
-            """,
-            'investment_record': """
-                CREATE TABLE IF NOT EXISTS investment_record (
-                    investment_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    account_id VARCHAR(20) NOT NULL,
-                    product_id VARCHAR(20) NOT NULL,
-                    amount DECIMAL(18, 2) NOT NULL,
-                    purchase_date DATE NOT NULL,
-                    term INT NOT NULL COMMENT '天数',
-                    maturity_date DATE NOT NULL,
-                    status VARCHAR(20) NOT NULL COMMENT '持有中/已到期/已赎回/已违约',
-                    channel VARCHAR(20),
-                    expected_return DECIMAL(10, 6),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    INDEX idx_account_id (account_id),
-                    INDEX idx_product_id (product_id),
-                    INDEX idx_status (status),
-                    CONSTRAINT fk_investment_record_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id),
-                    CONSTRAINT fk_investment_record_account FOREIGN KEY (account_id) REFERENCES fund_account (account_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='理财记录表';
-            """,
-            'product': """
-                CREATE TABLE IF NOT EXISTS product (
-                    product_id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(100) NOT NULL,
-                    type VARCHAR(50) NOT NULL COMMENT '存款产品/贷款产品/理财产品',
-                    interest_rate DECIMAL(10, 6),
-                    term INT,
-                    expected_return DECIMAL(10, 6),
-                    risk_level VARCHAR(10),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_type (type)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='产品表';
-            """,
-            'customer_event': """
-                CREATE TABLE IF NOT EXISTS customer_event (
-                    event_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    event_type VARCHAR(50) NOT NULL COMMENT '登录/查询/交易/咨询/购买/投诉/反馈',
-                    event_channel VARCHAR(20) NOT NULL COMMENT 'app/online_banking/branch/call_center/atm/wechat/work_wechat',
-                    event_datetime DATETIME NOT NULL,
-                    event_result VARCHAR(20) NOT NULL COMMENT '成功/处理中/失败/取消',
-                    product_id VARCHAR(20),
-                    details VARCHAR(255),
-                    is_vip_event BOOLEAN,
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    INDEX idx_event_type (event_type),
-                    INDEX idx_event_datetime (event_datetime),
-                    CONSTRAINT fk_customer_event_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='客户事件表';
-            """,
-            'app_user': """
-                CREATE TABLE IF NOT EXISTS app_user (
-                    app_user_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    registration_date DATE NOT NULL,
-                    last_login_date DATE,
-                    device_os VARCHAR(20),
-                    device_type VARCHAR(20),
-                    device_model VARCHAR(50),
-                    activity_level VARCHAR(20),
-                    used_features TEXT,
-                    login_frequency INT,
-                    push_notification BOOLEAN,
-                    app_version VARCHAR(20),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    CONSTRAINT fk_app_user_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='APP用户表';
-            """,
-            'wechat_follower': """
-                CREATE TABLE IF NOT EXISTS wechat_follower (
-                    follower_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    follow_date DATE NOT NULL,
-                    last_read_date DATE,
-                    interaction_level VARCHAR(20),
-                    reading_frequency INT,
-                    reading_unit VARCHAR(20),
-                    has_participated_campaign BOOLEAN,
-                    has_converted BOOLEAN,
-                    is_subscribed BOOLEAN NOT NULL,
-                    source VARCHAR(20),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    CONSTRAINT fk_wechat_follower_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='公众号粉丝表';
-            """,
-            'work_wechat_contact': """
-                CREATE TABLE IF NOT EXISTS work_wechat_contact (
-                    contact_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    manager_id VARCHAR(20) NOT NULL,
-                    add_date DATE NOT NULL,
-                    last_contact_date DATE,
-                    contact_frequency VARCHAR(20),
-                    days_between_contacts INT,
-                    tags TEXT,
-                    remark VARCHAR(100),
-                    is_group_chat_member BOOLEAN,
-                    priority_level VARCHAR(20),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    INDEX idx_manager_id (manager_id),
-                    CONSTRAINT fk_work_wechat_contact_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='企业微信联系人表';
-            """,
-            'bank_manager': """
-                CREATE TABLE IF NOT EXISTS bank_manager (
-                    manager_id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(50) NOT NULL,
-                    branch_id VARCHAR(20) NOT NULL,
-                    phone VARCHAR(20),
-                    email VARCHAR(100),
-                    customer_count INT,
-                    position VARCHAR(50),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_branch_id (branch_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='银行经理表';
-            """,
-            'channel_profile': """
-                CREATE TABLE IF NOT EXISTS channel_profile (
-                    profile_id VARCHAR(20) PRIMARY KEY,
-                    customer_id VARCHAR(20) NOT NULL,
-                    channels_count INT NOT NULL,
-                    channels_used TEXT NOT NULL,
-                    primary_channel VARCHAR(20) NOT NULL,
-                    secondary_channel VARCHAR(20),
-                    channel_frequency TEXT,
-                    channel_scores TEXT,
-                    last_active_days TEXT,
-                    conversion_rate DECIMAL(5,4),
-                    last_updated DATE,
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_customer_id (customer_id),
-                    CONSTRAINT fk_channel_profile_customer FOREIGN KEY (customer_id) REFERENCES customer (customer_id)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='全渠道档案表';
-            """,
-            'deposit_type': """
-                CREATE TABLE IF NOT EXISTS deposit_type (
-                    deposit_type_id VARCHAR(20) PRIMARY KEY,
-                    name VARCHAR(50) NOT NULL,
-                    description VARCHAR(255),
-                    base_interest_rate DECIMAL(10, 6) NOT NULL,
-                    min_term INT,
-                    max_term INT,
-                    min_amount DECIMAL(18, 2),
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_name (name)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='存款类型表';
-            """,
-            'data_generation_log': """
-                CREATE TABLE IF NOT EXISTS data_generation_log (
-                    log_id VARCHAR(20) PRIMARY KEY,
-                    generation_mode VARCHAR(20) NOT NULL COMMENT '历史/实时',
-                    start_time DATETIME NOT NULL,
-                    end_time DATETIME,
-                    start_date DATE,
-                    end_date DATE,
-                    status VARCHAR(20) NOT NULL COMMENT '运行中/成功/失败/中断',
-                    records_generated INT,
-                    details TEXT,
-                    create_time DATETIME DEFAULT CURRENT_TIMESTAMP,
-                    update_time DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
-                    INDEX idx_generation_mode (generation_mode),
-                    INDEX idx_status (status),
-                    INDEX idx_start_date (start_date),
-                    INDEX idx_end_date (end_date)
-                ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='数据生成日志表';
-            """
-        }
-        
-        if table_name not in table_sql:
+        if table_name not in _TABLE_SQL:
             self.logger.error(f"未找到表 {table_name} 的SQL定义")
             return False
         
         try:
-            if self.table_exists(table_name):
+            exists = table_name in existing if existing is not None else self.table_exists(table_name)
+            if exists:
                 self.logger.info(f"表 {table_name} 已存在，跳过创建")
                 return True
             
             self.logger.info(f"正在创建表 {table_name}...")
-            self.execute_update(table_sql[table_name])
+            self.execute_update(_TABLE_SQL[table_name])
             self.logger.info(f"表 {table_name} 创建成功")
             return True
         
@@ -678,7 +1569,7 @@ class DatabaseManager:
                 self.logger.info(f"表 {table_name} 不存在，无需删除")
                 return True
             
-            sql = f"DROP TABLE {'IF EXISTS ' if if_exists else ''}{table_name}"
+            sql = f"DROP TABLE {'IF EXISTS ' if if_exists else ''}{self._safe_ident(table_name)}"
             self.execute_update(sql)
             self.logger.info(f"表 {table_name} 删除成功")
             return True
@@ -702,7 +1593,7 @@ class DatabaseManager:
                 self.logger.warning(f"表 {table_name} 不存在，无法清空")
                 return False
             
-            sql = f"TRUNCATE TABLE {table_name}"
+            sql = f"TRUNCATE TABLE {self._safe_ident(table_name)}"
             self.execute_update(sql)
             self.logger.info(f"表 {table_name} 已清空")
             return True
@@ -711,16 +1602,155 @@ class DatabaseManager:
             self.logger.error(f"清空表 {table_name} 时出错: {str(e)}")
             return False
     
+    def _compute_batch_size(self, sample_record: Dict[str, Any], max_packet: Optional[int] = None) -> int:
+        """
+        根据单行估算大小和 max_allowed_packet 计算每批行数
+        
+        Args:
+            sample_record: 样本记录
+            max_packet: 数据包上限字节数，默认使用连接时读取的服务端配置
+            
+        Returns:
+            每批行数，不超过 _MAX_BATCH_SIZE
+        """
+        if max_packet is None:
+            if not self.connect():
+                raise Exception("无法连接到数据库")
+            max_packet = self._max_allowed_packet
+        
+        row_bytes = sum(len(str(v)) for v in sample_record.values()) + 4 * len(sample_record)
+        # 预留一半空间给SQL前缀和转义膨胀
+        return max(1, min(_MAX_BATCH_SIZE, max_packet // 2 // max(row_bytes, 1)))
+    
+    def _import_sql(self, table_name: str, columns: Tuple[str, ...], update_on_duplicate: bool = False) -> str:
+        """
+        构建导入用的单行INSERT模板，主键冲突时更新的场景追加 ON DUPLICATE KEY UPDATE
+        
+        Args:
+            table_name: 表名
+            columns: 写入的列
+            update_on_duplicate: 遇到主键冲突时是否更新
+            
+        Returns:
+            SQL模板
+        """
+        key = (table_name, columns, update_on_duplicate)
+        sql = self._insert_sql_cache.get(key)
+        if sql is None:
+            if update_on_duplicate:
+                sql = self._build_upsert_template(table_name, columns)
+            else:
+                placeholders = ', '.join(['%s'] * len(columns))
+                sql = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+            self._insert_sql_cache[key] = sql
+        return sql
+    
+    def prepare(self, table_name: str, sample_record: Dict[str, Any],
+                update_on_duplicate: bool = False) -> Dict[str, Any]:
+        """
+        为同一张表的多次导入预先确定写入列、INSERT模板和批大小，供 import_prepared 复用
+        
+        Args:
+            table_name: 表名
+            sample_record: 样本记录，以其字段作为写入列
+            update_on_duplicate: 遇到主键冲突时是否更新
+            
+        Returns:
+            导入句柄，包含 table_name、columns、sql、batch_size
+        """
+        columns = tuple(sample_record.keys())
+        return {
+            'table_name': table_name,
+            'columns': columns,
+            'sql': self._import_sql(table_name, columns, update_on_duplicate),
+            'batch_size': self._compute_batch_size(sample_record),
+        }
+    
+    def import_prepared(self, prepared: Dict[str, Any], data: List[Dict[str, Any]],
+                        commit_every: int = 10) -> int:
+        """
+        使用 prepare 返回的句柄导入一批记录，不再重复解析列、模板和批大小
+        
+        Args:
+            prepared: prepare 返回的导入句柄
+            data: 数据列表，字段与句柄中的写入列一致
+            commit_every: 每隔多少批提交一次，0表示整个导入只在结束时提交
+            
+        Returns:
+            导入的记录数
+        """
+        columns, sql, batch_size = prepared['columns'], prepared['sql'], prepared['batch_size']
+        total_imported = 0
+        
+        with self.transaction():
+            for batch_num, start in enumerate(range(0, len(data), batch_size), 1):
+                rows = [tuple(map(record.get, columns)) for record in data[start:start + batch_size]]
+                total_imported += self.execute_many_multirow(sql, rows, chunk_size=len(rows))
+                self._checkpoint_commit(batch_num, commit_every)
+        
+        self.logger.debug(f"表 {prepared['table_name']} 导入 {total_imported} 条记录")
+        return total_imported
+    
+    def _checkpoint_commit(self, batch_num: int, commit_every: int) -> None:
+        """
+        导入过程中每 commit_every 批提交一次，限制单个事务的undo日志和锁持有规模
+        
+        调用方处于外层事务中时不提交，由外层事务统一提交。
+        
+        Args:
+            batch_num: 当前批次号（从1开始）
+            commit_every: 提交间隔批数，0表示只在导入结束时提交
+        """
+        if commit_every and batch_num % commit_every == 0 and self._transaction_depth == 1:
+            self.connection.commit()
+    
+    def _insert_batch(self, table_name: str, batch: List[Dict[str, Any]],
+                      update_on_duplicate: bool = False) -> int:
+        """
+        以一条多行INSERT写入一批记录
+        
+        Args:
+            table_name: 表名
+            batch: 记录列表，以第一条记录的字段作为写入列
+            update_on_duplicate: 遇到主键冲突时是否更新
+            
+        Returns:
+            受影响的行数
+        """
+        columns = tuple(batch[0].keys())
+        rows = [tuple(map(record.get, columns)) for record in batch]
+        return self._insert_rows(table_name, columns, rows, update_on_duplicate)
+    
+    def _insert_rows(self, table_name: str, columns: Tuple[str, ...], rows: List[Tuple],
+                     update_on_duplicate: bool = False) -> int:
+        """
+        以一条多行INSERT写入一批按列位置排列的行
+        
+        Args:
+            table_name: 表名
+            columns: 写入的列
+            rows: 行元组列表，值的顺序与columns一致
+            update_on_duplicate: 遇到主键冲突时是否更新
+            
+        Returns:
+            受影响的行数
+        """
+        sql = self._import_sql(table_name, columns, update_on_duplicate)
+        return self.execute_many_multirow(sql, rows, chunk_size=len(rows))
+    
     def import_data(self, table_name: str, data: List[Dict[str, Any]], 
-                    batch_size: int = 1000, update_on_duplicate: bool = False) -> int:
+                    batch_size: Optional[int] = None, update_on_duplicate: bool = False,
+                    method: str = 'multi', commit_every: int = 10) -> int:
         """
         导入数据到指定表
         
         Args:
             table_name: 表名
             data: 数据列表，每个元素为一条记录的字典
-            batch_size: 批处理大小
+            batch_size: 批处理大小，默认根据行宽和 max_allowed_packet 计算
             update_on_duplicate: 遇到主键冲突时是否更新
+            method: 导入方式，'multi' 为多行INSERT，'bulk' 为 LOAD DATA LOCAL INFILE
+            commit_every: 每隔多少批提交一次，0表示整个导入只在结束时提交
             
         Returns:
             导入的记录数
@@ -729,42 +1759,36 @@ class DatabaseManager:
             self.logger.warning(f"没有数据需要导入到表 {table_name}")
             return 0
         
+        if method == 'bulk':
+            if update_on_duplicate:
+                raise ValueError("LOAD DATA 导入不支持主键冲突时更新，请使用 method='multi'")
+            columns = list(data[0].keys())
+            rows = (tuple(map(record.get, columns)) for record in data)
+            return self.bulk_load_csv(table_name, columns, rows)
+        elif method != 'multi':
+            raise ValueError(f"未知的导入方式: {method}")
+        
         try:
+            if batch_size is None:
+                batch_size = self._compute_batch_size(data[0])
+            
             total_imported = 0
             total_batches = (len(data) + batch_size - 1) // batch_size
             
-            for i in range(0, len(data), batch_size):
-                batch_data = data[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                
-                if not batch_data:
-                    continue
-                
-                # 构建INSERT语句
-                columns = batch_data[0].keys()
-                placeholders = ', '.join(['%s'] * len(columns))
-                columns_str = ', '.join(columns)
-                
-                sql = f"INSERT INTO {table_name} ({columns_str}) VALUES ({placeholders})"
-                
-                # 处理主键冲突
-                if update_on_duplicate:
-                    updates = ', '.join([f"{col} = VALUES({col})" for col in columns 
-                                        if col != self.tables_info.get(table_name, {}).get('pk')])
-                    if updates:
-                        sql += f" ON DUPLICATE KEY UPDATE {updates}"
-                
-                # 准备参数
-                params = [[record.get(col) for col in columns] for record in batch_data]
-                
-                # 执行批量插入
-                self.logger.info(f"正在导入第 {batch_num}/{total_batches} 批数据到表 {table_name}...")
-                affected_rows = self.execute_many(sql, params)
-                total_imported += affected_rows
-                
-                self.logger.info(f"第 {batch_num} 批导入完成，影响 {affected_rows} 行")
+            # 在显式事务中导入，每 commit_every 批提交一次，避免每批一次刷盘
+            with self.transaction():
+                for i in range(0, len(data), batch_size):
+                    batch_num = i // batch_size + 1
+                    
+                    # 执行批量插入（改写为多行VALUES，一批一次往返）
+                    self.logger.info(f"正在导入第 {batch_num}/{total_batches} 批数据到表 {table_name}...")
+                    affected_rows = self._insert_batch(table_name, data[i:i + batch_size], update_on_duplicate)
+                    total_imported += affected_rows
+                    self._checkpoint_commit(batch_num, commit_every)
+                    
+                    self.logger.info(f"第 {batch_num} 批导入完成，影响 {affected_rows} 行")
             
-                self.logger.info(f"表 {table_name} 数据导入完成，共导入 {total_imported} 条记录")
+            self.logger.info(f"表 {table_name} 数据导入完成，共导入 {total_imported} 条记录")
             return total_imported
         
         except Exception as e:
@@ -772,15 +1796,19 @@ class DatabaseManager:
             raise
     
     def import_dataframe(self, table_name: str, df: pd.DataFrame, 
-                         batch_size: int = 1000, update_on_duplicate: bool = False) -> int:
+                         batch_size: Optional[int] = None, update_on_duplicate: bool = False,
+                         commit_every: int = 10) -> int:
         """
         导入DataFrame数据到指定表
         
+        按批切片转换为行元组，峰值内存只多出一批数据，而不是整个DataFrame的副本。
+        
         Args:
             table_name: 表名
             df: DataFrame对象
-            batch_size: 批处理大小
+            batch_size: 批处理大小，默认根据行宽和 max_allowed_packet 计算
             update_on_duplicate: 遇到主键冲突时是否更新
+            commit_every: 每隔多少批提交一次，0表示整个导入只在结束时提交
             
         Returns:
             导入的记录数
@@ -789,12 +1817,69 @@ class DatabaseManager:
             self.logger.warning(f"DataFrame为空，没有数据需要导入到表 {table_name}")
             return 0
         
-        # 将DataFrame转换为字典列表
-        data = df.to_dict('records')
-        return self.import_data(table_name, data, batch_size, update_on_duplicate)
+        try:
+            if batch_size is None:
+                batch_size = self._compute_batch_size(df.iloc[0].to_dict())
+            
+            total_imported = 0
+            total_batches = (len(df) + batch_size - 1) // batch_size
+            columns = tuple(df.columns)
+            
+            with self.transaction():
+                for start in range(0, len(df), batch_size):
+                    batch_num = start // batch_size + 1
+                    # 直接从底层数组按行生成元组，不构造中间字典
+                    rows = list(df.iloc[start:start + batch_size].itertuples(index=False, name=None))
+                    
+                    self.logger.info(f"正在导入第 {batch_num}/{total_batches} 批数据到表 {table_name}...")
+                    affected_rows = self._insert_rows(table_name, columns, rows, update_on_duplicate)
+                    total_imported += affected_rows
+                    del rows
+                    self._checkpoint_commit(batch_num, commit_every)
+                    
+                    self.logger.info(f"第 {batch_num} 批导入完成，影响 {affected_rows} 行")
+            
+            self.logger.info(f"表 {table_name} 数据导入完成，共导入 {total_imported} 条记录")
+            return total_imported
+        
+        except Exception as e:
+            self.logger.error(f"导入数据到表 {table_name} 时出错: {str(e)}")
+            raise
+    
+    def table_indexes(self, table_name: str) -> Dict[str, List[str]]:
+        """
+        获取表的索引定义，结果在进程内缓存
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            索引名到列名列表（按索引内顺序）的映射
+        """
+        if table_name not in self._indexes:
+            indexes: Dict[str, List[str]] = {}
+            for row in sorted(self.execute_query(f"SHOW INDEX FROM {self._safe_ident(table_name)}"),
+                              key=lambda r: (r['Key_name'], r['Seq_in_index'])):
+                indexes.setdefault(row['Key_name'], []).append(row['Column_name'])
+            self._indexes[table_name] = indexes
+        return self._indexes[table_name]
+    
+    def has_index_prefix(self, table_name: str, *columns: str) -> bool:
+        """
+        检查是否存在以指定列（按顺序）开头的索引
+        
+        Args:
+            table_name: 表名
+            columns: 列名
+            
+        Returns:
+            是否存在可用于该列组合查找和排序的索引
+        """
+        return any(tuple(index_columns[:len(columns)]) == columns
+                   for index_columns in self.table_indexes(table_name).values())
     
     def get_last_timestamp(self, table_name: str, timestamp_column: str, 
-                          condition: Optional[str] = None) -> Optional[str]:
+                          condition: Optional[str] = None) -> Optional[datetime.datetime]:
         """
         获取表中最后一条记录的时间戳
         
@@ -811,14 +1896,25 @@ class DatabaseManager:
                 self.logger.warning(f"表 {table_name} 不存在")
                 return None
             
-            query = f"SELECT MAX({timestamp_column}) as last_timestamp FROM {table_name}"
-            if condition:
-                query += f" WHERE {condition}"
+            table = self._safe_ident(table_name)
+            column = self._safe_ident(timestamp_column, table_name)
+            if self.has_index_prefix(table_name, timestamp_column):
+                # 按索引倒序取第一条，只需一次索引查找
+                query = (f"SELECT {column} as last_timestamp FROM {table} "
+                         f"WHERE {column} IS NOT NULL")
+                if condition:
+                    query += f" AND ({condition})"
+                query += f" ORDER BY {column} DESC LIMIT 1"
+            else:
+                self.logger.warning(f"表 {table_name} 的列 {timestamp_column} 没有索引，查询最后时间戳需要全表扫描")
+                query = f"SELECT MAX({column}) as last_timestamp FROM {table}"
+                if condition:
+                    query += f" WHERE {condition}"
             
             result = self.execute_query(query)
             
             if result and result[0]['last_timestamp']:
-                return result[0]['last_timestamp'].strftime('%Y-%m-%d %H:%M:%S')
+                return result[0]['last_timestamp']
             
             return None
         
@@ -826,6 +1922,22 @@ class DatabaseManager:
             self.logger.error(f"获取表 {table_name} 的最后时间戳时出错: {str(e)}")
             return None
     
+    def get_last_timestamp_str(self, table_name: str, timestamp_column: str,
+                               condition: Optional[str] = None) -> Optional[str]:
+        """
+        获取表中最后一条记录的时间戳，格式化为 '%Y-%m-%d %H:%M:%S' 字符串
+        
+        Args:
+            table_name: 表名
+            timestamp_column: 时间戳列名
+            condition: 附加条件
+            
+        Returns:
+            时间戳字符串，如果没有记录则返回None
+        """
+        timestamp = self.get_last_timestamp(table_name, timestamp_column, condition)
+        return timestamp.strftime('%Y-%m-%d %H:%M:%S') if timestamp else None
+    
     def validate_data(self, table_name: str) -> Dict[str, Any]:
         """
         验证表数据的完整性和一致性
@@ -839,6 +1951,49 @@ class DatabaseManager:
         if not self.table_exists(table_name):
             return {'exists': False, 'error': f"表 {table_name} 不存在"}
         
+        return self._validate_table(table_name, lambda query: self.execute_query_rows(query)[1])
+    
+    def validate_tables(self, table_names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        并发验证多张表，每张表的查询使用连接池中的独立连接
+        
+        Args:
+            table_names: 表名列表，默认为全部表
+            
+        Returns:
+            表名到验证结果的映射
+        """
+        table_names = list(table_names or self.tables_info.keys())
+        existing = self.existing_tables(table_names)
+        
+        # 表结构、列名（_safe_ident 校验用）和索引在主连接上读取并缓存，工作线程只执行数据查询
+        for table_name in existing:
+            self.get_table_structure(table_name)
+            self.get_table_columns(table_name)
+            self.table_indexes(table_name)
+        
+        results = {table_name: {'exists': False, 'error': f"表 {table_name} 不存在"}
+                   for table_name in table_names if table_name not in existing}
+        
+        validated = [table_name for table_name in table_names if table_name in existing]
+        with ThreadPoolExecutor(max_workers=self._parallel_workers(len(validated))) as executor:
+            for table_name, result in zip(validated, executor.map(
+                    lambda table_name: self._validate_table(table_name, self._pooled_query), validated)):
+                results[table_name] = result
+        
+        return results
+    
+    def _validate_table(self, table_name: str, run_query) -> Dict[str, Any]:
+        """
+        执行单表验证查询
+        
+        Args:
+            table_name: 表名
+            run_query: 执行SQL并返回行元组列表的函数
+            
+        Returns:
+            验证结果统计信息
+        """
         result = {
             'exists': True,
             'table_name': table_name,
@@ -850,31 +2005,31 @@ class DatabaseManager:
         }
         
         try:
-            # 获取记录数
-            count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-            count_result = self.execute_query(count_query)
-            result['record_count'] = count_result[0]['count']
-            
-            # 获取表结构信息
-            structure_query = f"DESCRIBE {table_name}"
-            structure = self.execute_query(structure_query)
-            
-            # 检查NULL值
-            for column in structure:
-                column_name = column['Field']
-                if column['Null'] == 'NO':  # 不允许为NULL
-                    null_query = f"SELECT COUNT(*) as null_count FROM {table_name} WHERE {column_name} IS NULL"
-                    null_result = self.execute_query(null_query)
-                    null_count = null_result[0]['null_count']
-                    if null_count > 0:
-                        result['null_count'][column_name] = null_count
-            
-            # 检查主键唯一性
+            structure = self.get_table_structure(table_name)
+            
+            # 记录数和不允许为NULL的列的NULL计数合并为一次查询
+            not_null_columns = [column['Field'] for column in structure if column['Null'] == 'NO']
             pk = self.tables_info.get(table_name, {}).get('pk')
-            if pk:
-                pk_query = f"SELECT COUNT(*) as count, COUNT(DISTINCT {pk}) as distinct_count FROM {table_name}"
-                pk_result = self.execute_query(pk_query)
-                if pk_result[0]['count'] != pk_result[0]['distinct_count']:
+            
+            table = self._safe_ident(table_name)
+            
+            expressions = ["COUNT(*)"]
+            expressions += [f"COALESCE(SUM({self._safe_ident(column_name, table_name)} IS NULL), 0)"
+                            for column_name in not_null_columns]
+            
+            values = run_query(f"SELECT {', '.join(expressions)} FROM {table}")[0]
+            
+            result['record_count'] = values[0]
+            for column_name, null_count in zip(not_null_columns, values[1:]):
+                if null_count > 0:
+                    result['null_count'][column_name] = int(null_count)
+            
+            # 检查主键唯一性：已声明为PRIMARY KEY的列由数据库保证唯一，无需扫描；
+            # 否则用 EXISTS 查找重复分组，遇到第一个重复即可返回
+            if pk and self.table_indexes(table_name).get('PRIMARY') != [pk]:
+                dup_query = (f"SELECT EXISTS(SELECT 1 FROM {table} "
+                             f"GROUP BY {self._safe_ident(pk, table_name)} HAVING COUNT(*) > 1)")
+                if run_query(dup_query)[0][0]:
                     result['pk_unique'] = False
             
             # TODO: 根据表之间的关系检查外键有效性
@@ -886,6 +2041,74 @@ class DatabaseManager:
             result['error'] = str(e)
             return result
     
+    def get_table_structure(self, table_name: str) -> List[Dict]:
+        """
+        获取表结构（DESCRIBE 结果），结果在进程内缓存
+        
+        Args:
+            table_name: 表名
+            
+        Returns:
+            列定义列表
+        """
+        if table_name not in self._structure_cache:
+            self._structure_cache[table_name] = self.execute_query(f"DESCRIBE {self._safe_ident(table_name)}")
+        return self._structure_cache[table_name]
+    
+    def _grouped_stats_query(self, table_name: str, type_class: str,
+                             column_names: List[str]) -> Tuple[str, List[Tuple[str, str]]]:
+        """
+        构建同类列的合并统计查询
+        
+        Args:
+            table_name: 表名
+            type_class: 统计方式，见 _COLUMN_STAT_EXPRESSIONS
+            column_names: 列名列表
+            
+        Returns:
+            (SQL语句, 与结果列一一对应的 (列名, 统计项) 列表)
+        """
+        expressions = []
+        keys = []
+        for column_name in column_names:
+            column = self._safe_ident(column_name, table_name)
+            for stat_name, expression in _COLUMN_STAT_EXPRESSIONS[type_class]:
+                expressions.append(expression.format(col=column))
+                keys.append((column_name, stat_name))
+        return f"SELECT {', '.join(expressions)} FROM {self._safe_ident(table_name)}", keys
+    
+    def _pooled_query(self, query: str, dictionary: bool = False) -> List:
+        """
+        借用连接池中的连接执行查询，供多线程并发调用
+        
+        Args:
+            query: SQL查询语句
+            dictionary: 是否以字典形式返回每行
+            
+        Returns:
+            查询结果列表
+        """
+        with self.pooled_connection() as conn:
+            cursor = conn.cursor(dictionary=dictionary)
+            try:
+                cursor.execute(query)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+    
+    def _parallel_workers(self, task_count: int) -> int:
+        """
+        并发查询的线程数，不超过连接池大小
+        
+        Args:
+            task_count: 任务数
+            
+        Returns:
+            线程数
+        """
+        pool_size = int(self.config_manager.get_db_config(self.db_type).get('pool_size', 8))
+        return max(1, min(task_count, pool_size))
+    
     def generate_statistics(self, table_name: str) -> Dict[str, Any]:
         """
         生成表数据的统计信息
@@ -907,88 +2130,47 @@ class DatabaseManager:
         }
         
         try:
-            # 获取记录数
-            count_query = f"SELECT COUNT(*) as count FROM {table_name}"
-            count_result = self.execute_query(count_query)
-            result['record_count'] = count_result[0]['count']
-            
-            # 获取表结构信息
-            structure_query = f"DESCRIBE {table_name}"
-            structure = self.execute_query(structure_query)
-            
-            # 对每个列生成统计信息
-            for column in structure:
-                column_name = column['Field']
-                column_type = column['Type']
-                
-                # 跳过大文本字段
-                if 'text' in column_type.lower():
+            # 按统计方式对列分组（跳过大文本字段）
+            groups: Dict[str, List[str]] = {}
+            for column in self.get_table_structure(table_name):
+                type_class = _column_type_class(column['Type'])
+                if type_class is None and 'text' in column['Type'].lower():
                     continue
+                result['columns'][column['Field']] = {'type': column['Type']}
+                if type_class is not None:
+                    groups.setdefault(type_class, []).append(column['Field'])
+            
+            # 记录数和各类列的合并统计互不依赖，分别借用连接池中的连接并发执行
+            grouped = [self._grouped_stats_query(table_name, type_class, column_names)
+                       for type_class, column_names in groups.items()]
+            table = self._safe_ident(table_name)
+            queries = [f"SELECT COUNT(*) FROM {table}"] + [query for query, _ in grouped]
+            
+            with ThreadPoolExecutor(max_workers=self._parallel_workers(len(queries))) as executor:
+                results = list(executor.map(self._pooled_query, queries))
+            
+            result['record_count'] = results[0][0][0]
+            for (_, keys), rows in zip(grouped, results[1:]):
+                for (column_name, stat_name), value in zip(keys, rows[0]):
+                    result['columns'][column_name][stat_name] = value
+            
+            # 字符型列如果不同值较少，获取前10个值的分布；各列的分组统计用 UNION ALL 合并为一条查询
+            dist_columns = [column_name for column_name in groups.get('char', [])
+                            if result['columns'][column_name]['distinct_count'] < 100]
+            if dist_columns:
+                dist_query = " UNION ALL ".join(
+                    f"SELECT %s AS which, {column} AS value, COUNT(*) AS count "
+                    f"FROM {table} WHERE {column} IS NOT NULL GROUP BY {column}"
+                    for column in (self._safe_ident(column_name, table_name) for column_name in dist_columns)
+                )
+                _, rows = self.execute_query_rows(dist_query, dist_columns)
                 
-                column_stats = {'type': column_type}
-                
-                # 数值型和日期型列的统计
-                if ('int' in column_type.lower() or 'decimal' in column_type.lower() or 
-                    'float' in column_type.lower() or 'double' in column_type.lower() or
-                    'date' in column_type.lower() or 'time' in column_type.lower()):
-                    
-                    stats_query = f"""
-                    SELECT 
-                        MIN({column_name}) as min_value,
-                        MAX({column_name}) as max_value,
-                        AVG({column_name}) as avg_value,
-                        COUNT(DISTINCT {column_name}) as distinct_count
-                    FROM {table_name}
-                    WHERE {column_name} IS NOT NULL
-                    """
-                    stats_result = self.execute_query(stats_query)
-                    
-                    if stats_result:
-                        column_stats.update(stats_result[0])
-                
-                # 字符型列的统计
-                elif 'char' in column_type.lower() or 'varchar' in column_type.lower():
-                    stats_query = f"""
-                    SELECT 
-                        COUNT(DISTINCT {column_name}) as distinct_count,
-                        AVG(LENGTH({column_name})) as avg_length,
-                        MAX(LENGTH({column_name})) as max_length
-                    FROM {table_name}
-                    WHERE {column_name} IS NOT NULL
-                    """
-                    stats_result = self.execute_query(stats_query)
-                    
-                    if stats_result:
-                        column_stats.update(stats_result[0])
-                    
-                    # 如果不同值较少，获取前10个值的分布
-                    if stats_result and stats_result[0]['distinct_count'] < 100:
-                        dist_query = f"""
-                        SELECT {column_name} as value, COUNT(*) as count
-                        FROM {table_name}
-                        WHERE {column_name} IS NOT NULL
-                        GROUP BY {column_name}
-                        ORDER BY count DESC
-                        LIMIT 10
-                        """
-                        dist_result = self.execute_query(dist_query)
-                        column_stats['value_distribution'] = dist_result
-                
-                # 布尔型列的统计
-                elif 'bool' in column_type.lower() or 'tinyint(1)' in column_type.lower():
-                    stats_query = f"""
-                    SELECT 
-                        SUM(CASE WHEN {column_name} = TRUE THEN 1 ELSE 0 END) as true_count,
-                        SUM(CASE WHEN {column_name} = FALSE THEN 1 ELSE 0 END) as false_count,
-                        SUM(CASE WHEN {column_name} IS NULL THEN 1 ELSE 0 END) as null_count
-                    FROM {table_name}
-                    """
-                    stats_result = self.execute_query(stats_query)
-                    
-                    if stats_result:
-                        column_stats.update(stats_result[0])
-                
-                result['columns'][column_name] = column_stats
+                distributions: Dict[str, List[Dict]] = {column_name: [] for column_name in dist_columns}
+                for which, value, count in rows:
+                    distributions[which].append({'value': value, 'count': count})
+                for column_name, values in distributions.items():
+                    values.sort(key=lambda item: item['count'], reverse=True)
+                    result['columns'][column_name]['value_distribution'] = values[:10]
             
             return result
         
@@ -998,7 +2180,7 @@ class DatabaseManager:
             return result
     
     def check_last_timestamp(self, table_name: str = 'data_generation_log', 
-                            mode: str = 'realtime') -> Optional[str]:
+                            mode: str = 'realtime') -> Optional[Union[datetime.datetime, datetime.date]]:
         """
         检查最后一次数据生成的时间戳
         
@@ -1007,13 +2189,20 @@ class DatabaseManager:
             mode: 数据生成模式，历史或实时
             
         Returns:
-            最后一次生成数据的结束时间，如果没有记录则返回None
+            最后一次生成数据的结束时间（datetime）；只有结束日期时返回date；没有记录则返回None
         """
         try:
             if not self.table_exists(table_name):
                 self.logger.warning(f"表 {table_name} 不存在")
                 return None
             
+            # 先写入缓冲中的日志，保证读到最新的生成记录
+            self.flush_logs()
+            
+            if not (self.has_index_prefix(table_name, 'generation_mode', 'status', 'end_time')
+                    or self.has_index_prefix(table_name, 'end_time')):
+                self.logger.warning(f"表 {table_name} 的列 end_time 没有索引，按结束时间排序需要扫描该模式的全部日志")
+            
             query = """
             SELECT end_time, end_date 
             FROM data_generation_log 
@@ -1024,11 +2213,8 @@ class DatabaseManager:
             
             result = self.execute_query(query, (mode,))
             
-            if result and (result[0]['end_time'] or result[0]['end_date']):
-                if result[0]['end_time']:
-                    return result[0]['end_time'].strftime('%Y-%m-%d %H:%M:%S')
-                else:
-                    return result[0]['end_date'].strftime('%Y-%m-%d')
+            if result:
+                return result[0]['end_time'] or result[0]['end_date']
             
             return None
         
@@ -1036,6 +2222,86 @@ class DatabaseManager:
             self.logger.error(f"检查最后时间戳时出错: {str(e)}")
             return None
     
+    def check_last_timestamp_str(self, table_name: str = 'data_generation_log',
+                                 mode: str = 'realtime') -> Optional[str]:
+        """
+        检查最后一次数据生成的时间戳，格式化为字符串
+        
+        Args:
+            table_name: 表名，默认为数据生成日志表
+            mode: 数据生成模式，历史或实时
+            
+        Returns:
+            '%Y-%m-%d %H:%M:%S' 格式的结束时间，只有结束日期时为 '%Y-%m-%d'，没有记录则返回None
+        """
+        timestamp = self.check_last_timestamp(table_name, mode)
+        if isinstance(timestamp, datetime.datetime):
+            return timestamp.strftime('%Y-%m-%d %H:%M:%S')
+        if timestamp:
+            return timestamp.strftime('%Y-%m-%d')
+        return None
+    
+    def flush_logs(self) -> bool:
+        """
+        将缓冲的数据生成日志以一条多行upsert写入数据库
+        
+        Returns:
+            是否写入成功
+        """
+        with self._log_lock:
+            if self._log_timer is not None:
+                self._log_timer.cancel()
+                self._log_timer = None
+            if not self._log_buffer:
+                return True
+            
+            rows = list(self._log_buffer.values())
+            try:
+                self.execute_many_multirow(self._LOG_UPSERT_SQL, rows)
+                self._log_written(rows)
+                return True
+            except Exception as e:
+                self.logger.error(f"写入数据生成日志时出错: {str(e)}")
+                return False
+    
+    def _flush_logs_pooled(self) -> None:
+        """
+        定时器线程中写入缓冲的数据生成日志
+        
+        主连接只在调用线程中使用，这里借用连接池的独立连接写入。
+        """
+        with self._log_lock:
+            if self._log_timer is threading.current_thread():
+                self._log_timer = None
+            if not self._log_buffer:
+                return
+            
+            rows = list(self._log_buffer.values())
+            try:
+                with self.pooled_connection() as conn:
+                    cursor = conn.cursor()
+                    try:
+                        cursor.execute(self._multirow_sql(self._LOG_UPSERT_SQL, len(rows)),
+                                       [value for row in rows for value in row])
+                        conn.commit()
+                    finally:
+                        cursor.close()
+                self._log_written(rows)
+            except Exception as e:
+                # 保留缓冲，由下一次写入或退出时的 flush_logs 重试
+                self.logger.error(f"定时写入数据生成日志时出错: {str(e)}")
+    
+    def _log_written(self, rows: List[Tuple]) -> None:
+        """
+        记录已写入的日志并清空缓冲，调用方需持有 _log_lock
+        
+        Args:
+            rows: 已写入的upsert参数
+        """
+        self._written_log_ids.update(row[0] for row in rows)
+        self._log_buffer.clear()
+        self.logger.debug(f"数据生成日志已写入: {len(rows)} 条")
+    
     def log_data_generation(self, log_id: str, mode: str, start_time: str, 
                            status: str, start_date: Optional[str] = None, 
                            end_date: Optional[str] = None, end_time: Optional[str] = None,
@@ -1043,6 +2309,9 @@ class DatabaseManager:
         """
         记录数据生成日志
         
+        新日志的第一条记录和结束状态立即写入；同一日志后续的运行中状态先缓冲，
+        最迟 _LOG_FLUSH_INTERVAL 秒后由定时器写入。
+        
         Args:
             log_id: 日志ID
             mode: 数据生成模式（历史/实时）
@@ -1058,63 +2327,29 @@ class DatabaseManager:
             是否记录成功
         """
         try:
-            # 准备数据
-            data = {
-                'log_id': log_id,
-                'generation_mode': mode,
-                'start_time': start_time,
-                'status': status,
-                'records_generated': records_generated
-            }
-            
-            if start_date:
-                data['start_date'] = start_date
-            
-            if end_date:
-                data['end_date'] = end_date
-            
-            if end_time:
-                data['end_time'] = end_time
-            
-            if details:
-                data['details'] = details
-            
-            # 检查日志是否已存在
-            query = "SELECT COUNT(*) as count FROM data_generation_log WHERE log_id = %s"
-            result = self.execute_query(query, (log_id,))
-            
-            if result[0]['count'] > 0:
-                # 更新已有日志
-                set_clauses = []
-                params = []
-                
-                for key, value in data.items():
-                    if key != 'log_id':  # 跳过主键
-                        set_clauses.append(f"{key} = %s")
-                        params.append(value)
-                
-                params.append(log_id)  # WHERE条件参数
-                
-                update_query = f"""
-                UPDATE data_generation_log 
-                SET {', '.join(set_clauses)}
-                WHERE log_id = %s
-                """
-                
-                self.execute_update(update_query, params)
-                self.logger.debug(f"数据生成日志已更新: {log_id}")
-            else:
-                # 插入新日志
-                columns = ', '.join(data.keys())
-                placeholders = ', '.join(['%s'] * len(data))
+            # 空字符串等同于未提供
+            optional = (start_date or None, end_date or None, end_time or None, details or None)
+            
+            with self._log_lock:
+                # 同一日志的多次写入在缓冲中合并，未提供的可选字段沿用之前的值
+                previous = self._log_buffer.get(log_id)
+                if previous is not None:
+                    optional = tuple(new if new is not None else old
+                                     for new, old in zip(optional, previous[5:]))
+                self._log_buffer[log_id] = (log_id, mode, start_time, status, records_generated) + optional
                 
-                insert_query = f"""
-                INSERT INTO data_generation_log ({columns})
-                VALUES ({placeholders})
-                """
+                # 新日志、非运行中状态（成功/失败/中断）或缓冲已满时立即写入，
+                # 进程被强制终止时数据库中至少留有运行中记录
+                if (status != 'running'
+                        or log_id not in self._written_log_ids
+                        or len(self._log_buffer) >= self._LOG_FLUSH_SIZE):
+                    return self.flush_logs()
                 
-                self.execute_update(insert_query, list(data.values()))
-                self.logger.debug(f"数据生成日志已创建: {log_id}")
+                # 其余运行中状态交给定时器，保证最长延迟不超过 _LOG_FLUSH_INTERVAL
+                if self._log_timer is None:
+                    self._log_timer = threading.Timer(self._LOG_FLUSH_INTERVAL, self._flush_logs_pooled)
+                    self._log_timer.daemon = True
+                    self._log_timer.start()
             
             return True
         
@@ -1123,12 +2358,13 @@ class DatabaseManager:
             return False
 
 
-# 单例模式
-_instance = None
+# 单例模式：每种数据库类型一个实例，加锁避免多线程同时初始化
+_instances: Dict[str, DatabaseManager] = {}
+_instances_lock = threading.Lock()
 
 def get_database_manager(db_type: str = 'mysql') -> DatabaseManager:
     """
-    获取DatabaseManager的单例实例
+    获取指定数据库类型的DatabaseManager单例实例
     
     Args:
         db_type: 数据库类型
@@ -1136,10 +2372,10 @@ def get_database_manager(db_type: str = 'mysql') -> DatabaseManager:
     Returns:
         DatabaseManager实例
     """
-    global _instance
-    if _instance is None:
-        _instance = DatabaseManager(db_type)
-    return _instance
+    with _instances_lock:
+        if db_type not in _instances:
+            _instances[db_type] = DatabaseManager(db_type)
+        return _instances[db_type]
 
 
 if __name__ == "__main__":
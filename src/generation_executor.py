@@ -8,8 +8,15 @@
 """
 
 import os
+import time
+import queue
+import itertools
 import datetime
-from typing import Dict, Optional, Callable
+import threading
+import contextlib
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, List, Optional, Union, Callable, Iterable, Iterator
 
 from src.config_manager import get_config_manager
 from src.database_manager import get_database_manager
@@ -19,9 +26,74 @@ from src.data_generator.data_generator import get_data_generator
 from src.checkpoint_manager import get_checkpoint_manager
 from src.data_validator import get_validator
 
+# 流水线队列结束标记
+_PIPELINE_END = object()
+
+# 后续阶段的生成器实际读取的字段；缓存和从数据库加载这些阶段的数据时只保留这些列
+DOWNSTREAM_COLUMNS = {
+    'customer': ('customer_id', 'name', 'customer_type', 'is_vip', 'credit_score', 'birth_date',
+                 'registration_date', 'branch_id', 'annual_revenue'),
+    'fund_account': ('account_id', 'customer_id', 'account_type', 'status', 'balance'),
+}
+
+
+def _chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """
+    将可迭代对象按固定大小切分为列表
+    
+    Args:
+        iterable: 可迭代对象
+        size: 每批大小
+        
+    Yields:
+        每批元素列表
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
 class GenerationExecutor:
     """数据生成执行器，支持断点续传"""
     
+    # 流水线中已生成、等待导入的最大批次数，限制内存占用
+    _PIPELINE_DEPTH = 4
+    
+    # 各阶段数据的中文名称，用于日志
+    _STAGE_LABELS = {
+        'bank_manager': '银行经理',
+        'deposit_type': '存款类型',
+        'product': '产品',
+        'customer': '客户',
+        'fund_account': '资金账户',
+        'app_user': 'APP用户',
+        'wechat_follower': '公众号粉丝',
+        'work_wechat_contact': '企业微信联系人',
+        'channel_profile': '全渠道档案',
+        'loan_record': '贷款记录',
+        'investment_record': '投资记录',
+        'customer_event': '客户事件',
+        'transaction': '交易',
+    }
+    
+    # 一次生成、一次导入的简单阶段：(阶段名, 生成器属性, 依赖阶段)，生成器按依赖顺序接收其数据；
+    # 依赖写作 "阶段.列" 时生成器只接收该列的ID数组
+    _BASE_STAGES = (
+        ('bank_manager', 'bank_manager_generator', ()),
+        ('deposit_type', 'deposit_type_generator', ()),
+        ('product', 'product_generator', ()),
+    )
+    _CHANNEL_STAGES = (
+        ('app_user', 'app_user_generator', ('customer',)),
+        ('wechat_follower', 'wechat_follower_generator', ('customer', 'app_user.customer_id')),
+        ('work_wechat_contact', 'work_wechat_contact_generator', ('customer',)),
+        ('channel_profile', 'channel_profile_generator',
+         ('customer', 'app_user', 'wechat_follower', 'work_wechat_contact')),
+    )
+    
     def __init__(self, batch_size: int = 1000, logger=None):
         """
         初始化数据生成执行器
@@ -40,6 +112,26 @@ class GenerationExecutor:
         
         self.batch_size = batch_size
         self.total_stats = {}
+        
+        # 执行期间不变的阶段参数，构造时从系统配置读取一次
+        system_config = self.config_manager.get_system_config()
+        
+        # 是否并行生成互不依赖的简单阶段（并行时各阶段共享随机数生成器，结果不再可按随机种子复现）
+        self.parallel_stages = bool(system_config.get('parallel_stages', False))
+        
+        # 客户事件：每批天数、最多为多少个客户生成事件
+        self._events_days = int(system_config.get('event_days_per_batch', 30))
+        self._events_customer_cap = int(system_config.get('event_customer_cap', 500))
+        
+        # 交易：每批天数、最多为多少个活跃账户生成交易
+        self._tx_days = int(system_config.get('transaction_days_per_batch', 15))
+        self._tx_account_cap = int(system_config.get('transaction_account_cap', 1000))
+        
+        # 从数据库加载的依赖数据：(阶段, 列, 条件) -> 记录列表
+        self._loaded = {}
+        
+        # 上次上报批次进度的时间
+        self._progress_budget = time.monotonic()
     
     def initialize_run(self, skip_stages: list = None) -> None:
         """
@@ -66,596 +158,450 @@ class GenerationExecutor:
             self.logger.warning("找不到可恢复的状态")
             return False
     
-    def execute(self, start_date: datetime.date, end_date: datetime.date) -> Dict:
+    def _pipeline(self, table_name: str, producer: Iterable[List[Dict]],
+                  on_batch: Optional[Callable[[int, int, int], None]] = None) -> int:
         """
-        执行数据生成流程
+        以流水线方式生成并导入数据：后台线程迭代 producer 生成批次，当前线程依次导入，
+        使CPU密集的数据生成与等待数据库的导入相互重叠
+        
+        数据库访问（导入和进度保存）都留在当前线程，连接不会被两个线程同时使用。
         
         Args:
-            start_date: 开始日期
-            end_date: 结束日期
+            table_name: 目标表名
+            producer: 逐批产出记录列表的可迭代对象
+            on_batch: 每批导入后的回调，参数为 (批次序号, 本批导入条数, 累计导入条数)
             
         Returns:
-            生成统计信息
+            导入的记录总数
         """
-        self.logger.info(f"开始执行数据生成流程，时间范围: {start_date} 至 {end_date}")
+        batches = queue.Queue(maxsize=self._PIPELINE_DEPTH)
+        stop = threading.Event()
+        
+        def produce():
+            try:
+                for batch in producer:
+                    if stop.is_set():
+                        return
+                    batches.put(batch)
+                batches.put(_PIPELINE_END)
+            except Exception as e:
+                # 生成出错时把异常交给导入侧抛出，使本阶段的事务回滚
+                batches.put(e)
+        
+        def consume() -> Iterator[List[Dict]]:
+            while True:
+                item = batches.get()
+                if item is _PIPELINE_END:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            future = pool.submit(produce)
+            try:
+                # 整个阶段在一个事务中导入，结束时统一提交
+                total_count = self.data_generator.bulk_import(table_name, consume(), on_batch)
+            finally:
+                # 导入出错时通知生产线程停止，并取走队列中的批次，避免其阻塞在 put 上
+                stop.set()
+                while not future.done():
+                    try:
+                        batches.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+        
+        return total_count
+    
+    def _get(self, stage: str, *, columns: Optional[tuple] = None, where: str = '') -> List[Dict]:
+        """
+        获取依赖阶段的数据：优先使用本次运行生成的缓存，否则从数据库加载，
+        只查询需要的列和行，加载结果按 (阶段, 列, 条件) 缓存
         
-        # 生成基础实体
-        self._generate_bank_managers()
-        self._generate_deposit_types()
-        self._generate_products()
-        self._generate_customers()
+        Args:
+            stage: 阶段名（表名）
+            columns: 需要的列，默认为 DOWNSTREAM_COLUMNS 中登记的列，未登记时为全部列
+            where: WHERE 子句（含关键字），也可附带 ORDER BY / LIMIT
+            
+        Returns:
+            记录列表
+        """
+        rows = self.data_generator.data_cache.get(stage)
+        if rows:
+            return rows
+        
+        if columns is None:
+            columns = DOWNSTREAM_COLUMNS.get(stage, ('*',))
+        key = (stage, columns, where)
+        if key not in self._loaded:
+            self.logger.info(f"从数据库加载{self._STAGE_LABELS.get(stage, stage)}数据...")
+            # 表名和列名按白名单校验后拼接，'*' 表示全部列
+            column_list = ', '.join(
+                column if column == '*' else self.db_manager._safe_ident(column, stage) for column in columns
+            )
+            query = f"SELECT {column_list} FROM {self.db_manager._safe_ident(stage)} {where}".rstrip()
+            self._loaded[key] = self.db_manager.execute_query(query)
+        return self._loaded[key]
+    
+    def _dependency(self, dependency: str) -> Union[List[Dict], np.ndarray]:
+        """
+        获取简单阶段的一个依赖参数
         
-        # 生成关联实体
-        self._generate_fund_accounts()
-        self._generate_app_users()
-        self._generate_wechat_followers()
-        self._generate_work_wechat_contacts()
-        self._generate_channel_profiles()
+        Args:
+            dependency: 依赖阶段名，或 "阶段.列" 表示只需要该列的ID
+            
+        Returns:
+            依赖阶段的记录列表，或ID数组
+        """
+        stage, _, column = dependency.partition('.')
+        if not column:
+            return self._get(stage)
+        rows = self._get(stage, columns=(column,))
+        return self.data_generator.ids(stage, rows, column)
+    
+    def _project(self, stage: str, rows: List[Dict]) -> List[Dict]:
+        """
+        按 DOWNSTREAM_COLUMNS 裁剪要缓存的记录，只保留后续阶段需要的字段
         
-        # 生成业务数据
-        self._generate_loan_records()
-        self._generate_investment_records()
-        self._generate_customer_events()
+        Args:
+            stage: 阶段名（表名）
+            rows: 记录列表
+            
+        Returns:
+            裁剪后的记录列表，未登记的阶段原样返回
+        """
+        columns = DOWNSTREAM_COLUMNS.get(stage)
+        if not columns or not rows:
+            return rows
+        columns = [column for column in columns if column in rows[0]]
+        return [{column: row.get(column) for column in columns} for row in rows]
+    
+    def _progress(self, progress: float, details: str, min_interval: float = 0.5) -> None:
+        """
+        节流上报批次进度：距上次上报不足 min_interval 秒的更新直接丢弃，
+        阶段结束时 complete_stage 总会保存最终状态
         
-        # 生成交易数据
-        self._generate_transactions(start_date, end_date)
+        Args:
+            progress: 进度百分比 (0-100)
+            details: 详情信息
+            min_interval: 两次上报的最小间隔（秒）
+        """
+        now = time.monotonic()
+        if now - self._progress_budget < min_interval:
+            return
+        self._progress_budget = now
+        self.checkpoint_manager.update_progress(progress, details)
+    
+    @contextlib.contextmanager
+    def _stage(self, stage: str) -> Iterator[Optional[str]]:
+        """
+        阶段执行的统一外壳：跳过检查、开始、完成与失败标记
         
-        # 执行完成
-        self.checkpoint_manager.complete_run()
-        self.logger.info("数据生成流程执行完成")
+        阶段已完成时产出None，调用方应直接返回；阶段体抛出异常时标记阶段失败并继续抛出。
         
-        return self.total_stats
-    
-    def _generate_bank_managers(self) -> None:
-        """生成银行经理数据"""
-        stage = 'bank_manager'
+        Args:
+            stage: 阶段名称
+            
+        Yields:
+            阶段的中文名称，阶段需跳过时为None
+        """
         if self.checkpoint_manager.should_skip_stage(stage):
             self.logger.info(f"跳过 {stage} 阶段")
+            yield None
             return
         
+        label = self._STAGE_LABELS[stage]
         self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成银行经理数据...")
-        
-        # 生成数据
-        bank_managers = self.data_generator.bank_manager_generator.generate()
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(50, "银行经理数据生成完成，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, bank_managers)
-        self.total_stats[stage] = count
+        self.logger.info(f"生成{label}数据...")
+        try:
+            yield label
+        except Exception as e:
+            self.checkpoint_manager.fail_stage(stage, str(e))
+            raise
         
-        # 缓存数据以供后续使用
-        self.data_generator.data_cache[stage] = bank_managers
-        
-        # 完成阶段
         self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"银行经理数据生成完成，共生成 {count} 条记录")
+        self.logger.info(f"{label}数据生成完成，共生成 {self.total_stats.get(stage, 0)} 条记录")
     
-    def _generate_deposit_types(self) -> None:
-        """生成存款类型数据"""
-        stage = 'deposit_type'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成存款类型数据...")
+    def execute(self, start_date: datetime.date, end_date: datetime.date) -> Dict:
+        """
+        执行数据生成流程
         
-        # 生成数据
-        deposit_types = self.data_generator.deposit_type_generator.generate()
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            生成统计信息
+        """
+        self.logger.info(f"开始执行数据生成流程，时间范围: {start_date} 至 {end_date}")
         
-        # 更新进度
-        self.checkpoint_manager.update_progress(50, "存款类型数据生成完成，准备导入数据库")
+        # 历史数据由本系统生成，导入期间关闭外键和唯一性检查
+        with self.db_manager.bulk_load_mode():
+            # 生成基础实体
+            self._run_stages(self._BASE_STAGES)
+            self._generate_customers()
         
-        # 导入数据库
-        count = self.data_generator.import_data(stage, deposit_types)
-        self.total_stats[stage] = count
+            # 生成关联实体
+            self._generate_fund_accounts()
+            self._run_stages(self._CHANNEL_STAGES)
         
-        # 缓存数据以供后续使用
-        self.data_generator.data_cache[stage] = deposit_types
+            # 生成业务数据
+            self._generate_loan_records()
+            self._generate_investment_records()
+            self._generate_customer_events()
         
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"存款类型数据生成完成，共生成 {count} 条记录")
-    
-    def _generate_products(self) -> None:
-        """生成产品数据"""
-        stage = 'product'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
+            # 生成交易数据
+            self._generate_transactions(start_date, end_date)
         
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成产品数据...")
+        # 执行完成
+        self.checkpoint_manager.complete_run()
+        self.logger.info("数据生成流程执行完成")
         
-        # 生成数据
-        products = self.data_generator.product_generator.generate()
+        return self.total_stats
+    
+    def _run_stages(self, stages: tuple) -> None:
+        """
+        执行一组简单阶段
         
-        # 更新进度
-        self.checkpoint_manager.update_progress(50, "产品数据生成完成，准备导入数据库")
+        开启 system.parallel_stages 时按依赖关系分波执行：同一波中互不依赖的阶段在线程池中
+        并行生成数据，导入数据库和断点状态更新仍在当前线程按顺序进行。
         
-        # 导入数据库
-        count = self.data_generator.import_data(stage, products)
-        self.total_stats[stage] = count
+        Args:
+            stages: (阶段名, 生成器属性, 依赖阶段) 元组序列
+        """
+        if not self.parallel_stages:
+            for stage, generator_attr, dependencies in stages:
+                self._run_stage(stage, generator_attr, dependencies)
+            return
         
-        # 缓存数据以供后续使用
-        self.data_generator.data_cache[stage] = products
+        pending = list(stages)
+        while pending:
+            names = {stage for stage, _, _ in pending}
+            wave = [item for item in pending
+                    if not names.intersection(dependency.split('.')[0] for dependency in item[2])]
+            pending = [item for item in pending if item not in wave]
+            
+            with ThreadPoolExecutor(max_workers=min(len(wave), os.cpu_count() or 1)) as pool:
+                futures = []
+                for stage, generator_attr, dependencies in wave:
+                    if self.checkpoint_manager.should_skip_stage(stage):
+                        futures.append(None)
+                        continue
+                    # 依赖数据可能需要查询数据库，在当前线程获取
+                    args = [self._dependency(dependency) for dependency in dependencies]
+                    generator = getattr(self.data_generator, generator_attr)
+                    futures.append(pool.submit(generator.generate, *args))
+                
+                for (stage, generator_attr, dependencies), future in zip(wave, futures):
+                    self._run_stage(stage, generator_attr, dependencies, future)
+    
+    def _run_stage(self, stage: str, generator_attr: str, dependencies: tuple,
+                   generated: Optional[Future] = None) -> None:
+        """
+        执行一个简单阶段：取依赖数据、生成、导入并缓存
         
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"产品数据生成完成，共生成 {count} 条记录")
+        Args:
+            stage: 阶段名（表名）
+            generator_attr: 数据生成器上对应实体生成器的属性名
+            dependencies: 依赖的阶段，其数据按顺序作为生成器参数
+            generated: 已在线程池中提交的生成任务，为空时在当前线程生成
+        """
+        with self._stage(stage) as label:
+            if label is None:
+                return
+            
+            # 获取依赖数据并生成
+            if generated is not None:
+                rows = generated.result()
+            else:
+                args = [self._dependency(dependency) for dependency in dependencies]
+                rows = getattr(self.data_generator, generator_attr).generate(*args)
+            
+            # 更新进度
+            self.checkpoint_manager.update_progress(50, f"{label}数据生成完成，准备导入数据库")
+            
+            # 导入数据库
+            count = self.data_generator.import_data(stage, rows)
+            self.total_stats[stage] = count
+            
+            # 缓存数据以供后续使用
+            self.data_generator.data_cache[stage] = rows
     
     def _generate_customers(self) -> None:
         """生成客户数据"""
         stage = 'customer'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成客户数据...")
-        
-        # 获取银行经理数据
-        bank_managers = self.data_generator.data_cache.get('bank_manager')
-        if not bank_managers:
-            self.logger.info("从数据库加载银行经理数据...")
-            bank_managers = self.db_manager.execute_query("SELECT * FROM bank_manager")
-        
-        # 生成数据
-        customers = self.data_generator.customer_generator.generate(bank_managers)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(50, "客户数据生成完成，准备导入数据库")
-        
-        # 分批导入数据库
-        total_count = 0
-        total_batches = (len(customers) + self.batch_size - 1) // self.batch_size
-        
-        for i in range(0, len(customers), self.batch_size):
-            batch = customers[i:i+self.batch_size]
-            count = self.data_generator.import_data(stage, batch)
-            total_count += count
+        with self._stage(stage) as label:
+            if label is None:
+                return
             
-            progress = min(50 + 50 * (i + self.batch_size) / len(customers), 99)
-            self.checkpoint_manager.update_progress(
-                progress, 
-                f"客户数据导入中: {i//self.batch_size + 1}/{total_batches} 批次，共 {total_count} 条"
-            )
-        
-        self.total_stats[stage] = total_count
-        
-        # 缓存数据以供后续使用
-        self.data_generator.data_cache[stage] = customers
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"客户数据生成完成，共生成 {total_count} 条记录")
+            # 获取银行经理数据
+            bank_managers = self._get('bank_manager', columns=('manager_id', 'branch_id'))
+            
+            # 按批生成客户，生成与导入流水线并行
+            customer_count = self.config_manager.get_entity_config('customer').get('total_count', 1000)
+            total_batches = max((customer_count + self.batch_size - 1) // self.batch_size, 1)
+            customers = []
+            
+            def produce():
+                rows = self.data_generator.customer_generator.generate_iter(
+                    bank_managers, customer_count, chunk_size=self.batch_size)
+                for batch in _chunked(rows, self.batch_size):
+                    customers.extend(self._project(stage, batch))
+                    yield batch
+            
+            def on_batch(batch_num, count, total_count):
+                self._progress(
+                    min(100 * batch_num / total_batches, 99),
+                    f"客户数据导入中: {batch_num}/{total_batches} 批次，共 {total_count} 条"
+                )
+            
+            total_count = self._pipeline(stage, produce(), on_batch)
+            self.total_stats[stage] = total_count
+            
+            # 缓存数据以供后续使用
+            self.data_generator.data_cache[stage] = customers
     
     def _generate_fund_accounts(self) -> None:
         """生成资金账户数据"""
         stage = 'fund_account'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成资金账户数据...")
-        
-        # 获取客户和存款类型数据
-        customers = self.data_generator.data_cache.get('customer')
-        deposit_types = self.data_generator.data_cache.get('deposit_type')
-        
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not deposit_types:
-            self.logger.info("从数据库加载存款类型数据...")
-            deposit_types = self.db_manager.execute_query("SELECT * FROM deposit_type")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(10, "开始生成资金账户数据")
-        
-        # 生成数据
-        fund_accounts = self.data_generator.fund_account_generator.generate(customers, deposit_types)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(50, "资金账户数据生成完成，准备导入数据库")
-        
-        # 分批导入数据库
-        total_count = 0
-        total_batches = (len(fund_accounts) + self.batch_size - 1) // self.batch_size
-        
-        for i in range(0, len(fund_accounts), self.batch_size):
-            batch = fund_accounts[i:i+self.batch_size]
-            count = self.data_generator.import_data(stage, batch)
-            total_count += count
+        with self._stage(stage) as label:
+            if label is None:
+                return
             
-            progress = min(50 + 50 * (i + self.batch_size) / len(fund_accounts), 99)
-            self.checkpoint_manager.update_progress(
-                progress, 
-                f"资金账户数据导入中: {i//self.batch_size + 1}/{total_batches} 批次，共 {total_count} 条"
-            )
-        
-        self.total_stats[stage] = total_count
-        
-        # 缓存数据以供后续使用
-        self.data_generator.data_cache[stage] = fund_accounts
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"资金账户数据生成完成，共生成 {total_count} 条记录")
+            # 获取客户和存款类型数据
+            customers = self._get('customer')
+            deposit_types = self._get('deposit_type')
+            
+            # 更新进度
+            self.checkpoint_manager.update_progress(10, "开始生成资金账户数据")
+            
+            # 按客户分批生成账户，生成与导入流水线并行
+            total_batches = max((len(customers) + self.batch_size - 1) // self.batch_size, 1)
+            fund_accounts = []
+            
+            def produce():
+                for batch_customers in _chunked(customers, self.batch_size):
+                    batch = self.data_generator.fund_account_generator.generate(batch_customers, deposit_types)
+                    fund_accounts.extend(self._project(stage, batch))
+                    yield batch
+            
+            def on_batch(batch_num, count, total_count):
+                self._progress(
+                    min(10 + 90 * batch_num / total_batches, 99),
+                    f"资金账户数据导入中: {batch_num}/{total_batches} 批次，共 {total_count} 条"
+                )
+            
+            total_count = self._pipeline(stage, produce(), on_batch)
+            self.total_stats[stage] = total_count
+            
+            # 缓存数据以供后续使用
+            self.data_generator.data_cache[stage] = fund_accounts
     
     def _generate_loan_records(self) -> None:
         """生成贷款记录数据"""
         stage = 'loan_record'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成贷款记录数据...")
-        
-        # 获取客户和账户数据
-        customers = self.data_generator.data_cache.get('customer')
-        fund_accounts = self.data_generator.data_cache.get('fund_account')
-        
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not fund_accounts:
-            self.logger.info("从数据库加载资金账户数据...")
-            fund_accounts = self.db_manager.execute_query("SELECT * FROM fund_account")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(10, "准备生成贷款记录数据")
-        
-        # 分批处理客户
-        total_loan_records = []
-        total_customers = len(customers)
-        processed_customers = 0
-        
-        # 定义进度回调函数
-        def progress_callback(progress, processed, total):
-            # 将生成阶段的进度（0-100）映射到整体的10%-90%
-            overall_progress = 10 + (progress * 0.8)
-            self.checkpoint_manager.update_progress(
-                overall_progress,
-                f"贷款记录生成中: {processed}/{total} 客户处理完成，{progress:.1f}%"
-            )
-        
-        # 分批生成贷款记录
-        for i in range(0, total_customers, self.batch_size):
-            batch_customers = customers[i:min(i+self.batch_size, total_customers)]
+        with self._stage(stage) as label:
+            if label is None:
+                return
+            
+            # 获取客户和账户数据
+            customers = self._get('customer')
+            fund_accounts = self._get('fund_account')
             
             # 更新进度
-            processed_customers += len(batch_customers)
-            batch_progress = (processed_customers / total_customers) * 100
-            self.checkpoint_manager.update_progress(
-                10 + (batch_progress * 0.4), 
-                f"贷款记录生成第 {i//self.batch_size + 1} 批客户: {processed_customers}/{total_customers}"
-            )
+            self.checkpoint_manager.update_progress(10, "准备生成贷款记录数据")
             
-            # 为当前批次生成贷款记录
-            batch_loan_records = self.data_generator.loan_record_generator.generate(
-                batch_customers, fund_accounts
-            )
+            # 按客户分批生成贷款记录，每批生成后立即导入，生成与导入流水线并行
+            total_customers = len(customers)
+            total_batches = max((total_customers + self.batch_size - 1) // self.batch_size, 1)
             
-            total_loan_records.extend(batch_loan_records)
+            def produce():
+                for batch_customers in _chunked(customers, self.batch_size):
+                    yield self.data_generator.loan_record_generator.generate(batch_customers, fund_accounts)
             
-            # 频繁保存状态，以防中断
-            self.checkpoint_manager.update_progress(
-                10 + (batch_progress * 0.8),
-                f"贷款记录已生成 {len(total_loan_records)} 条，处理了 {processed_customers}/{total_customers} 客户"
-            )
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(90, f"贷款记录生成完成，共 {len(total_loan_records)} 条，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, total_loan_records)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"贷款记录数据生成完成，共生成 {count} 条记录")
+            def on_batch(batch_num, count, total_count):
+                processed_customers = min(batch_num * self.batch_size, total_customers)
+                self._progress(
+                    10 + 80 * batch_num / total_batches,
+                    f"贷款记录已导入 {total_count} 条，处理了 {processed_customers}/{total_customers} 客户"
+                )
+            
+            count = self._pipeline(stage, produce(), on_batch)
+            self.total_stats[stage] = count
     
     def _generate_investment_records(self) -> None:
         """生成投资记录数据"""
         stage = 'investment_record'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成投资记录数据...")
-        
-        # 获取客户、账户和产品数据
-        customers = self.data_generator.data_cache.get('customer')
-        fund_accounts = self.data_generator.data_cache.get('fund_account')
-        products = self.data_generator.data_cache.get('product')
-        
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not fund_accounts:
-            self.logger.info("从数据库加载资金账户数据...")
-            fund_accounts = self.db_manager.execute_query("SELECT * FROM fund_account")
-        
-        if not products:
-            self.logger.info("从数据库加载产品数据...")
-            products = self.db_manager.execute_query("SELECT * FROM product")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(10, "准备生成投资记录数据")
-        
-        # 分批处理客户
-        total_investment_records = []
-        total_customers = len(customers)
-        processed_customers = 0
-        
-        # 分批生成投资记录
-        for i in range(0, total_customers, self.batch_size):
-            batch_customers = customers[i:min(i+self.batch_size, total_customers)]
+        with self._stage(stage) as label:
+            if label is None:
+                return
+            
+            # 获取客户、账户和产品数据
+            customers = self._get('customer')
+            fund_accounts = self._get('fund_account')
+            products = self._get('product')
             
             # 更新进度
-            processed_customers += len(batch_customers)
-            batch_progress = (processed_customers / total_customers) * 100
-            self.checkpoint_manager.update_progress(
-                10 + (batch_progress * 0.4), 
-                f"投资记录生成第 {i//self.batch_size + 1} 批客户: {processed_customers}/{total_customers}"
-            )
+            self.checkpoint_manager.update_progress(10, "准备生成投资记录数据")
             
-            # 为当前批次生成投资记录
-            batch_investment_records = self.data_generator.investment_record_generator.generate(
-                batch_customers, fund_accounts, products
-            )
+            # 按客户分批生成投资记录，每批生成后立即导入，生成与导入流水线并行
+            total_customers = len(customers)
+            total_batches = max((total_customers + self.batch_size - 1) // self.batch_size, 1)
             
-            total_investment_records.extend(batch_investment_records)
+            def produce():
+                for batch_customers in _chunked(customers, self.batch_size):
+                    yield self.data_generator.investment_record_generator.generate(
+                        batch_customers, fund_accounts, products
+                    )
             
-            # 频繁保存状态，以防中断
-            self.checkpoint_manager.update_progress(
-                10 + (batch_progress * 0.8),
-                f"投资记录已生成 {len(total_investment_records)} 条，处理了 {processed_customers}/{total_customers} 客户"
-            )
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(90, f"投资记录生成完成，共 {len(total_investment_records)} 条，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, total_investment_records)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"投资记录数据生成完成，共生成 {count} 条记录")
-    
-    def _generate_app_users(self) -> None:
-        """生成APP用户数据"""
-        stage = 'app_user'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成APP用户数据...")
-        
-        # 获取客户数据
-        customers = self.data_generator.data_cache.get('customer')
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(30, "生成APP用户数据中...")
-        
-        # 生成数据
-        app_users = self.data_generator.app_user_generator.generate(customers)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(60, "APP用户数据生成完成，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, app_users)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"APP用户数据生成完成，共生成 {count} 条记录")
-    
-    def _generate_wechat_followers(self) -> None:
-        """生成公众号粉丝数据"""
-        stage = 'wechat_follower'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成公众号粉丝数据...")
-        
-        # 获取客户和APP用户数据
-        customers = self.data_generator.data_cache.get('customer')
-        app_users = self.data_generator.data_cache.get('app_user')
-        
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not app_users:
-            self.logger.info("从数据库加载APP用户数据...")
-            app_users = self.db_manager.execute_query("SELECT * FROM app_user")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(30, "生成公众号粉丝数据中...")
-        
-        # 生成数据
-        wechat_followers = self.data_generator.wechat_follower_generator.generate(customers, app_users)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(60, "公众号粉丝数据生成完成，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, wechat_followers)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"公众号粉丝数据生成完成，共生成 {count} 条记录")
-    
-    def _generate_work_wechat_contacts(self) -> None:
-        """生成企业微信联系人数据"""
-        stage = 'work_wechat_contact'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成企业微信联系人数据...")
-        
-        # 获取客户数据
-        customers = self.data_generator.data_cache.get('customer')
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(30, "生成企业微信联系人数据中...")
-        
-        # 生成数据
-        work_wechat_contacts = self.data_generator.work_wechat_contact_generator.generate(customers)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(60, "企业微信联系人数据生成完成，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, work_wechat_contacts)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"企业微信联系人数据生成完成，共生成 {count} 条记录")
-    
-    def _generate_channel_profiles(self) -> None:
-        """生成全渠道档案数据"""
-        stage = 'channel_profile'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成全渠道档案数据...")
-        
-        # 获取各类数据
-        customers = self.data_generator.data_cache.get('customer')
-        app_users = self.data_generator.data_cache.get('app_user')
-        wechat_followers = self.data_generator.data_cache.get('wechat_follower')
-        work_wechat_contacts = self.data_generator.data_cache.get('work_wechat_contact')
-        
-        # 如果缓存中没有，从数据库加载
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not app_users:
-            self.logger.info("从数据库加载APP用户数据...")
-            app_users = self.db_manager.execute_query("SELECT * FROM app_user")
-        
-        if not wechat_followers:
-            self.logger.info("从数据库加载公众号粉丝数据...")
-            wechat_followers = self.db_manager.execute_query("SELECT * FROM wechat_follower")
-        
-        if not work_wechat_contacts:
-            self.logger.info("从数据库加载企业微信联系人数据...")
-            work_wechat_contacts = self.db_manager.execute_query("SELECT * FROM work_wechat_contact")
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(30, "生成全渠道档案数据中...")
-        
-        # 生成数据
-        channel_profiles = self.data_generator.channel_profile_generator.generate(
-            customers, app_users, wechat_followers, work_wechat_contacts
-        )
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(60, "全渠道档案数据生成完成，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, channel_profiles)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"全渠道档案数据生成完成，共生成 {count} 条记录")
+            def on_batch(batch_num, count, total_count):
+                processed_customers = min(batch_num * self.batch_size, total_customers)
+                self._progress(
+                    10 + 80 * batch_num / total_batches,
+                    f"投资记录已导入 {total_count} 条，处理了 {processed_customers}/{total_customers} 客户"
+                )
+            
+            count = self._pipeline(stage, produce(), on_batch)
+            self.total_stats[stage] = count
     
     def _generate_customer_events(self) -> None:
         """生成客户事件数据"""
         stage = 'customer_event'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info("生成客户事件数据...")
-        
-        # 获取客户和产品数据
-        customers = self.data_generator.data_cache.get('customer')
-        products = self.data_generator.data_cache.get('product')
-        
-        if not customers:
-            self.logger.info("从数据库加载客户数据...")
-            customers = self.db_manager.execute_query("SELECT * FROM customer")
-        
-        if not products:
-            self.logger.info("从数据库加载产品数据...")
-            products = self.db_manager.execute_query("SELECT * FROM product")
-        
-        # 计算时间范围
-        start_date, end_date = self.time_manager.calculate_historical_period()
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(10, "准备生成客户事件数据")
-        
-        # 确定要生成的客户子集（避免为所有客户生成事件）
-        max_event_customers = min(len(customers), 500)  # 最多为500个客户生成事件
-        selected_customers = customers[:max_event_customers]
-        
-        # 分批生成事件
-        total_events = []
-        total_days = (end_date - start_date).days + 1
-        days_per_batch = 30  # 每批30天
-        
-        for i in range(0, total_days, days_per_batch):
-            batch_start = start_date + datetime.timedelta(days=i)
-            batch_end = min(start_date + datetime.timedelta(days=i+days_per_batch-1), end_date)
+        with self._stage(stage) as label:
+            if label is None:
+                return
+            
+            # 获取客户和产品数据
+            customers = self._get('customer')
+            products = self._get('product')
+            
+            # 计算时间范围
+            start_date, end_date = self.time_manager.calculate_historical_period()
             
             # 更新进度
-            progress = 10 + (i / total_days) * 80
-            self.checkpoint_manager.update_progress(
-                progress,
-                f"生成客户事件数据: {batch_start} 至 {batch_end}"
-            )
+            self.checkpoint_manager.update_progress(10, "准备生成客户事件数据")
             
-            # 生成当前时间段的事件
-            batch_events = self.data_generator.customer_event_generator.generate(
-                selected_customers, products, batch_start, batch_end
-            )
+            # 确定要生成的客户子集（避免为所有客户生成事件）
+            selected_customers = customers[:self._events_customer_cap]
             
-            total_events.extend(batch_events)
-        
-        # 更新进度
-        self.checkpoint_manager.update_progress(90, f"客户事件数据生成完成，共 {len(total_events)} 条，准备导入数据库")
-        
-        # 导入数据库
-        count = self.data_generator.import_data(stage, total_events)
-        self.total_stats[stage] = count
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"客户事件数据生成完成，共生成 {count} 条记录")
+            # 分批生成事件，每个时间段生成后立即导入，不再累积全部事件
+            date_ranges = self.time_manager.split_date_range(start_date, end_date, days_per_batch=self._events_days)
+            total_batches = len(date_ranges)
+            
+            def produce():
+                for batch_start, batch_end in date_ranges:
+                    yield self.data_generator.customer_event_generator.generate(
+                        selected_customers, products, batch_start, batch_end
+                    )
+            
+            def on_batch(batch_num, count, total_count):
+                self._progress(
+                    10 + 80 * batch_num / total_batches,
+                    f"客户事件数据导入中: {batch_num}/{total_batches} 个时间段，累计 {total_count} 条"
+                )
+            
+            count = self._pipeline(stage, produce(), on_batch)
+            self.total_stats[stage] = count
     
     def _generate_transactions(self, start_date: datetime.date, end_date: datetime.date) -> None:
         """
@@ -666,59 +612,40 @@ class GenerationExecutor:
             end_date: 结束日期
         """
         stage = 'transaction'
-        if self.checkpoint_manager.should_skip_stage(stage):
-            self.logger.info(f"跳过 {stage} 阶段")
-            return
-        
-        self.checkpoint_manager.start_stage(stage)
-        self.logger.info(f"生成交易数据，时间范围: {start_date} 至 {end_date}...")
-        
-        # 获取活跃账户数据
-        fund_accounts = self.data_generator.data_cache.get('fund_account')
-        if not fund_accounts:
-            self.logger.info("从数据库加载资金账户数据...")
-            fund_accounts = self.db_manager.execute_query("SELECT * FROM fund_account WHERE status = 'active'")
-        
-        # 将活跃账户限制在合理范围内，避免生成过多交易
-        active_accounts = [acc for acc in fund_accounts if acc.get('status') == 'active']
-        if len(active_accounts) > 1000:
-            self.logger.info(f"限制活跃账户数量从 {len(active_accounts)} 到 1000")
-            active_accounts = active_accounts[:1000]
-        
-        # 分割时间范围为多个小批次
-        date_ranges = self.time_manager.split_date_range(start_date, end_date, days_per_batch=15)
-        total_date_ranges = len(date_ranges)
-        
-        # 生成交易数据
-        total_transactions = 0
-        
-        for i, (batch_start, batch_end) in enumerate(date_ranges):
-            # 更新进度
-            progress = (i / total_date_ranges) * 100
-            self.checkpoint_manager.update_progress(
-                progress, 
-                f"生成交易数据: 第 {i+1}/{total_date_ranges} 个时间段，{batch_start} 至 {batch_end}"
-            )
+        with self._stage(stage) as label:
+            if label is None:
+                return
             
-            # 生成当前时间段的交易数据
-            transactions = self.data_generator.transaction_generator.generate(
-                active_accounts, batch_start, batch_end, mode='historical'
-            )
+            self.logger.info(f"交易数据时间范围: {start_date} 至 {end_date}")
             
-            # 导入数据库
-            batch_count = self.data_generator.import_data('account_transaction', transactions)
-            total_transactions += batch_count
+            # 获取活跃账户数据，限制账户数量，避免生成过多交易；缓存未命中时筛选和截取在SQL中完成
+            account_cap = self._tx_account_cap
+            fund_accounts = self._get('fund_account',
+                                      where=f"WHERE status = 'active' ORDER BY account_id LIMIT {account_cap}")
             
-            # 更新进度
-            self.checkpoint_manager.update_progress(
-                progress + (1 / total_date_ranges) * 50,
-                f"交易数据导入中: 第 {i+1}/{total_date_ranges} 个时间段完成，累计 {total_transactions} 条交易"
-            )
+            # 缓存命中时按列数组一次向量化筛选
+            soa = self.data_generator.to_soa('fund_account', fund_accounts) if fund_accounts else {}
+            active_idx = np.flatnonzero(np.asarray(soa['status'] == 'active'))[:account_cap] if 'status' in soa else []
+            active_accounts = [fund_accounts[i] for i in active_idx]
             
-            self.logger.info(f"时间段 {batch_start} 至 {batch_end} 的交易数据已生成并导入，共 {batch_count} 条")
-        
-        self.total_stats[stage] = total_transactions
-        
-        # 完成阶段
-        self.checkpoint_manager.complete_stage(stage)
-        self.logger.info(f"交易数据生成完成，共生成 {total_transactions} 条记录")
\ No newline at end of file
+            # 分割时间范围为多个小批次
+            date_ranges = self.time_manager.split_date_range(start_date, end_date, days_per_batch=self._tx_days)
+            total_date_ranges = len(date_ranges)
+            
+            # 按时间段生成交易数据，生成与导入流水线并行
+            def produce():
+                for batch_start, batch_end in date_ranges:
+                    yield self.data_generator.transaction_generator.generate(
+                        active_accounts, batch_start, batch_end, mode='historical'
+                    )
+            
+            def on_batch(batch_num, batch_count, total_count):
+                batch_start, batch_end = date_ranges[batch_num - 1]
+                self._progress(
+                    min(100 * batch_num / total_date_ranges, 99),
+                    f"交易数据导入中: 第 {batch_num}/{total_date_ranges} 个时间段完成，累计 {total_count} 条交易"
+                )
+                self.logger.info(f"时间段 {batch_start} 至 {batch_end} 的交易数据已生成并导入，共 {batch_count} 条")
+            
+            total_transactions = self._pipeline('account_transaction', produce(), on_batch)
+            self.total_stats[stage] = total_transactions
\ No newline at end of file
@@ -8,10 +8,91 @@
 """
 
 import os
+import queue
+import atexit
+import threading
 import logging
 import datetime
-from typing import Optional, Dict, Any
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from typing import Optional, Dict, Any, Tuple
+from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler, QueueHandler, QueueListener
+
+
+# 控制台和文件共用的日志格式
+_LOG_FORMATTER = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+def configure_fast_records() -> None:
+    """
+    创建LogRecord时不再获取线程、进程信息
+    
+    本模块的日志格式不含这些字段，但该设置对进程内所有Logger（包括第三方库）生效，
+    使用 %(thread)d、%(process)d 等字段的格式会输出None，因此只由入口脚本显式调用。
+    """
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+
+class BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    带写缓冲的按大小轮转文件处理器
+    
+    日志以二进制方式写入64KB缓冲区，每 flush_every 条或遇到WARNING及以上级别时才写入磁盘；
+    文件大小由处理器自行累计，判断轮转时不再查询文件位置。
+    """
+    
+    def __init__(self, filename: str, maxBytes: int = 0, backupCount: int = 0, encoding: str = 'utf-8',
+                 buffer_size: int = 65536, flush_every: int = 200, delay: bool = False):
+        """
+        初始化处理器
+        
+        Args:
+            filename: 日志文件路径
+            maxBytes: 单个日志文件最大字节数，为0时不轮转
+            backupCount: 备份文件数量
+            encoding: 日志文件编码
+            buffer_size: 写缓冲区字节数
+            flush_every: 每写入多少条日志刷新一次缓冲区
+            delay: 是否推迟到写入第一条日志时才打开文件
+        """
+        self.buffer_size = buffer_size
+        self.flush_every = flush_every
+        self._size = 0
+        self._pending = 0
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding=encoding, delay=delay)
+    
+    def _open(self):
+        """以带缓冲的二进制追加方式打开日志文件，并记录当前文件大小"""
+        stream = open(self.baseFilename, 'ab', buffering=self.buffer_size)
+        self._size = stream.tell()
+        self._pending = 0
+        return stream
+    
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        写入一条日志，必要时先轮转文件
+        
+        Args:
+            record: 日志记录
+        """
+        try:
+            data = (self.format(record) + self.terminator).encode(self.encoding or 'utf-8', 'backslashreplace')
+            if self.stream is None:
+                self.stream = self._open()
+            if self.maxBytes > 0 and self._size and self._size + len(data) > self.maxBytes:
+                # 关闭旧文件时会写出缓冲区中的内容
+                self.doRollover()
+                if self.stream is None:
+                    self.stream = self._open()
+            self.stream.write(data)
+            self._size += len(data)
+            self._pending += 1
+            if record.levelno >= logging.WARNING or self._pending >= self.flush_every:
+                self.stream.flush()
+                self._pending = 0
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
 
 
 class Logger:
@@ -58,6 +139,7 @@ class Logger:
         self.file_output = file_output
         self.max_bytes = max_bytes
         self.backup_count = backup_count
+        self._listener = None
         
         # 如果未指定日志目录，则使用默认目录
         if log_dir is None:
@@ -86,9 +168,7 @@ class Logger:
         if self.console_output:
             console_handler = logging.StreamHandler()
             console_handler.setLevel(self.level)
-            console_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            console_handler.setFormatter(console_formatter)
+            console_handler.setFormatter(_LOG_FORMATTER)
             self.logger.addHandler(console_handler)
         
         # 添加文件输出
@@ -97,14 +177,30 @@ class Logger:
             today = datetime.datetime.now().strftime('%Y%m%d')
             log_file = os.path.join(self.log_dir, f"{name}_{today}.log")
             
-            # 使用RotatingFileHandler进行日志轮转
-            file_handler = RotatingFileHandler(
-                log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8')
+            # 使用带写缓冲的RotatingFileHandler进行日志轮转
+            # 从未写日志的Logger不打开文件
+            file_handler = BufferedRotatingFileHandler(
+                log_file, maxBytes=self.max_bytes, backupCount=self.backup_count, encoding='utf-8', delay=True)
             file_handler.setLevel(self.level)
-            file_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-            file_handler.setFormatter(file_formatter)
-            self.logger.addHandler(file_handler)
+            file_handler.setFormatter(_LOG_FORMATTER)
+            
+            # 文件写入交给后台线程：记录日志时只入队，由监听线程写入文件；
+            # 级别在入队前由QueueHandler过滤，set_level 后不会丢弃已入队的记录
+            log_queue = queue.Queue(-1)
+            self._listener = QueueListener(log_queue, file_handler)
+            self._listener.start()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(self.level)
+            self.logger.addHandler(queue_handler)
+            atexit.register(self.close)
+    
+    def close(self) -> None:
+        """停止后台写入线程，写完队列中剩余的日志并关闭日志文件"""
+        if self._listener is not None:
+            self._listener.stop()
+            for handler in self._listener.handlers:
+                handler.close()
+            self._listener = None
     
     def get_logger(self) -> logging.Logger:
         """
@@ -115,6 +211,15 @@ class Logger:
         """
         return self.logger
     
+    def is_debug_enabled(self) -> bool:
+        """
+        是否输出debug级别日志，调用方可据此跳过调试信息的拼接
+        
+        Returns:
+            是否启用了debug级别
+        """
+        return self.logger.isEnabledFor(logging.DEBUG)
+    
     def debug(self, message: str, *args, **kwargs) -> None:
         """
         记录debug级别日志
@@ -123,7 +228,8 @@ class Logger:
             message: 日志消息
             *args, **kwargs: 传递给logger.debug的其他参数
         """
-        self.logger.debug(message, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(message, *args, **kwargs)
     
     def info(self, message: str, *args, **kwargs) -> None:
         """
@@ -133,7 +239,8 @@ class Logger:
             message: 日志消息
             *args, **kwargs: 传递给logger.info的其他参数
         """
-        self.logger.info(message, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(message, *args, **kwargs)
     
     def warning(self, message: str, *args, **kwargs) -> None:
         """
@@ -143,7 +250,8 @@ class Logger:
             message: 日志消息
             *args, **kwargs: 传递给logger.warning的其他参数
         """
-        self.logger.warning(message, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(message, *args, **kwargs)
     
     def error(self, message: str, *args, **kwargs) -> None:
         """
@@ -153,7 +261,8 @@ class Logger:
             message: 日志消息
             *args, **kwargs: 传递给logger.error的其他参数
         """
-        self.logger.error(message, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(message, *args, **kwargs)
     
     def critical(self, message: str, *args, **kwargs) -> None:
         """
@@ -163,7 +272,8 @@ class Logger:
             message: 日志消息
             *args, **kwargs: 传递给logger.critical的其他参数
         """
-        self.logger.critical(message, *args, **kwargs)
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger.critical(message, *args, **kwargs)
     
     def set_level(self, level: str) -> None:
         """
@@ -193,31 +303,32 @@ class Logger:
         
         # 计算截止日期
         cutoff_date = datetime.datetime.now() - datetime.timedelta(days=days)
-        cutoff_date_str = cutoff_date.strftime('%Y%m%d')
+        cutoff_ts = cutoff_date.timestamp()
+        prefix = self.name + '_'
         
         # 遍历日志目录
         count = 0
-        for filename in os.listdir(self.log_dir):
-            if not os.path.isfile(os.path.join(self.log_dir, filename)):
-                continue
-            
-            # 检查是否是日志文件且日期早于截止日期
-            parts = filename.split('_')
-            if len(parts) >= 2 and parts[0] == self.name and parts[1].endswith('.log'):
-                file_date = parts[1].replace('.log', '')
-                if file_date < cutoff_date_str:
+        with os.scandir(self.log_dir) as entries:
+            for entry in entries:
+                # 先按文件名筛选本日志的文件，目录项自带文件类型，无需再对每个文件单独stat
+                if not (entry.name.startswith(prefix) and entry.name.endswith('.log')) or not entry.is_file():
+                    continue
+                
+                # 按最后修改时间判断是否早于截止日期
+                if entry.stat(follow_symlinks=False).st_mtime < cutoff_ts:
                     # 移动到归档目录
-                    src_path = os.path.join(self.log_dir, filename)
-                    dst_path = os.path.join(archive_dir, filename)
-                    os.rename(src_path, dst_path)
+                    os.replace(entry.path, os.path.join(archive_dir, entry.name))
                     count += 1
         
         self.info(f"已归档 {count} 个日志文件到 {archive_dir}")
         return count
 
 
-# 单例模式
-_instances: Dict[str, Logger] = {}
+# 单例模式：按完整参数缓存，命中时无需加锁
+# 按名称保存的Logger实例及其创建参数，是同名Logger的唯一来源
+_instances: Dict[str, Tuple[tuple, Logger]] = {}
+_instances_lock = threading.Lock()
+
 
 def get_logger(name: str = 'bank_data_simulation', log_dir: Optional[str] = None, 
                level: str = 'info', console_output: bool = True, 
@@ -235,10 +346,23 @@ def get_logger(name: str = 'bank_data_simulation', log_dir: Optional[str] = None
     Returns:
         Logger实例
     """
-    global _instances
-    if name not in _instances:
-        _instances[name] = Logger(name, log_dir, level, console_output, file_output)
-    return _instances[name]
+    key = (log_dir, level, console_output, file_output)
+    
+    # 快速路径：参数相同的已有实例直接返回，不加锁
+    entry = _instances.get(name)
+    if entry is not None and entry[0] == key:
+        return entry[1]
+    
+    # 首次创建或参数变化：以新参数重建，并关闭旧实例的后台写入线程
+    with _instances_lock:
+        entry = _instances.get(name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        if entry is not None:
+            entry[1].close()
+        instance = Logger(name, log_dir, level, console_output, file_output)
+        _instances[name] = (key, instance)
+        return instance
 
 
 if __name__ == "__main__":
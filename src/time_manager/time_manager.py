@@ -8,18 +8,71 @@
 """
 
 import os
+import time
+import functools
 import datetime
-import pytz
+import numpy as np
 from typing import Dict, Tuple, Optional, List, Union
 
 # 导入项目模块
 from src.config_manager import get_config_manager
 from src.logger import get_logger
 
+# 优先使用标准库 zoneinfo（Python 3.9+），旧版本回退到 pytz
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # pragma: no cover
+    ZoneInfo = None
+    import pytz
+
+
+# 系统统一使用的日期时间格式，解析和格式化这两种格式时走 isoformat 快速路径
+_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+_DATE_FORMAT = '%Y-%m-%d'
+
+
+def _weekdays(days: np.ndarray) -> np.ndarray:
+    """由 datetime64[D] 数组计算星期几（周一为0），1970-01-01 为星期四"""
+    return (days.astype(np.int64) + 3) % 7
+
+
+# 时区数据不可用时使用的中国标准时间（1991年后无夏令时，固定UTC+8）
+_CHINA_STANDARD_TIME = datetime.timezone(datetime.timedelta(hours=8), 'Asia/Shanghai')
+
+
+def _is_iso_date(value: str) -> bool:
+    """判断字符串是否为 YYYY-MM-DD 开头的形式（排除 fromisoformat 额外接受的周日期等写法）"""
+    return len(value) >= 10 and value[4] == '-' and value[7] == '-'
+
 
 class TimeManager:
     """时间管理类，负责处理时间相关的操作"""
     
+    # 业务权重查表：按星期几（周一为0）、小时、日、月取值，相乘即为权重
+    _WEEKDAY_WEIGHTS = (1.5, 1.5, 1.5, 1.5, 1.5, 0.6, 0.6)  # 工作日交易量更大，周末较少
+    _HOUR_WEIGHTS = (
+        (0.3,) * 9      # 深夜
+        + (1.8,) * 3    # 上午高峰 9-12
+        + (0.7,) * 2    # 午休时间 12-14
+        + (1.5,) * 3    # 下午高峰 14-17
+        + (0.9,) * 5    # 晚间 17-22
+        + (0.3,) * 2    # 深夜
+    )
+    _DAY_WEIGHTS = (1.0,) + (1.3,) * 10 + (1.0,) * 10 + (1.2,) * 11  # 下标为日；月初、月末交易量较大
+    _MONTH_WEIGHTS = (1.0, 1.4, 1.4, 1.0, 1.0, 1.0, 1.0, 1.1, 1.1, 1.0, 1.0, 1.0, 1.3)  # 下标为月；春节前后、暑期、年末
+    
+    # 频繁调用的方法中使用的日期时间函数，预先绑定为类属性，省去模块全局和属性查找
+    _strptime = staticmethod(datetime.datetime.strptime)
+    _datetime_fromisoformat = staticmethod(datetime.datetime.fromisoformat)
+    _date_fromisoformat = staticmethod(datetime.date.fromisoformat)
+    _date_fromordinal = staticmethod(datetime.date.fromordinal)
+    _combine = staticmethod(datetime.datetime.combine)
+    _timedelta = datetime.timedelta
+    
+    # 批量计算用的数组形式
+    _WEEKDAY_WEIGHT_ARRAY = np.array(_WEEKDAY_WEIGHTS)
+    _HOUR_WEIGHT_ARRAY = np.array(_HOUR_WEIGHTS)
+    
     def __init__(self, timezone: str = 'Asia/Shanghai'):
         """
         初始化时间管理器
@@ -31,15 +84,36 @@ class TimeManager:
         self.config_manager = get_config_manager()
         
         # 设置时区
-        try:
-            self.timezone = pytz.timezone(timezone)
-        except pytz.exceptions.UnknownTimeZoneError:
-            self.logger.warning(f"未知时区: {timezone}，将使用默认时区: Asia/Shanghai")
-            self.timezone = pytz.timezone('Asia/Shanghai')
+        if ZoneInfo is not None:
+            try:
+                self.timezone = ZoneInfo(timezone)
+            except (ZoneInfoNotFoundError, ValueError):
+                self.logger.warning(f"未知时区: {timezone}，将使用默认时区: Asia/Shanghai")
+                self.timezone = _CHINA_STANDARD_TIME
+        else:
+            try:
+                self.timezone = pytz.timezone(timezone)
+            except pytz.exceptions.UnknownTimeZoneError:
+                self.logger.warning(f"未知时区: {timezone}，将使用默认时区: Asia/Shanghai")
+                self.timezone = pytz.timezone('Asia/Shanghai')
         
-        # 缓存当前时间，避免在短时间内多次调用时出现时间差异
+        # 缓存当前时间，避免在短时间内多次调用时出现时间差异；缓存期按单调时钟判断
         self.current_time = None
-        self.current_time_updated_at = None
+        self._current_time_mono = 0.0
+    
+    def localize(self, dt: datetime.datetime) -> datetime.datetime:
+        """
+        为不带时区的日期时间加上系统时区
+        
+        Args:
+            dt: 不带时区的日期时间
+            
+        Returns:
+            带时区的日期时间
+        """
+        if hasattr(self.timezone, 'localize'):
+            return self.timezone.localize(dt)
+        return dt.replace(tzinfo=self.timezone)
     
     def get_current_time(self, refresh: bool = False) -> datetime.datetime:
         """
@@ -51,18 +125,16 @@ class TimeManager:
         Returns:
             当前时间
         """
-        now = datetime.datetime.now(self.timezone)
+        mono = time.monotonic()
         
-        # 判断是否需要更新缓存
-        if refresh or self.current_time is None or \
-           self.current_time_updated_at is None or \
-           (now - self.current_time_updated_at).total_seconds() > 5:  # 5秒缓存期
-            self.current_time = now
-            self.current_time_updated_at = now
+        # 判断是否需要更新缓存，只在刷新时才构造带时区的当前时间
+        if refresh or self.current_time is None or mono - self._current_time_mono > 5:  # 5秒缓存期
+            self.current_time = datetime.datetime.now(self.timezone)
+            self._current_time_mono = mono
         
         return self.current_time
     
-    def format_datetime(self, dt: datetime.datetime, format_str: str = '%Y-%m-%d %H:%M:%S') -> str:
+    def format_datetime(self, dt: datetime.datetime, format_str: str = _DATETIME_FORMAT) -> str:
         """
         格式化日期时间
         
@@ -73,9 +145,12 @@ class TimeManager:
         Returns:
             格式化后的字符串
         """
+        if format_str == _DATETIME_FORMAT:
+            # 数据库格式直接截取 isoformat 的结果，省去 strftime 解析格式字符串（去掉时区后缀）
+            return dt.isoformat(' ', 'seconds')[:19]
         return dt.strftime(format_str)
     
-    def format_date(self, date: datetime.date, format_str: str = '%Y-%m-%d') -> str:
+    def format_date(self, date: datetime.date, format_str: str = _DATE_FORMAT) -> str:
         """
         格式化日期
         
@@ -86,6 +161,8 @@ class TimeManager:
         Returns:
             格式化后的字符串
         """
+        if format_str == _DATE_FORMAT:
+            return date.isoformat()[:10]
         return date.strftime(format_str)
     
     def parse_datetime(self, datetime_str: str, format_str: str = '%Y-%m-%d %H:%M:%S') -> datetime.datetime:
@@ -100,8 +177,12 @@ class TimeManager:
             日期时间对象
         """
         try:
-            dt = datetime.datetime.strptime(datetime_str, format_str)
-            return self.timezone.localize(dt) if dt.tzinfo is None else dt
+            if format_str == _DATETIME_FORMAT and len(datetime_str) == 19 and datetime_str[10] == ' ' \
+                    and _is_iso_date(datetime_str):
+                dt = self._datetime_fromisoformat(datetime_str)
+            else:
+                dt = self._strptime(datetime_str, format_str)
+            return self.localize(dt) if dt.tzinfo is None else dt
         except ValueError as e:
             self.logger.error(f"解析日期时间字符串失败: {str(e)}")
             raise
@@ -118,7 +199,9 @@ class TimeManager:
             日期对象
         """
         try:
-            return datetime.datetime.strptime(date_str, format_str).date()
+            if format_str == _DATE_FORMAT and len(date_str) == 10 and _is_iso_date(date_str):
+                return self._date_fromisoformat(date_str)
+            return self._strptime(date_str, format_str).date()
         except ValueError as e:
             self.logger.error(f"解析日期字符串失败: {str(e)}")
             raise
@@ -188,9 +271,9 @@ class TimeManager:
             start_date, end_date = self.calculate_historical_period()
             
             # 转换为datetime对象，并添加时区信息
-            start_datetime = self.timezone.localize(
+            start_datetime = self.localize(
                 datetime.datetime.combine(start_date, datetime.time(0, 0, 0)))
-            end_datetime = self.timezone.localize(
+            end_datetime = self.localize(
                 datetime.datetime.combine(end_date, datetime.time(23, 59, 59)))
             
             return start_datetime, end_datetime
@@ -202,15 +285,15 @@ class TimeManager:
             
             if hour >= 13:
                 # 13点后执行，生成当天0-12点的数据
-                start_datetime = self.timezone.localize(
+                start_datetime = self.localize(
                     datetime.datetime.combine(today, datetime.time(0, 0, 0)))
-                end_datetime = self.timezone.localize(
+                end_datetime = self.localize(
                     datetime.datetime.combine(today, datetime.time(12, 59, 59)))
             else:
                 # 13点前执行（次日1点），生成前一天13-23点的数据
-                start_datetime = self.timezone.localize(
+                start_datetime = self.localize(
                     datetime.datetime.combine(yesterday, datetime.time(13, 0, 0)))
-                end_datetime = self.timezone.localize(
+                end_datetime = self.localize(
                     datetime.datetime.combine(yesterday, datetime.time(23, 59, 59)))
             
             return start_datetime, end_datetime
@@ -231,20 +314,14 @@ class TimeManager:
             上次生成数据的结束时间，如果没有记录则返回None
         """
         try:
-            timestamp_str = db_manager.check_last_timestamp('data_generation_log', mode)
-            
-            if timestamp_str:
-                try:
-                    # 尝试解析日期时间
-                    return self.parse_datetime(timestamp_str)
-                except:
-                    try:
-                        # 尝试解析日期
-                        return self.timezone.localize(datetime.datetime.combine(
-                            self.parse_date(timestamp_str), datetime.time(23, 59, 59)))
-                    except:
-                        self.logger.error(f"无法解析上次生成时间: {timestamp_str}")
-                        return None
+            last_timestamp = db_manager.check_last_timestamp('data_generation_log', mode)
+            
+            if isinstance(last_timestamp, datetime.datetime):
+                return self.localize(last_timestamp) if last_timestamp.tzinfo is None else last_timestamp
+            
+            if last_timestamp:
+                # 只有结束日期时视为当天结束
+                return self.localize(self._combine(last_timestamp, datetime.time(23, 59, 59)))
             
             return None
         except Exception as e:
@@ -276,6 +353,32 @@ class TimeManager:
         """
         return datetime.time(9, 0) <= time <= datetime.time(17, 0)
     
+    def is_workday_batch(self, dates: np.ndarray) -> np.ndarray:
+        """
+        批量判断是否为工作日，与 is_workday 逐个判断的结果一致
+        
+        Args:
+            dates: datetime64 日期数组
+            
+        Returns:
+            布尔数组
+        """
+        return _weekdays(dates.astype('datetime64[D]')) < 5
+    
+    def is_business_hour_batch(self, dts: np.ndarray) -> np.ndarray:
+        """
+        批量判断是否为营业时间（9:00-17:00），与 is_business_hour 逐个判断的结果一致
+        
+        Args:
+            dts: 本地时间的 datetime64 数组
+            
+        Returns:
+            布尔数组
+        """
+        dts = dts.astype('datetime64[us]')
+        seconds = (dts - dts.astype('datetime64[D]')) / np.timedelta64(1, 's')
+        return (seconds >= 9 * 3600) & (seconds <= 17 * 3600)
+    
     def get_time_weight(self, dt: datetime.datetime) -> float:
         """
         获取给定时间的业务权重，用于模拟不同时间点的交易频率
@@ -286,32 +389,21 @@ class TimeManager:
         Returns:
             业务权重系数
         """
-        date = dt.date()
-        time = dt.time()
-        hour = dt.hour
-        
-        # 基础权重
-        weight = 1.0
+        return self._WEEKDAY_WEIGHTS[dt.weekday()] * self._HOUR_WEIGHTS[dt.hour]
+    
+    def get_time_weights(self, dts: np.ndarray) -> np.ndarray:
+        """
+        批量获取业务权重，与 get_time_weight 逐个计算的结果一致
         
-        # 工作日和周末权重
-        if self.is_workday(date):
-            weight *= 1.5  # 工作日交易量更大
-        else:
-            weight *= 0.6  # 周末交易量较少
-        
-        # 不同时间段权重
-        if 9 <= hour < 12:  # 上午高峰
-            weight *= 1.8
-        elif 12 <= hour < 14:  # 午休时间
-            weight *= 0.7
-        elif 14 <= hour < 17:  # 下午高峰
-            weight *= 1.5
-        elif 17 <= hour < 22:  # 晚间
-            weight *= 0.9
-        else:  # 深夜
-            weight *= 0.3
-        
-        return weight
+        Args:
+            dts: 本地时间的 datetime64 数组
+            
+        Returns:
+            业务权重数组
+        """
+        days = dts.astype('datetime64[D]')
+        hours = (dts.astype('datetime64[h]') - days).astype(np.int64)
+        return self._WEEKDAY_WEIGHT_ARRAY[_weekdays(days)] * self._HOUR_WEIGHT_ARRAY[hours]
     
     def get_date_weight(self, date: datetime.date) -> float:
         """
@@ -323,28 +415,7 @@ class TimeManager:
         Returns:
             业务权重系数
         """
-        day = date.day
-        month = date.month
-        
-        # 基础权重
-        weight = 1.0
-        
-        # 月初(1-10日)交易量较大
-        if 1 <= day <= 10:
-            weight *= 1.3
-        # 月末(21日-月底)交易量也较大
-        elif day >= 21:
-            weight *= 1.2
-            
-        # 特殊月份权重
-        if month in [1, 2]:  # 春节前后
-            weight *= 1.4
-        elif month in [7, 8]:  # 暑期
-            weight *= 1.1
-        elif month == 12:  # 年末
-            weight *= 1.3
-            
-        return weight
+        return self._DAY_WEIGHTS[date.day] * self._MONTH_WEIGHTS[date.month]
     
     def split_time_range(self, start_time: datetime.datetime, end_time: datetime.datetime, 
                         interval_hours: int = 1) -> List[Tuple[datetime.datetime, datetime.datetime]]:
@@ -362,18 +433,15 @@ class TimeManager:
         if start_time > end_time:
             raise ValueError("开始时间必须早于结束时间")
         
-        time_slots = []
-        current_time = start_time
+        # 以微秒为单位一次算出各时间段相对开始时间的起止偏移
+        timedelta = self._timedelta
+        total = (end_time - start_time) // timedelta(microseconds=1)
+        step = int(interval_hours * 3600 * 1000000)
+        starts = np.arange(0, total, step, dtype=np.int64)
+        ends = np.minimum(starts + step, total)
         
-        while current_time < end_time:
-            next_time = current_time + datetime.timedelta(hours=interval_hours)
-            if next_time > end_time:
-                next_time = end_time
-            
-            time_slots.append((current_time, next_time))
-            current_time = next_time
-        
-        return time_slots
+        return [(start_time + timedelta(microseconds=s), start_time + timedelta(microseconds=e))
+                for s, e in zip(starts.tolist(), ends.tolist())]
     
     def time_diff_hours(self, start_time: datetime.datetime, end_time: datetime.datetime) -> float:
         """
@@ -393,11 +461,27 @@ class TimeManager:
             
         # 确保时区一致
         if start_time.tzinfo is None:
-            start_time = self.timezone.localize(start_time)
+            start_time = self.localize(start_time)
         if end_time.tzinfo is None:
-            end_time = self.timezone.localize(end_time)
+            end_time = self.localize(end_time)
+        
+        return self.time_diff_hours_fast(start_time, end_time)
+    
+    @staticmethod
+    def time_diff_hours_fast(start_time: datetime.datetime, end_time: datetime.datetime) -> float:
+        """
+        计算两个带时区时间之间的小时差，不做类型转换和时区补全，供循环中频繁调用
+        
+        调用方需保证两个时间都已带时区（可先用 localize 处理）。
+        
+        Args:
+            start_time: 开始时间
+            end_time: 结束时间
             
-        return (end_time - start_time).total_seconds() / 3600
+        Returns:
+            小时差
+        """
+        return (end_time.timestamp() - start_time.timestamp()) / 3600
     
     def time_diff_days(self, start_date: Union[datetime.date, str], 
                       end_date: Union[datetime.date, str]) -> int:
@@ -415,8 +499,8 @@ class TimeManager:
             start_date = self.parse_date(start_date)
         if isinstance(end_date, str):
             end_date = self.parse_date(end_date)
-            
-        return (end_date - start_date).days
+        
+        return end_date.toordinal() - start_date.toordinal()
     
     def add_days(self, date: Union[datetime.date, str], days: int) -> datetime.date:
         """
@@ -431,8 +515,8 @@ class TimeManager:
         """
         if isinstance(date, str):
             date = self.parse_date(date)
-            
-        return date + datetime.timedelta(days=days)
+        
+        return self._date_fromordinal(date.toordinal() + days)
     
     def split_date_range(self, start_date: datetime.date, end_date: datetime.date,
                         days_per_batch: int = 30) -> List[Tuple[datetime.date, datetime.date]]:
@@ -447,18 +531,29 @@ class TimeManager:
         Returns:
             日期段列表，每个元素为(开始日期, 结束日期)
         """
+        starts, ends = self.split_date_range_arrays(start_date, end_date, days_per_batch)
+        return list(zip(starts.tolist(), ends.tolist()))
+    
+    def split_date_range_arrays(self, start_date: datetime.date, end_date: datetime.date,
+                                days_per_batch: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        将日期范围分割为多个日期段，以 datetime64[D] 数组返回各段的起止日期
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            days_per_batch: 每个日期段的天数
+            
+        Returns:
+            (开始日期数组, 结束日期数组)
+        """
         if start_date > end_date:
             raise ValueError("开始日期必须早于结束日期")
         
-        date_ranges = []
-        current_date = start_date
-        
-        while current_date <= end_date:
-            batch_end = min(current_date + datetime.timedelta(days=days_per_batch-1), end_date)
-            date_ranges.append((current_date, batch_end))
-            current_date = batch_end + datetime.timedelta(days=1)
-        
-        return date_ranges
+        end = np.datetime64(end_date, 'D')
+        starts = np.arange(np.datetime64(start_date, 'D'), end + 1, np.timedelta64(days_per_batch, 'D'))
+        ends = np.minimum(starts + np.timedelta64(days_per_batch - 1, 'D'), end)
+        return starts, ends
     
     def generate_date_range(self, start_date: Union[datetime.date, str], 
                            end_date: Union[datetime.date, str]) -> List[datetime.date]:
@@ -472,19 +567,26 @@ class TimeManager:
         Returns:
             日期列表
         """
+        return self.generate_date_range_array(start_date, end_date).tolist()
+    
+    def generate_date_range_array(self, start_date: Union[datetime.date, str],
+                                  end_date: Union[datetime.date, str]) -> np.ndarray:
+        """
+        生成日期范围，以 datetime64[D] 数组返回，便于按日期向量化筛选
+        
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            日期数组，开始日期晚于结束日期时为空数组
+        """
         if isinstance(start_date, str):
             start_date = self.parse_date(start_date)
         if isinstance(end_date, str):
             end_date = self.parse_date(end_date)
-            
-        date_list = []
-        current_date = start_date
         
-        while current_date <= end_date:
-            date_list.append(current_date)
-            current_date = current_date + datetime.timedelta(days=1)
-            
-        return date_list
+        return np.arange(np.datetime64(start_date, 'D'), np.datetime64(end_date, 'D') + 1)
 
 
     def format_time_for_db(self, dt: Optional[datetime.datetime] = None) -> str:
@@ -500,11 +602,23 @@ class TimeManager:
         if dt is None:
             dt = self.get_current_time()
             
-        return self.format_datetime(dt, '%Y-%m-%d %H:%M:%S')
+        return self.format_datetime(dt)
 
 
-# 单例模式
-_instance = None
+# 单例模式：按时区缓存实例
+@functools.lru_cache(maxsize=None)
+def _make_time_manager(timezone: str) -> TimeManager:
+    """
+    创建指定时区的TimeManager
+    
+    Args:
+        timezone: 时区
+        
+    Returns:
+        TimeManager实例
+    """
+    return TimeManager(timezone)
+
 
 def get_time_manager(timezone: str = 'Asia/Shanghai') -> TimeManager:
     """
@@ -516,10 +630,7 @@ def get_time_manager(timezone: str = 'Asia/Shanghai') -> TimeManager:
     Returns:
         TimeManager实例
     """
-    global _instance
-    if _instance is None:
-        _instance = TimeManager(timezone)
-    return _instance
+    return _make_time_manager(timezone)
 
 
 if __name__ == "__main__":
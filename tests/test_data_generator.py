@@ -9,159 +9,229 @@
 
 import os
 import sys
+import copy
+import pickle
+import hashlib
+import inspect
+import contextlib
 import unittest
 import datetime
 import random
+from unittest import mock
+
+import faker
 
 # 添加项目根目录到Python路径
 current_dir = os.path.dirname(os.path.abspath(__file__))
 project_root = os.path.dirname(current_dir)
-sys.path.append(project_root)
-
-# 导入待测试模块
-from src.data_generator.data_generator import get_data_generator
-from src.data_generator.entity_generators import (
-    CustomerGenerator, BankManagerGenerator, ProductGenerator,
-    FundAccountGenerator, DepositTypeGenerator
-)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+# 生成器模块依赖numpy/pandas，在各测试类的setUpClass中再导入，单独运行某个测试时不必全部加载
 from src.logger import get_logger
 from src.config_manager import get_config_manager
 
 
+# 各实体必须包含的字段
+MANAGER_KEYS = frozenset({'manager_id', 'name', 'branch_id'})
+PRODUCT_KEYS = frozenset({'product_id', 'name', 'type'})
+DEPOSIT_TYPE_KEYS = frozenset({'deposit_type_id', 'name', 'base_interest_rate'})
+CUSTOMER_KEYS = frozenset({'customer_id', 'name', 'customer_type', 'id_type', 'id_number',
+                           'credit_score', 'registration_date'})
+PERSONAL_CUSTOMER_KEYS = CUSTOMER_KEYS | {'gender', 'birth_date', 'occupation'}
+CORPORATE_CUSTOMER_KEYS = CUSTOMER_KEYS | {'business_type', 'establishment_date'}
+FUND_ACCOUNT_KEYS = frozenset({'account_id', 'customer_id', 'account_type', 'status', 'balance', 'opening_date'})
+
+# 加载zh_CN数据较慢，整个测试进程共用一个已设定种子的Faker实例
+_FAKER = faker.Faker('zh_CN')
+_FAKER.seed_instance(42)
+
+
+# 按生成器源码、种子和当天日期缓存到磁盘的测试数据，源码、依赖版本或日期变化后自动失效
+_FIXTURE_DIR = os.path.join(current_dir, '_fixtures')
+
+
+def _cached_fixture(generator, seed: int, count: int, *args) -> list:
+    """
+    读取或生成测试数据，并缓存到磁盘
+    
+    记录ID由未设种子的 uuid4 生成、日期相对当天计算，生成结果并不确定；缓存只保证同一天内、
+    代码和依赖不变时复用同一份样本。键包含生成器及其基类所在模块和时间管理模块的源码、
+    数据生成配置、Faker版本、当天日期、种子、数量和上游输入。
+    无论是否命中缓存都会重设随机种子，使后续生成器调用的随机状态与缓存无关。
+    
+    Args:
+        generator: 实体生成器实例
+        seed: 随机种子
+        count: 生成数量
+        *args: 传给 generate 的上游数据
+        
+    Returns:
+        生成的记录列表
+    """
+    import numpy as np
+    from src.time_manager import time_manager
+    
+    random.seed(seed)
+    np.random.seed(seed)
+    _FAKER.seed_instance(seed)
+    
+    modules = {inspect.getmodule(cls) for cls in type(generator).__mro__ if cls is not object}
+    sources = sorted(inspect.getsource(module) for module in modules | {time_manager})
+    key = hashlib.sha1(pickle.dumps(
+        (sources, type(generator).__name__, generator.config_manager.read_data_generation_config(),
+         faker.VERSION, datetime.date.today().isoformat(), seed, count, args),
+        protocol=pickle.HIGHEST_PROTOCOL
+    )).hexdigest()
+    path = os.path.join(_FIXTURE_DIR, f"{key}.pkl")
+    
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    
+    records = generator.generate(*args, count=count)
+    
+    os.makedirs(_FIXTURE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return records
+
+
+@contextlib.contextmanager
+def override_entity_config(config_manager, entity_name: str, overrides: dict):
+    """
+    在内存中临时覆盖实体配置，退出时原地恢复
+    
+    不经过 update_entity_config，避免把测试配置写回YAML文件。
+    
+    Args:
+        config_manager: 配置管理器
+        entity_name: 实体名称
+        overrides: 要覆盖的配置项
+    """
+    entity_config = config_manager.get_entity_config(entity_name)
+    baseline = copy.deepcopy(entity_config)
+    entity_config.update(overrides)
+    try:
+        yield entity_config
+    finally:
+        entity_config.clear()
+        entity_config.update(baseline)
+
+
 class TestEntityGenerators(unittest.TestCase):
     """测试各实体生成器"""
     
-    def setUp(self):
-        """初始化测试环境"""
-        self.config_manager = get_config_manager()
-        self.logger = get_logger('test_generators', level='debug')
+    @classmethod
+    def setUpClass(cls):
+        """初始化测试环境，Faker等只读对象在各测试间共享"""
+        cls.config_manager = get_config_manager()
+        cls.logger = get_logger('test_generators', level='debug')
+        from src.data_generator.entity_generators import (
+            CustomerGenerator, BankManagerGenerator, ProductGenerator,
+            FundAccountGenerator, DepositTypeGenerator
+        )
         
-        # 使用Faker创建随机数据生成器
-        import faker
-        self.faker = faker.Faker('zh_CN')
+        cls.faker = _FAKER
         
         # 设置随机种子保证测试可重复性
         random.seed(42)
+        
+        # 生成器不保存与测试相关的状态，各测试共用同一实例
+        cls.bank_manager_generator = BankManagerGenerator(cls.faker, cls.config_manager)
+        cls.product_generator = ProductGenerator(cls.faker, cls.config_manager)
+        cls.deposit_type_generator = DepositTypeGenerator(cls.faker, cls.config_manager)
+        cls.customer_generator = CustomerGenerator(cls.faker, cls.config_manager)
+        cls.fund_account_generator = FundAccountGenerator(cls.faker, cls.config_manager)
+        
+        # 依赖数据只生成一次并缓存到磁盘，供各测试只读使用
+        cls._managers = _cached_fixture(cls.bank_manager_generator, 42, 5)
+        cls._customers = _cached_fixture(cls.customer_generator, 42, 10, cls._managers)
+        cls._deposit_types = _cached_fixture(cls.deposit_type_generator, 42, 3)
     
-    def test_bank_manager_generator(self):
-        """测试银行经理生成器"""
-        generator = BankManagerGenerator(self.faker, self.config_manager)
-        managers = generator.generate(count=5)
-        
-        self.assertEqual(len(managers), 5, "应该生成5个银行经理")
-        for manager in managers:
-            self.assertIn('manager_id', manager, "银行经理应该有ID")
-            self.assertIn('name', manager, "银行经理应该有姓名")
-            self.assertIn('branch_id', manager, "银行经理应该有支行ID")
-    
-    def test_product_generator(self):
-        """测试产品生成器"""
-        generator = ProductGenerator(self.faker, self.config_manager)
-        products = generator.generate(count=10)
-        
-        self.assertEqual(len(products), 10, "应该生成10个产品")
-        for product in products:
-            self.assertIn('product_id', product, "产品应该有ID")
-            self.assertIn('name', product, "产品应该有名称")
-            self.assertIn('type', product, "产品应该有类型")
-    
-    def test_deposit_type_generator(self):
-        """测试存款类型生成器"""
-        generator = DepositTypeGenerator(self.faker, self.config_manager)
-        deposit_types = generator.generate(count=5)
-        
-        self.assertEqual(len(deposit_types), 5, "应该生成5个存款类型")
-        for deposit_type in deposit_types:
-            self.assertIn('deposit_type_id', deposit_type, "存款类型应该有ID")
-            self.assertIn('name', deposit_type, "存款类型应该有名称")
-            self.assertIn('base_interest_rate', deposit_type, "存款类型应该有基准利率")
+    def test_simple_generators(self):
+        """测试无依赖的实体生成器：数量和必要字段"""
+        cases = (
+            ('银行经理', self.bank_manager_generator, 5, MANAGER_KEYS),
+            ('产品', self.product_generator, 10, PRODUCT_KEYS),
+            ('存款类型', self.deposit_type_generator, 5, DEPOSIT_TYPE_KEYS),
+        )
+        for label, generator, count, required_keys in cases:
+            with self.subTest(entity=label):
+                records = generator.generate(count=count)
+                
+                self.assertEqual(len(records), count, f"应该生成{count}个{label}")
+                for record in records:
+                    self.assertFalse(required_keys - record.keys(), f"{label}缺少必要字段")
     
     def test_customer_generator(self):
         """测试客户生成器"""
-        # 先生成银行经理
-        bank_manager_generator = BankManagerGenerator(self.faker, self.config_manager)
-        managers = bank_manager_generator.generate(count=5)
-        
         # 生成客户
-        generator = CustomerGenerator(self.faker, self.config_manager)
-        customers = generator.generate(managers, count=20)
+        customers = self.customer_generator.generate(self._managers, count=20)
         
         self.assertEqual(len(customers), 20, "应该生成20个客户")
         
         # 检查客户属性
         for customer in customers:
-            self.assertIn('customer_id', customer, "客户应该有ID")
-            self.assertIn('name', customer, "客户应该有姓名")
-            self.assertIn('customer_type', customer, "客户应该有类型")
-            self.assertIn('id_type', customer, "客户应该有证件类型")
-            self.assertIn('id_number', customer, "客户应该有证件号码")
-            self.assertIn('credit_score', customer, "客户应该有信用分")
-            self.assertIn('registration_date', customer, "客户应该有注册日期")
-            
-            # 检查客户类型特有的属性
-            if customer['customer_type'] == 'personal':
-                self.assertIn('gender', customer, "个人客户应该有性别")
-                self.assertIn('birth_date', customer, "个人客户应该有出生日期")
-                self.assertIn('occupation', customer, "个人客户应该有职业")
+            # 按客户类型检查通用属性和特有属性
+            if customer.get('customer_type') == 'personal':
+                self.assertFalse(PERSONAL_CUSTOMER_KEYS - customer.keys(), "个人客户缺少必要字段")
             else:
-                self.assertIn('business_type', customer, "企业客户应该有行业类型")
-                self.assertIn('establishment_date', customer, "企业客户应该有成立日期")
+                self.assertFalse(CORPORATE_CUSTOMER_KEYS - customer.keys(), "企业客户缺少必要字段")
+    
+    def test_customer_generator_iter(self):
+        """测试客户生成器按块逐条产出"""
+        customers = list(self.customer_generator.generate_iter(self._managers, count=25, chunk_size=10))
+        
+        self.assertEqual(len(customers), 25, "应该生成25个客户")
+        self.assertEqual(len({c['customer_id'] for c in customers}), 25, "客户ID应该唯一")
     
     def test_fund_account_generator(self):
         """测试资金账户生成器"""
-        # 先生成银行经理
-        bank_manager_generator = BankManagerGenerator(self.faker, self.config_manager)
-        managers = bank_manager_generator.generate(count=3)
-        
-        # 生成客户
-        customer_generator = CustomerGenerator(self.faker, self.config_manager)
-        customers = customer_generator.generate(managers, count=10)
-        
-        # 生成存款类型
-        deposit_type_generator = DepositTypeGenerator(self.faker, self.config_manager)
-        deposit_types = deposit_type_generator.generate(count=3)
+        customers = self._customers
         
         # 生成资金账户
-        generator = FundAccountGenerator(self.faker, self.config_manager)
-        accounts = generator.generate(customers, deposit_types)
+        accounts = self.fund_account_generator.generate(customers, self._deposit_types)
         
         self.assertGreater(len(accounts), 0, "应该生成至少一个账户")
         
         # 检查资金账户属性
+        customer_ids = {customer['customer_id'] for customer in customers}
         for account in accounts:
-            self.assertIn('account_id', account, "账户应该有ID")
-            self.assertIn('customer_id', account, "账户应该有客户ID")
-            self.assertIn('account_type', account, "账户应该有类型")
-            self.assertIn('status', account, "账户应该有状态")
-            self.assertIn('balance', account, "账户应该有余额")
-            self.assertIn('opening_date', account, "账户应该有开户日期")
+            self.assertFalse(FUND_ACCOUNT_KEYS - account.keys(), "账户缺少必要字段")
             
             # 检查客户ID是否在客户列表中
-            customer_found = False
-            for customer in customers:
-                if customer['customer_id'] == account['customer_id']:
-                    customer_found = True
-                    break
-            self.assertTrue(customer_found, f"账户的客户ID {account['customer_id']} 应该存在于客户列表中")
+            self.assertIn(account['customer_id'], customer_ids, f"账户的客户ID {account['customer_id']} 应该存在于客户列表中")
 
 
 class TestDataGenerator(unittest.TestCase):
     """测试数据生成器总控类"""
     
-    def setUp(self):
+    @classmethod
+    def setUpClass(cls):
         """初始化测试环境"""
-        self.data_generator = get_data_generator()
-        self.logger = get_logger('test_data_generator', level='debug')
+        from src.data_generator.data_generator import get_data_generator
+        
+        cls.data_generator = get_data_generator()
+        cls.logger = get_logger('test_data_generator', level='debug')
         
         # 测试用的小时间范围（仅测试最近2天的数据，避免生成过多）
-        self.today = datetime.date.today()
-        self.test_start_date = self.today - datetime.timedelta(days=2)
-        self.test_end_date = self.today - datetime.timedelta(days=1)
+        cls.today = datetime.date.today()
+        cls.test_start_date = cls.today - datetime.timedelta(days=2)
+        cls.test_end_date = cls.today - datetime.timedelta(days=1)
     
-    def test_minimal_data_generation(self):
-        """测试最小数据生成
+    def _run_minimal_generation(self, start_date: datetime.date, end_date: datetime.date) -> dict:
+        """
+        以5个客户的小配置生成数据，并检查各实体是否被创建
         
-        生成极小数量的数据，并检查各实体是否被创建
+        Args:
+            start_date: 开始日期
+            end_date: 结束日期
+            
+        Returns:
+            生成统计信息
         """
         # 使用小配置覆盖默认配置
         small_config = {
@@ -170,15 +240,9 @@ class TestDataGenerator(unittest.TestCase):
             }
         }
         
-        try:
-            # 备份原始配置
-            original_config = self.data_generator.config_manager.get_entity_config('customer')
-            
-            # 更新为小配置
-            self.data_generator.config_manager.update_entity_config('customer', small_config['customer'])
-            
+        with override_entity_config(self.data_generator.config_manager, 'customer', small_config['customer']):
             # 生成测试数据
-            stats = self.data_generator.generate_data(self.test_start_date, self.test_end_date, mode='historical')
+            stats = self.data_generator.generate_data(start_date, end_date, mode='historical')
             
             # 检查是否生成了各种实体
             self.assertIn('customer', stats, "应该生成客户数据")
@@ -196,9 +260,22 @@ class TestDataGenerator(unittest.TestCase):
             # 打印统计数据
             self.logger.info(f"测试生成的数据统计: {stats}")
             
-        finally:
-            # 恢复原始配置
-            self.data_generator.config_manager.update_entity_config('customer', original_config)
+            return stats
+    
+    def test_minimal_data_generation(self):
+        """测试最小数据生成
+        
+        只生成一天的数据，交易生成器替换为空结果，避免单元测试走完整的交易生成流程
+        """
+        with mock.patch('src.data_generator.entity_generators.TransactionGenerator.generate', return_value=[]):
+            stats = self._run_minimal_generation(self.test_end_date, self.test_end_date)
+        
+        self.assertEqual(stats['account_transaction'], 0, "交易生成器被替换后不应导入交易数据")
+    
+    @unittest.skipUnless(os.getenv('RUN_INTEGRATION'), "设置 RUN_INTEGRATION=1 时运行完整数据生成测试")
+    def test_full_data_generation(self):
+        """测试完整数据生成（含交易数据），需要数据库"""
+        self._run_minimal_generation(self.test_start_date, self.test_end_date)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+数据库管理器单元测试
+
+测试不需要连接数据库的连接参数构建逻辑
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src import database_manager
+from src.database_manager import DatabaseManager
+
+
+class TestConnectionKwargs(unittest.TestCase):
+    """测试连接参数中的 use_pure 选择"""
+    
+    def _kwargs(self, db_config: dict) -> dict:
+        """
+        用给定的数据库配置构建连接参数
+        
+        Args:
+            db_config: 数据库配置项
+            
+        Returns:
+            连接参数字典
+        """
+        manager = DatabaseManager()
+        manager.config_manager = mock.Mock()
+        manager.config_manager.get_db_config.return_value = db_config
+        return manager._connection_kwargs()
+    
+    def test_pure_fallback_without_cext(self):
+        """测试未安装C扩展时即使配置 use_pure = false 也使用纯Python实现"""
+        with mock.patch.object(database_manager, '_HAVE_CEXT', False):
+            self.assertTrue(self._kwargs({})['use_pure'], "未安装C扩展时应该使用纯Python实现")
+            self.assertTrue(self._kwargs({'use_pure': 'false'})['use_pure'], "未安装C扩展时不能强制使用C扩展")
+    
+    def test_cext_default_and_pure_override(self):
+        """测试C扩展可用时默认使用C扩展，配置 use_pure = true 时使用纯Python实现"""
+        with mock.patch.object(database_manager, '_HAVE_CEXT', True):
+            self.assertFalse(self._kwargs({})['use_pure'], "C扩展可用时默认应该使用C扩展")
+            self.assertTrue(self._kwargs({'use_pure': 'true'})['use_pure'], "use_pure = true 应该强制使用纯Python实现")
+
+
+if __name__ == '__main__':
+    unittest.main()
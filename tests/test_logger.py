@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志模块单元测试
+
+测试同名Logger以不同参数获取时的实例管理
+"""
+
+import os
+import sys
+import glob
+import shutil
+import logging
+import tempfile
+import unittest
+
+# 添加项目根目录到Python路径
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from src.logger import get_logger
+
+
+class TestGetLogger(unittest.TestCase):
+    """测试get_logger的实例管理"""
+    
+    def setUp(self):
+        """创建临时日志目录"""
+        self.log_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """关闭后台写入线程并删除临时日志目录"""
+        get_logger('test_logger_config', log_dir=self.log_dir, level='info',
+                   console_output=False).close()
+        shutil.rmtree(self.log_dir, ignore_errors=True)
+    
+    def test_same_config_returns_same_instance(self):
+        """测试相同参数返回同一实例"""
+        first = get_logger('test_logger_config', log_dir=self.log_dir, level='info', console_output=False)
+        second = get_logger('test_logger_config', log_dir=self.log_dir, level='info', console_output=False)
+        
+        self.assertIs(first, second, "相同参数应该返回同一个Logger实例")
+    
+    def test_switch_config_back_and_forth(self):
+        """测试按A→B→A切换参数后，最后获取的Logger仍能按A的级别写入文件"""
+        get_logger('test_logger_config', log_dir=self.log_dir, level='info', console_output=False)
+        get_logger('test_logger_config', log_dir=self.log_dir, level='error', console_output=False)
+        logger = get_logger('test_logger_config', log_dir=self.log_dir, level='info', console_output=False)
+        
+        self.assertEqual(logging.getLogger('test_logger_config').level, logging.INFO,
+                         "底层logging.Logger的级别应该恢复为info")
+        
+        logger.info("切换配置后的信息日志")
+        logger.close()
+        
+        contents = ''
+        for path in glob.glob(os.path.join(self.log_dir, 'test_logger_config_*.log')):
+            with open(path, 'r', encoding='utf-8') as f:
+                contents += f.read()
+        self.assertIn("切换配置后的信息日志", contents, "info日志应该写入文件")
+
+
+if __name__ == '__main__':
+    unittest.main()
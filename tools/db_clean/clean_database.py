@@ -9,17 +9,197 @@
 
 import os
 import sys
+import asyncio
+import hashlib
+import contextlib
+from typing import Tuple
+
+# 可选依赖：--async 模式使用 aiomysql 并发清理，未安装时回退到单连接清理
+try:
+    import aiomysql
+except ImportError:
+    aiomysql = None
 
 # 添加项目根目录到系统路径
 current_file = os.path.abspath(__file__)
 project_root = os.path.dirname(os.path.dirname(os.path.dirname(current_file)))
-sys.path.append(project_root)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
 
 # 导入数据库管理器
 from src.database_manager import get_database_manager
 
-def clean_database():
-    """清理数据库中的所有表数据"""
+# 按外键依赖关系排列的表（子表在前，父表在后），清理和删除都按此顺序
+TABLES_IN_DEPENDENCY_ORDER: Tuple[str, ...] = (
+    'account_transaction',      # 账户交易记录
+    'loan_record',              # 借款记录
+    'investment_record',        # 理财记录
+    'customer_event',           # 客户事件
+    'app_user',                 # APP用户
+    'wechat_follower',          # 公众号粉丝
+    'work_wechat_contact',      # 企业微信联系人
+    'channel_profile',          # 全渠道档案
+    'fund_account',             # 资金账户
+    'customer',                 # 客户
+    'bank_manager',             # 银行经理
+    'product',                  # 产品
+    'deposit_type',             # 存款类型
+    'data_generation_log',      # 数据生成日志
+)
+
+
+# 清理所有表的存储过程模板，过程体按 TABLES_IN_DEPENDENCY_ORDER 生成
+CLEAN_PROCS_FILE = os.path.join(os.path.dirname(current_file), 'clean_procs.sql')
+CLEAN_PROCEDURE = 'clean_all_tables'
+
+
+@contextlib.contextmanager
+def fk_checks_disabled(db_manager):
+    """
+    在当前会话中临时关闭外键检查，退出时恢复
+    
+    恢复失败（例如连接已断开）时忽略，不掩盖原始异常；外键检查是会话级设置，连接断开后也随之失效。
+    
+    Args:
+        db_manager: 数据库管理器
+    """
+    db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 0")
+    try:
+        yield
+    finally:
+        try:
+            db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 1")
+        except Exception:
+            pass
+
+
+async def _truncate_tables_async(db_config: dict, tables: list) -> list:
+    """
+    在aiomysql连接池的多个连接上并发清空表
+    
+    外键检查是会话级设置，每个连接各自关闭，无需全局锁。
+    
+    Args:
+        db_config: 数据库连接配置
+        tables: 要清空的表名列表
+        
+    Returns:
+        每张表的清理结果，成功为None，失败为异常对象
+    """
+    pool = await aiomysql.create_pool(
+        host=db_config.get('host'), port=int(db_config.get('port', 3306)),
+        user=db_config.get('user'), password=db_config.get('password'),
+        db=db_config.get('database'), charset=db_config.get('charset', 'utf8mb4'),
+        autocommit=True, minsize=1, maxsize=len(tables)
+    )
+    
+    async def truncate(table):
+        async with pool.acquire() as conn:
+            async with conn.cursor() as cursor:
+                await cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0")
+                await cursor.execute(f"TRUNCATE TABLE `{table}`")
+                await cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 1")
+    
+    try:
+        return await asyncio.gather(*(truncate(table) for table in tables), return_exceptions=True)
+    finally:
+        pool.close()
+        await pool.wait_closed()
+
+
+def _non_empty_tables(db_manager, tables: list) -> set:
+    """
+    用一条查询找出含有数据的表
+    
+    information_schema.tables 的 table_rows 对InnoDB只是估计值，可能把刚写入的表报为0行，
+    因此对每张表做 EXISTS 检查，并用 UNION ALL 合并为一次往返。
+    
+    Args:
+        db_manager: 数据库管理器
+        tables: 已确认存在的表名列表
+        
+    Returns:
+        非空表名集合
+    """
+    if not tables:
+        return set()
+    
+    query = "\nUNION ALL\n".join(
+        f"SELECT '{table}' AS table_name FROM DUAL "
+        f"WHERE EXISTS (SELECT 1 FROM {db_manager._safe_ident(table)})"
+        for table in tables
+    )
+    return {row['table_name'] for row in db_manager.execute_query(query)}
+
+
+def _clean_procedure_sql() -> Tuple[str, str]:
+    """
+    按 clean_procs.sql 模板和 TABLES_IN_DEPENDENCY_ORDER 生成清理存储过程的建立语句
+    
+    Returns:
+        (版本注释, CREATE PROCEDURE 语句)，版本注释为填入表清理语句后整个过程定义的哈希，
+        模板或表列表任一变化都会改变版本
+    """
+    truncate_statements = "\n".join(
+        f"    IF EXISTS (SELECT 1 FROM `{table}`) THEN TRUNCATE TABLE `{table}`; END IF;"
+        for table in TABLES_IN_DEPENDENCY_ORDER
+    )
+    
+    with open(CLEAN_PROCS_FILE, 'r', encoding='utf-8') as f:
+        template = f.read()
+    template = template[template.index('CREATE PROCEDURE'):]
+    
+    # 先以空注释渲染整个过程定义计算哈希，再填入版本注释
+    body = template.format(comment='', truncate_statements=truncate_statements)
+    comment = f"version {hashlib.sha1(body.encode('utf-8')).hexdigest()[:16]}"
+    create_sql = template.format(comment=comment, truncate_statements=truncate_statements)
+    return comment, create_sql
+
+
+def _ensure_clean_procedure(db_manager, results: list) -> bool:
+    """
+    确保当前库中的清理存储过程与当前表列表一致，不存在或版本不同时重新创建
+    
+    Args:
+        db_manager: 数据库管理器
+        results: 进度信息列表，创建或失败信息追加到其中
+        
+    Returns:
+        存储过程是否可用；无 CREATE ROUTINE 权限等失败时返回False，由调用方回退到逐表清理
+    """
+    try:
+        comment, create_sql = _clean_procedure_sql()
+        rows = db_manager.execute_query(
+            "SELECT routine_comment FROM information_schema.routines "
+            "WHERE routine_schema = DATABASE() AND routine_type = 'PROCEDURE' AND routine_name = %s",
+            (CLEAN_PROCEDURE,)
+        )
+        if rows and rows[0]['routine_comment'] == comment:
+            return True
+        
+        # 过程体内含分号，需作为单条语句发送，不能走 execute_update 的多语句拆分
+        with db_manager.pooled_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                if rows:
+                    cursor.execute(f"DROP PROCEDURE IF EXISTS {CLEAN_PROCEDURE}")
+                cursor.execute(create_sql)
+            finally:
+                cursor.close()
+        results.append(f"存储过程 {CLEAN_PROCEDURE} 已{'更新' if rows else '创建'}（{comment}）")
+        return True
+    except Exception as e:
+        results.append(f"创建存储过程 {CLEAN_PROCEDURE} 失败，改为逐表清理: {str(e)}")
+        return False
+
+
+def clean_database(use_async: bool = False):
+    """
+    清理数据库中的所有表数据
+    
+    Args:
+        use_async: 是否使用aiomysql在多个连接上并发清空各表
+    """
     db_manager = get_database_manager()
     
     # 连接数据库
@@ -27,57 +207,96 @@ def clean_database():
         print("数据库连接失败，无法清理数据")
         return False
     
+    results = []
     try:
-        # 需要按照外键依赖关系的反序清理表
-        # 先禁用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 0")
-        
-        # 定义表清理顺序（子表在前，父表在后）
-        tables_to_clean = [
-            'account_transaction',      # 账户交易记录
-            'loan_record',              # 借款记录
-            'investment_record',        # 理财记录
-            'customer_event',           # 客户事件
-            'app_user',                 # APP用户
-            'wechat_follower',          # 公众号粉丝
-            'work_wechat_contact',      # 企业微信联系人
-            'channel_profile',          # 全渠道档案
-            'fund_account',             # 资金账户
-            'customer',                 # 客户
-            'bank_manager',             # 银行经理
-            'product',                  # 产品
-            'deposit_type',             # 存款类型
-            'data_generation_log'       # 数据生成日志
-        ]
+        existing_tables = [table for table in TABLES_IN_DEPENDENCY_ORDER if db_manager.table_exists(table)]
+        for table in TABLES_IN_DEPENDENCY_ORDER:
+            if table not in existing_tables:
+                results.append(f"  表 {table} 不存在，跳过")
         
-        # 清空表数据
-        for table in tables_to_clean:
-            print(f"正在清理表: {table}")
-            success = db_manager.truncate_table(table)
-            if success:
-                print(f"  表 {table} 清理成功")
-            else:
-                print(f"  表 {table} 清理失败或不存在")
-        
-        # 重新启用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 1")
+        # 所有表都存在时由存储过程在服务端完成整个清理，一次往返
+        if (not use_async and len(existing_tables) == len(TABLES_IN_DEPENDENCY_ORDER)
+                and _ensure_clean_procedure(db_manager, results)):
+            results.append(f"正在通过存储过程 {CLEAN_PROCEDURE} 清理所有表")
+            db_manager.execute_update(f"CALL {CLEAN_PROCEDURE}()")
+            results.append(f"  {len(existing_tables)} 张表清理成功（空表已跳过）")
+        else:
+            # 按外键依赖关系的反序清理表，期间关闭外键检查
+            with fk_checks_disabled(db_manager):
+                # 清空表数据：已经为空的表跳过TRUNCATE（InnoDB下TRUNCATE会重建表空间文件）
+                non_empty_tables = _non_empty_tables(db_manager, existing_tables)
+                for table in existing_tables:
+                    if table not in non_empty_tables:
+                        results.append(f"  表 {table} 为空，跳过")
+                existing_tables = [table for table in existing_tables if table in non_empty_tables]
+                
+                if existing_tables and use_async and aiomysql is None:
+                    results.append("未安装aiomysql，改为单连接清理")
+                
+                if existing_tables and use_async and aiomysql is not None:
+                    results.append(f"正在并发清理表: {', '.join(existing_tables)}")
+                    db_config = db_manager.config_manager.get_db_config(db_manager.db_type)
+                    errors = asyncio.run(_truncate_tables_async(db_config, existing_tables))
+                    for table, error in zip(existing_tables, errors):
+                        if error is None:
+                            results.append(f"  表 {table} 清理成功")
+                        else:
+                            results.append(f"  表 {table} 清理失败: {str(error)}")
+                elif existing_tables:
+                    results.append(f"正在清理表: {', '.join(existing_tables)}")
+                    # 存在的表拼成一条多语句SQL一次发送
+                    db_manager.execute_update(";\n".join(
+                        f"TRUNCATE TABLE {db_manager._safe_ident(table)}" for table in existing_tables
+                    ))
+                    results.append(f"  {len(existing_tables)} 张表清理成功")
         
-        print("所有表数据清理完成")
+        results.append("所有表数据清理完成")
         return True
         
     except Exception as e:
-        print(f"清理数据库时出错: {str(e)}")
-        # 确保重新启用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 1")
+        results.append(f"清理数据库时出错: {str(e)}")
         return False
     
     finally:
+        # 进度信息汇总后一次输出
+        print("\n".join(results))
         # 关闭数据库连接
         db_manager.disconnect()
 
 
-def clean_and_rebuild_database():
-    """清理并重建数据库表结构"""
+def _recreate_database(db_manager, results: list) -> bool:
+    """
+    删除并重新创建整个数据库，一次删除全部表空间文件
+    
+    Args:
+        db_manager: 数据库管理器
+        results: 进度信息列表，重建结果追加到其中
+        
+    Returns:
+        是否成功；无 DROP/CREATE DATABASE 权限等失败时返回False，由调用方回退到逐表删除
+    """
+    database = db_manager.config_manager.get_db_config(db_manager.db_type).get('database')
+    try:
+        db_manager.execute_update(
+            f"DROP DATABASE IF EXISTS `{database}`;\n"
+            f"CREATE DATABASE `{database}` CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci;\n"
+            f"USE `{database}`"
+        )
+        db_manager._invalidate_schema()
+        results.append(f"数据库 {database} 已删除并重新创建")
+        return True
+    except Exception as e:
+        results.append(f"重建数据库 {database} 失败，改为逐表删除: {str(e)}")
+        return False
+
+
+def clean_and_rebuild_database(drop_database: bool = False):
+    """
+    清理并重建数据库表结构
+    
+    Args:
+        drop_database: 是否直接删除并重建整个数据库（会删除库中所有对象，包括不在清理列表中的表）
+    """
     db_manager = get_database_manager()
     
     # 连接数据库
@@ -85,57 +304,42 @@ def clean_and_rebuild_database():
         print("数据库连接失败，无法重建表结构")
         return False
     
+    results = []
     try:
-        # 需要按照外键依赖关系的反序删除表
-        # 先禁用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 0")
-        
-        # 定义表删除顺序（子表在前，父表在后）
-        tables_to_drop = [
-            'account_transaction',
-            'loan_record',
-            'investment_record',
-            'customer_event',
-            'app_user',
-            'wechat_follower',
-            'work_wechat_contact',
-            'channel_profile',
-            'fund_account',
-            'customer',
-            'bank_manager',
-            'product',
-            'deposit_type',
-            'data_generation_log'
-        ]
-        
-        # 删除表
-        for table in tables_to_drop:
-            print(f"正在删除表: {table}")
-            success = db_manager.drop_table(table)
-            if success:
-                print(f"  表 {table} 删除成功")
-            else:
-                print(f"  表 {table} 删除失败或不存在")
-        
-        # 重新启用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 1")
+        if not (drop_database and _recreate_database(db_manager, results)):
+            # 按外键依赖关系的反序删除表，期间关闭外键检查
+            with fk_checks_disabled(db_manager):
+                # 删除表：存在的表放进一条 DROP TABLE 语句，只取一次元数据锁、写一条binlog
+                existing_tables = [table for table in TABLES_IN_DEPENDENCY_ORDER if db_manager.table_exists(table)]
+                if existing_tables:
+                    results.append(f"正在删除表: {', '.join(existing_tables)}")
+                    db_manager.execute_update("DROP TABLE IF EXISTS " + ", ".join(
+                        db_manager._safe_ident(table) for table in existing_tables
+                    ))
+                    db_manager._invalidate_schema()
+                
+                for table in TABLES_IN_DEPENDENCY_ORDER:
+                    if table not in existing_tables:
+                        results.append(f"  表 {table} 不存在，无需删除")
+                if existing_tables:
+                    results.append(f"  {len(existing_tables)} 张表删除成功")
         
         # 重新创建所有表
-        print("\n开始重新创建表结构...")
+        results.append("\n开始重新创建表结构...")
         if db_manager.create_tables():
-            print("所有表结构重建成功")
+            results.append("所有表结构重建成功")
         else:
-            print("部分表结构重建失败，请检查日志")
+            results.append("部分表结构重建失败，请检查日志")
         
         return True
         
     except Exception as e:
-        print(f"重建数据库时出错: {str(e)}")
-        # 确保重新启用外键检查
-        db_manager.execute_update("SET FOREIGN_KEY_CHECKS = 1")
+        results.append(f"重建数据库时出错: {str(e)}")
         return False
     
     finally:
+        # 进度信息汇总后一次输出
+        print("\n".join(results))
         # 关闭数据库连接
         db_manager.disconnect()
 
@@ -145,13 +349,17 @@ if __name__ == "__main__":
     
     parser = argparse.ArgumentParser(description='数据库清理工具')
     parser.add_argument('--rebuild', action='store_true', help='是否重建表结构(drop并重新create)')
+    parser.add_argument('--drop-database', action='store_true',
+                        help='重建时直接删除并重新创建整个数据库（需要相应权限，失败时回退到逐表删除）')
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help='使用aiomysql在多个连接上并发清空各表（需安装aiomysql）')
     args = parser.parse_args()
     
     if args.rebuild:
         print("=== 开始清理并重建数据库表结构 ===")
-        clean_and_rebuild_database()
+        clean_and_rebuild_database(drop_database=args.drop_database)
     else:
         print("=== 开始清理数据库数据 ===")
-        clean_database()
+        clean_database(use_async=args.use_async)
     
     print("操作完成")
@@ -0,0 +1,21 @@
+-- 清理所有表数据的存储过程模板
+--
+-- clean_database.py 按 TABLES_IN_DEPENDENCY_ORDER 生成 {truncate_statements}（子表在前，父表在后，
+-- 已经为空的表跳过 TRUNCATE），并把渲染后整个过程定义（含本模板其余部分）的哈希写入 COMMENT 作为版本号。
+-- 修改本模板或表列表后，库中已有的旧版本存储过程会被脚本自动删除并重新创建，无需手动维护。
+--
+-- 整个语句作为一条语句发送，不需要 DELIMITER。
+
+CREATE PROCEDURE clean_all_tables()
+COMMENT '{comment}'
+BEGIN
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        SET FOREIGN_KEY_CHECKS = 1;
+        RESIGNAL;
+    END;
+    
+    SET FOREIGN_KEY_CHECKS = 0;
+{truncate_statements}
+    SET FOREIGN_KEY_CHECKS = 1;
+END